@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+QXP Starter Generator Benchmarks
+Times create_vite_starter.py cold and warm, for one site and for a batch of
+tenants, on tmpfs and on a real disk. Results are appended to a JSON history
+and can be checked against a stored baseline:
+
+    python bench_vite_starter.py --save-baseline   # record the reference run
+    python bench_vite_starter.py --check           # fail on regressions
+
+History and baseline live in .bench/, which is not committed: timings only
+compare on the same machine, so the baseline is per machine and --check
+measures a checkout against that machine's own reference run (it warns when
+the baseline came from another host or Python). --check compares the median
+of the repeated runs per scenario, and ignores slowdowns smaller than
+--min-delta-ms or twice the baseline's run-to-run deviation, so runs of a
+few tens of milliseconds do not fail on noise.
+
+Every measured run happens in a fresh interpreter, so "cold" includes module
+import and template compilation with an empty template cache and an empty
+output directory, while "warm" reuses both. Per stage we record wall time,
+CPU time, read/write syscalls (from /proc/self/io where available) and the
+filesystem operations seen by Python's audit hooks. The generator's own
+profiler spans break generate down further (resolve_config, render, write,
+finish, npm_state); those rows carry wall time only, and in the batch they
+are summed over all tenants. When the batch runs on a process pool, CPU time
+and peak RSS include the workers but syscall counts cover the parent process
+only. The disk scenarios run under .bench/ in the repository by default;
+pass --disk-dir to use another disk.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import resource
+import statistics
+import subprocess
+import tempfile
+from collections import Counter
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BENCH_DIR = os.path.join(os.path.dirname(HERE), ".bench")
+DEFAULT_HISTORY = os.path.join(BENCH_DIR, "starter-history.json")
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "starter-baseline.json")
+# Slowdowns below this are treated as noise by --check.
+DEFAULT_MIN_DELTA_MS = 25.0
+
+# Audit events that correspond to filesystem syscalls the generator makes.
+AUDIT_EVENTS = {
+    "open": "open",
+    "os.rename": "rename",
+    "os.remove": "unlink",
+    "os.mkdir": "mkdir",
+    "os.rmdir": "rmdir",
+    "os.listdir": "listdir",
+    "os.scandir": "scandir",
+}
+
+
+# ---------------------------------------------------------------------------
+# Worker: runs inside the measured subprocess
+# ---------------------------------------------------------------------------
+
+def _io_counters():
+    try:
+        with open("/proc/self/io") as f:
+            fields = dict(line.split(": ") for line in f.read().splitlines())
+        return {"syscr": int(fields["syscr"]), "syscw": int(fields["syscw"])}
+    except (OSError, KeyError, ValueError):
+        return {}
+
+
+class _Stages:
+    def __init__(self):
+        self.events = Counter()
+        self.stages = {}
+        sys.addaudithook(self._hook)
+
+    def _hook(self, event, args):
+        name = AUDIT_EVENTS.get(event)
+        if name:
+            self.events[name] += 1
+
+    def run(self, name, fn, *args, **kwargs):
+        io_before, events_before = _io_counters(), Counter(self.events)
+        wall, cpu = time.perf_counter(), time.process_time()
+        result = fn(*args, **kwargs)
+        stage = {
+            "wall_ms": (time.perf_counter() - wall) * 1000,
+            "cpu_ms": (time.process_time() - cpu) * 1000,
+            "syscalls": {k: v - io_before.get(k, 0) for k, v in _io_counters().items()},
+        }
+        stage["syscalls"].update(self.events - events_before)
+        self.stages[name] = stage
+        return result
+
+    def add_spans(self, parent, spans):
+        """Fold profiler spans into "<parent>/<span>" stages, summing per-file spans."""
+        for span in spans:
+            name = f"{parent}/{span['name'].split(':', 1)[0]}"
+            stage = self.stages.setdefault(name, {"wall_ms": 0.0, "cpu_ms": None, "syscalls": {}, "spans": 0})
+            stage["wall_ms"] += span["dur_ns"] / 1e6
+            stage["spans"] += 1
+
+
+def _worker(spec):
+    started = time.perf_counter()
+    stages = _Stages()
+    os.environ["QXP_STARTER_CACHE"] = spec["cache"]
+    sys.path.insert(0, HERE)
+    starter = stages.run("import", __import__, "create_vite_starter")
+    templates = stages.run("templates", starter.compiled_templates)
+
+    if spec["mode"] == "single":
+        # The public path: render, write, manifest and npm state, as a real run.
+        profiler = starter.Profiler()
+        report = stages.run("generate", starter.generate, {}, spec["out"], templates=templates,
+                            profiler=profiler)
+        stages.add_spans("generate", profiler.spans)
+        files = len(report["added"]) + len(report["changed"])
+        bytes_written = report["bytes_written"]
+    else:
+        tenants = [{"slug": f"tenant-{i:04d}", "brand_name": f"School {i}",
+                    "phone_e164": f"2547{i:08d}"} for i in range(spec["tenants"])]
+        results = stages.run("batch", starter.generate_batch, tenants, spec["out"], jobs=spec["jobs"],
+                             profile=True)
+        failed = [r for r in results if not r["ok"]]
+        if failed:
+            raise SystemExit(f"batch benchmark failed: {failed[0]['error']}")
+        stages.add_spans("batch", [span for r in results for span in r["spans"]])
+        files = sum(r["added"] + r["changed"] for r in results)
+        bytes_written = sum(r["bytes_written"] for r in results)
+
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    json.dump({
+        "wall_ms": (time.perf_counter() - started) * 1000,
+        "cpu_ms": (own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime) * 1000,
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        "peak_rss_kb": max(own.ru_maxrss, children.ru_maxrss) // (1024 if sys.platform == "darwin" else 1),
+        "files_written": files,
+        "bytes_written": bytes_written,
+        "stages": stages.stages,
+    }, sys.stdout)
+
+
+# ---------------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------------
+
+def _fs_type(path):
+    """The filesystem type /proc/mounts lists for path, or None if unknown."""
+    try:
+        with open("/proc/mounts") as f:
+            mounts = [line.split()[1:3] for line in f]
+    except OSError:
+        return None
+    path = os.path.realpath(path)
+    best = max((m for m in mounts if path == m[0] or path.startswith(m[0].rstrip("/") + "/")),
+               key=lambda m: len(m[0]), default=None)
+    return best[1] if best else None
+
+
+def _filesystems(disk_dir):
+    fs = {}
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        fs["tmpfs"] = "/dev/shm"
+    fs["disk"] = disk_dir
+    return fs
+
+
+def _measure(spec):
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", json.dumps(spec)],
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"benchmark worker failed:\n{proc.stderr}")
+    return json.loads(proc.stdout)
+
+
+def _median_run(runs):
+    """The run with the median wall time, so stages stay internally consistent."""
+    ordered = sorted(runs, key=lambda r: r["wall_ms"])
+    result = dict(ordered[len(ordered) // 2])
+    for metric in ("wall_ms", "cpu_ms"):
+        values = [r[metric] for r in runs]
+        result[f"{metric}_all"] = [round(v, 3) for v in values]
+        result[f"{metric}_median"] = statistics.median(values)
+        result[f"{metric}_stdev"] = statistics.pstdev(values)
+    return result
+
+
+def run_suite(args):
+    results = {}
+    os.makedirs(args.disk_dir, exist_ok=True)
+    disk_type = _fs_type(args.disk_dir)
+    if disk_type in ("tmpfs", "ramfs") or (disk_type and disk_type == _fs_type("/dev/shm")):
+        print(f"⚠️  {args.disk_dir} is on {disk_type}, not a real disk; pass --disk-dir to measure one")
+    for fs_name, base in _filesystems(args.disk_dir).items():
+        workdir = tempfile.mkdtemp(prefix="qxp-bench-", dir=base)
+        try:
+            for mode in ("single", "batch"):
+                spec = {
+                    "mode": mode,
+                    "out": os.path.join(workdir, mode),
+                    "cache": os.path.join(workdir, "template-cache"),
+                    "tenants": args.tenants,
+                    "jobs": args.jobs,
+                }
+                cold = []
+                for _ in range(args.repeat):
+                    shutil.rmtree(spec["out"], ignore_errors=True)
+                    shutil.rmtree(spec["cache"], ignore_errors=True)
+                    cold.append(_measure(spec))
+                _measure(spec)  # prime output and cache for the warm runs
+                warm = [_measure(spec) for _ in range(args.repeat)]
+                results[f"{fs_name}/{mode}/cold"] = _median_run(cold)
+                results[f"{fs_name}/{mode}/warm"] = _median_run(warm)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _load_json(path, default):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+
+def _save_json(path, data):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+
+def check_regressions(entry, baseline, tolerance, min_delta_ms=DEFAULT_MIN_DELTA_MS):
+    """Scenarios whose median wall or CPU time exceeds baseline by more than tolerance.
+
+    A slowdown also has to exceed min_delta_ms and twice the baseline's
+    standard deviation, so short scenarios do not fail on run-to-run noise.
+    """
+    regressions = []
+    for name, result in entry["results"].items():
+        ref = baseline.get("results", {}).get(name)
+        if not ref:
+            continue
+        for metric in ("wall_ms", "cpu_ms"):
+            old = ref.get(f"{metric}_median", ref[metric])
+            new = result.get(f"{metric}_median", result[metric])
+            noise = max(min_delta_ms, 2 * ref.get(f"{metric}_stdev", 0))
+            if new > old * (1 + tolerance) and new - old > noise:
+                regressions.append(f"{name} {metric}: {old:.1f} -> {new:.1f}")
+    return regressions
+
+
+def baseline_mismatch(entry, baseline):
+    """Differences in machine or parameters that make a comparison meaningless."""
+    return [f"{key}: baseline {baseline.get(key)!r}, now {entry[key]!r}"
+            for key in ("platform", "python", "cpus", "params") if baseline.get(key) != entry[key]]
+
+
+def _print_results(results):
+    print(f"{'scenario':<26} {'wall ms':>9} {'cpu ms':>9} {'rss MiB':>8} {'files':>6} {'bytes':>10}")
+    for name, r in results.items():
+        print(f"{name:<26} {r['wall_ms']:>9.1f} {r['cpu_ms']:>9.1f} {r['peak_rss_kb'] / 1024:>8.1f} "
+              f"{r['files_written']:>6} {r['bytes_written']:>10}")
+        for stage, s in r["stages"].items():
+            calls = ", ".join(f"{k}={v}" for k, v in sorted(s["syscalls"].items()) if v)
+            if "spans" in s:
+                calls = f"{s['spans']} spans"
+            cpu = "-" if s["cpu_ms"] is None else f"{s['cpu_ms']:.2f}"
+            print(f"   {stage:<23} {s['wall_ms']:>9.2f} {cpu:>9}  {calls}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the QXP starter generator.")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--repeat", type=int, default=5, help="runs per scenario (median is kept)")
+    parser.add_argument("--tenants", type=int, default=200, help="sites in the batch scenarios")
+    parser.add_argument("--jobs", type=int, help="batch worker processes (default: CPU count)")
+    parser.add_argument("--disk-dir", default=BENCH_DIR,
+                        help="directory on a real disk for the disk scenarios (default: .bench/)")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="JSON history to append to")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE,
+                        help="baseline to compare against; per machine (default: .bench/starter-baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--check", action="store_true", help="exit 1 if any scenario regressed")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown over baseline before --check fails (default: 0.25)")
+    parser.add_argument("--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_MS,
+                        help=f"slowdowns below this many ms are noise (default: {DEFAULT_MIN_DELTA_MS:g})")
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        _worker(json.loads(args.worker))
+        return 0
+
+    entry = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "params": {"repeat": args.repeat, "tenants": args.tenants, "jobs": args.jobs},
+        "results": run_suite(args),
+    }
+    _print_results(entry["results"])
+
+    history = _load_json(args.history, [])
+    history.append(entry)
+    _save_json(args.history, history)
+    print(f"\n📊 Appended to {args.history} ({len(history)} runs)")
+
+    if args.save_baseline:
+        _save_json(args.baseline, entry)
+        print(f"📌 Baseline saved to {args.baseline}")
+        return 0
+    if args.check:
+        baseline = _load_json(args.baseline, None)
+        if baseline is None:
+            print(f"⚠️  No baseline at {args.baseline}; run with --save-baseline first")
+            return 1
+        for line in baseline_mismatch(entry, baseline):
+            print(f"⚠️  Baseline is from another setup ({line}); re-record it with --save-baseline")
+        regressions = check_regressions(entry, baseline, args.tolerance, args.min_delta_ms)
+        for line in regressions:
+            print(f"❌ {line}")
+        if regressions:
+            return 1
+        print(f"✅ No regressions beyond {args.tolerance:.0%} of baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
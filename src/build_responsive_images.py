@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+QXP Responsive Image Builder
+Re-encodes the PNG illustrations in src/assests/ and the favicon_io icons into
+width-bucketed variants, so browsers download the size and format they need:
+
+    python src/build_responsive_images.py            # build missing variants
+    python src/build_responsive_images.py --check    # exit 1 if anything is stale
+    python src/build_responsive_images.py --jobs 4
+
+Each source gets one variant per width in WIDTHS narrower than itself, plus
+one at its own width. Every width is written as AVIF and WebP when the
+installed Pillow can encode them, and always as an optimized PNG fallback.
+Variants are named <stem>.<source sha256[:10]>-<width>.<ext>, so an unchanged
+source is never re-encoded. Variants of sources that changed or disappeared
+are removed. Encoding runs across a process pool. Sources with at most 256
+colours stay palette PNGs when downscaled. A variant that is not smaller than
+the next wider one (or the source) is dropped and listed under "dropped" in
+the manifest, so it is not encoded again.
+
+The builder writes assests/responsive/responsive.manifest.json and
+regenerates src/components/ResponsiveImage.tsx, which turns the manifest into
+<picture> srcset/sizes markup. Building needs Pillow (pip install Pillow);
+without it the existing outputs stay in place and the run exits 1. --check
+reads sizes from the PNG headers and works without Pillow. Variants in a
+format the local Pillow cannot encode (often AVIF) are kept and stay in the
+manifest, with a warning when they would need rebuilding.
+"""
+
+import io
+import os
+import sys
+import glob
+import json
+import struct
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from PIL import Image, features
+except ImportError:  # optional: only needed to (re)build variants
+    Image = features = None
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+OUT_DIR = os.path.join(HERE, "assests", "responsive")
+MANIFEST_NAME = "responsive.manifest.json"
+COMPONENT = os.path.join(HERE, "components", "ResponsiveImage.tsx")
+# Sources, relative to the repository root.
+SOURCES = ("src/assests/*.png", "public/favicon_io/*.png")
+
+MANIFEST_VERSION = 1
+WIDTHS = (96, 160, 320, 480, 640, 960, 1280, 1920)
+# Best first: the order of <source> elements in the component.
+FORMATS = ("avif", "webp", "png")
+ENCODE_OPTIONS = {
+    "avif": {"quality": 55, "speed": 6},
+    "webp": {"quality": 80, "method": 4},
+    "png": {"optimize": True},
+}
+
+
+def source_digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def available_formats():
+    """Formats the installed Pillow can encode, best first."""
+    if Image is None:
+        return []
+    return [fmt for fmt in FORMATS if fmt == "png" or features.check(fmt)]
+
+
+def png_size(path):
+    """(width, height) from a PNG's IHDR chunk."""
+    with open(path, "rb") as f:
+        header = f.read(24)
+    if header[:8] != b"\x89PNG\r\n\x1a\n" or header[12:16] != b"IHDR":
+        raise ValueError(f"{path} is not a PNG")
+    return struct.unpack(">II", header[16:24])
+
+
+def variant_widths(width):
+    return [w for w in WIDTHS if w < width] + [width]
+
+
+def _variant_name(stem, digest, width, fmt):
+    return f"{stem}.{digest[:10]}-{width}.{fmt}"
+
+
+def _palette_colors(im):
+    """Number of colours when im fits a palette PNG, else None."""
+    colors = im.getcolors(256)
+    return len(colors) if colors else None
+
+
+def _encode(job):
+    """Write one variant; returns (name, bytes written or 0 if cached)."""
+    source, out_dir, name, width, fmt = job
+    dest = os.path.join(out_dir, name)
+    if os.path.exists(dest):
+        return name, 0
+    with Image.open(source) as im:
+        im.load()
+        full_width = im.width
+        if width < full_width:
+            palette = _palette_colors(im) if fmt == "png" else None
+            if im.mode == "P":
+                im = im.convert("RGBA")
+            im = im.resize((width, round(im.height * width / full_width)), Image.LANCZOS)
+            # LANCZOS blends edges into thousands of new colours; map them back
+            # onto a palette of the source's size so the PNG stays small.
+            if palette:
+                im = im.quantize(colors=palette, method=Image.FASTOCTREE)
+        buf = io.BytesIO()
+        im.save(buf, fmt.upper(), **ENCODE_OPTIONS[fmt])
+    data = buf.getvalue()
+    # Re-encoding a full-size PNG can come out larger than the original.
+    if fmt == "png" and width == full_width and os.path.getsize(source) < len(data):
+        with open(source, "rb") as f:
+            data = f.read()
+    tmp = f"{dest}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, dest)
+    return name, len(data)
+
+
+def plan(sources, out_dir, formats, present=frozenset(), dropped=frozenset()):
+    """The manifest for sources, the encode jobs it needs, and what cannot be built.
+
+    formats are the ones that can be encoded here. Variants of the other
+    FORMATS stay in the manifest when every width of a source is present.
+    Otherwise the source goes without that format and (stem, format, names of
+    the variants present) is reported as unbuildable. Variants named in
+    dropped were encoded before and rejected by prune(); they are skipped.
+    """
+    images, jobs, unbuildable = {}, [], []
+    for path in sources:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        digest = source_digest(path)
+        width, height = png_size(path)
+        entry = {"source": os.path.relpath(path, ROOT).replace(os.sep, "/"),
+                 "width": width, "height": height, "variants": {}}
+        skipped = []
+        for fmt in FORMATS:
+            variants = [[w, _variant_name(stem, digest, w, fmt)] for w in variant_widths(width)]
+            skipped += [name for _, name in variants if name in dropped]
+            variants = [[w, name] for w, name in variants if name not in dropped]
+            if not variants:
+                continue
+            if fmt in formats:
+                jobs.extend((path, out_dir, name, w, fmt) for w, name in variants)
+            elif not all(name in present for _, name in variants):
+                kept = [name for _, name in variants if name in present]
+                if kept:
+                    unbuildable.append((stem, fmt, kept))
+                continue
+            entry["variants"][fmt] = variants
+        if skipped:
+            entry["dropped"] = sorted(skipped)
+        images[stem] = entry
+    return {"version": MANIFEST_VERSION, "formats": _used_formats(images), "images": images}, jobs, unbuildable
+
+
+def _used_formats(images):
+    return [fmt for fmt in FORMATS if any(fmt in entry["variants"] for entry in images.values())]
+
+
+def prune(variants, sizes, source_bytes):
+    """Names of variants a smaller, at least as wide file makes pointless.
+
+    variants maps format to [[width, name]] in ascending width; sizes maps
+    name to bytes. Walking down from the widest, a variant is dropped unless
+    it is smaller than the next wider kept one (or the source). The full-width
+    PNG is the <img> fallback and always stays. If the full-width variant of
+    another format is dropped, the whole format goes, so no srcset tops out
+    below the image's width.
+    """
+    dropped = []
+    for fmt, entries in variants.items():
+        limit = source_bytes
+        for i, (_, name) in enumerate(reversed(entries)):
+            if sizes[name] < limit or (fmt == "png" and i == 0):
+                limit = sizes[name]
+            elif i == 0:
+                dropped += [n for _, n in entries]
+                break
+            else:
+                dropped.append(name)
+    return dropped
+
+
+def render_component():
+    return """\
+/**
+ * Responsive Image Component
+ * --------------------------
+ * Generated by src/build_responsive_images.py; do not edit by hand. Renders a
+ * <picture> with AVIF/WebP/PNG srcsets from assests/responsive, so the
+ * browser picks the smallest variant that fills the rendered size. Pass
+ * sizes whenever the image is narrower than the viewport.
+ */
+
+import type { ImgHTMLAttributes } from 'react';
+import manifest from '../assests/responsive/responsive.manifest.json';
+
+// ?no-inline keeps every variant a separate file. With ?url, Vite would still
+// inline the ones under assetsInlineLimit into this chunk as base64.
+const urls = import.meta.glob<string>('../assests/responsive/*.{avif,webp,png}', {
+  eager: true,
+  query: '?no-inline',
+  import: 'default',
+});
+
+type Format = 'avif' | 'webp' | 'png';
+
+interface ResponsiveEntry {
+  source: string;
+  width: number;
+  height: number;
+  variants: Partial<Record<Format, [number, string][]>>;
+}
+
+const images = manifest.images as Record<string, ResponsiveEntry>;
+
+export type ResponsiveImageName = keyof typeof manifest.images;
+
+const MIME: Record<Format, string> = { avif: 'image/avif', webp: 'image/webp', png: 'image/png' };
+
+function srcSet(variants: [number, string][]): string {
+  return variants.map(([width, file]) => `${urls[`../assests/responsive/${file}`]} ${width}w`).join(', ');
+}
+
+interface ResponsiveImageProps extends Omit<ImgHTMLAttributes<HTMLImageElement>, 'src' | 'srcSet'> {
+  /** Source file name without extension, e.g. a hashed illustration name. */
+  image: ResponsiveImageName;
+  alt: string;
+}
+
+export function ResponsiveImage({
+  image,
+  sizes = '100vw',
+  loading = 'lazy',
+  decoding = 'async',
+  ...props
+}: ResponsiveImageProps) {
+  const entry = images[image];
+  const fallback = entry.variants.png ?? [];
+  const largest = fallback[fallback.length - 1];
+  return (
+    <picture>
+      {(['avif', 'webp'] as const).map((format) => {
+        const variants = entry.variants[format];
+        return variants ? (
+          <source key={format} type={MIME[format]} srcSet={srcSet(variants)} sizes={sizes} />
+        ) : null;
+      })}
+      <img
+        src={largest ? urls[`../assests/responsive/${largest[1]}`] : undefined}
+        srcSet={srcSet(fallback)}
+        sizes={sizes}
+        width={entry.width}
+        height={entry.height}
+        loading={loading}
+        decoding={decoding}
+        {...props}
+      />
+    </picture>
+  );
+}
+
+export default ResponsiveImage;
+"""
+
+
+def _read(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build responsive variants of the raster assets.")
+    parser.add_argument("--out-dir", default=OUT_DIR, help="directory for variants and the manifest")
+    parser.add_argument("--component", default=COMPONENT, help="ResponsiveImage component to generate")
+    parser.add_argument("--jobs", type=int, help="encoder processes (default: CPU count)")
+    parser.add_argument("--check", action="store_true", help="exit 1 if any output is missing or stale")
+    args = parser.parse_args(argv)
+
+    if Image is None and not args.check:
+        print("❌ Pillow is required to build image variants: pip install Pillow")
+        return 1
+
+    sources = sorted(p for pattern in SOURCES for p in glob.glob(os.path.join(ROOT, pattern)))
+    present = set(os.listdir(args.out_dir)) - {MANIFEST_NAME} if os.path.isdir(args.out_dir) else set()
+    # --check verifies what is on disk, so it accepts every format that is there.
+    formats = available_formats() if not args.check else []
+    manifest_path = os.path.join(args.out_dir, MANIFEST_NAME)
+    try:
+        previous = json.loads(_read(manifest_path) or "{}").get("images", {})
+    except ValueError:
+        previous = {}
+    dropped = {name for entry in previous.values() for name in entry.get("dropped", [])}
+    manifest, jobs, unbuildable = plan(sources, args.out_dir, formats, present, dropped)
+    manifest_text = json.dumps(manifest, indent=2) + "\n"
+    wanted = {name for entry in manifest["images"].values()
+              for variants in entry["variants"].values() for _, name in variants}
+    kept = {name for _, _, names in unbuildable for name in names}
+    missing = [job for job in jobs if job[2] not in present]
+    stale = sorted(present - wanted - kept)
+
+    if args.check:
+        problems = [f"{len(missing)} variants missing"] if missing else []
+        problems += [f"{stem}: {fmt} variants incomplete" for stem, fmt, _ in unbuildable]
+        problems += [f"{name} is no longer used" for name in stale]
+        if _read(manifest_path) != manifest_text:
+            problems.append(f"{os.path.relpath(manifest_path)} is stale")
+        if _read(args.component) != render_component():
+            problems.append(f"{os.path.relpath(args.component)} is stale")
+        for line in problems:
+            print(f"❌ {line}")
+        if not problems:
+            print(f"✅ {len(wanted)} variants of {len(sources)} images are up to date")
+        return 1 if problems else 0
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    jobs_n = args.jobs or os.cpu_count() or 1
+    if jobs_n == 1 or len(missing) <= 1:
+        results = [_encode(job) for job in missing]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs_n) as pool:
+            results = list(pool.map(_encode, missing, chunksize=max(1, len(missing) // (jobs_n * 4))))
+    for entry in manifest["images"].values():
+        sizes = {name: os.path.getsize(os.path.join(args.out_dir, name))
+                 for variants in entry["variants"].values() for _, name in variants}
+        pruned = set(prune(entry["variants"], sizes, os.path.getsize(os.path.join(ROOT, entry["source"]))))
+        if not pruned:
+            continue
+        for fmt, variants in list(entry["variants"].items()):
+            entry["variants"][fmt] = [[w, name] for w, name in variants if name not in pruned]
+            if not entry["variants"][fmt]:
+                del entry["variants"][fmt]
+        entry["dropped"] = sorted(pruned.union(entry.get("dropped", [])))
+    manifest["formats"] = _used_formats(manifest["images"])
+    manifest_text = json.dumps(manifest, indent=2) + "\n"
+    wanted = {name for entry in manifest["images"].values()
+              for variants in entry["variants"].values() for _, name in variants}
+    stale = sorted((present | {job[2] for job in missing}) - wanted - kept)
+    for name in stale:
+        os.remove(os.path.join(args.out_dir, name))
+    for stem, fmt in sorted({(stem, fmt) for stem, fmt, _ in unbuildable}):
+        print(f"⚠️  {stem}: this Pillow cannot encode {fmt}; its {fmt} variants are kept but incomplete")
+    for path, text in ((manifest_path, manifest_text), (args.component, render_component())):
+        if _read(path) != text:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+
+    source_bytes = sum(os.path.getsize(p) for p in sources)
+    print(f"{'image':<44} {'source':>8} {'smallest':>9} {'largest':>8}")
+    for stem, entry in manifest["images"].items():
+        best = next(iter(entry["variants"].values()))
+        sizes = [os.path.getsize(os.path.join(args.out_dir, name)) for _, name in best]
+        print(f"{stem:<44} {os.path.getsize(os.path.join(ROOT, entry['source'])):>8} "
+              f"{sizes[0]:>9} {sizes[-1]:>8}")
+    encoded = {name for name, written in results if written} & wanted
+    print(f"\n🖼️  {len(encoded)} variants encoded, {len(wanted - encoded)} cached, "
+          f"{len(stale)} removed ({', '.join(manifest['formats'])}; sources {source_bytes} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
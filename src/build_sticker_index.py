@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+QXP Sticker Search Index Builder
+Compiles assests/manifests/stickers.manifest.json into a compact inverted
+index so sticker pickers can answer searches without scanning the manifest:
+
+    python src/build_sticker_index.py          # write stickers.index.json
+    python src/build_sticker_index.py --check  # exit 1 if the index is stale
+
+Every label (per language), tag, category and type is normalised (NFKD,
+accents and Arabic diacritics stripped, case-folded) and split into tokens.
+Each whole token maps to the sorted positions (in "ids") of the stickers it
+occurs in; category, type and age facets are stored the same way.
+src/lib/stickerSearch.ts implements the same normalisation. It finds the
+tokens a query word is a prefix of by binary search over the sorted keys and
+intersects their posting lists, so a search costs the size of the postings
+it touches rather than the size of the pack. Only whole tokens are stored, so
+the index stays smaller than the manifest it indexes.
+"""
+
+import os
+import re
+import sys
+import json
+import bisect
+import argparse
+import unicodedata
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MANIFEST = os.path.join(HERE, "assests", "manifests", "stickers.manifest.json")
+INDEX = os.path.join(HERE, "assests", "manifests", "stickers.index.json")
+
+INDEX_VERSION = 2
+# Postings for language-neutral fields (tags, category, type), consulted for
+# every locale.
+SHARED = "*"
+
+TOKEN_RE = re.compile(r"[^\W_]+")
+ARABIC_FOLD = str.maketrans({"أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا", "ى": "ي", "ة": "ه"})
+
+
+def normalize(text):
+    """Search tokens for text; must match normalizeStickerQuery in stickerSearch.ts."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.category(ch).startswith("M"))
+    tokens = []
+    for token in TOKEN_RE.findall(stripped.lower().translate(ARABIC_FOLD)):
+        tokens.append(token)
+        # Arabic definite article: "الشمس" should also match "شمس".
+        if token.startswith("ال") and len(token) > 3:
+            tokens.append(token[2:])
+    return tokens
+
+
+def build_index(manifest):
+    items = manifest["items"]
+    ids = [item["id"] for item in items]
+    postings = {}
+    facets = {"category": {}, "type": {}, "age": {}}
+
+    def add(bucket, text, pos):
+        for token in normalize(text):
+            postings.setdefault(bucket, {}).setdefault(token, set()).add(pos)
+
+    for pos, item in enumerate(items):
+        for lang, label in item.get("label", {}).items():
+            add(lang, label, pos)
+        for text in item.get("tags", []) + [item.get("category", ""), item.get("type", "")]:
+            add(SHARED, text, pos)
+        for facet in facets:
+            value = item.get(facet)
+            if value:
+                facets[facet].setdefault(value, []).append(pos)
+
+    return {
+        "version": INDEX_VERSION,
+        "pack": manifest.get("pack"),
+        "packVersion": manifest.get("version"),
+        "ids": ids,
+        "locales": sorted(lang for lang in postings if lang != SHARED),
+        "tokens": {bucket: {tok: sorted(pos) for tok, pos in sorted(entries.items())}
+                   for bucket, entries in sorted(postings.items())},
+        "facets": {facet: dict(sorted(values.items())) for facet, values in facets.items()},
+    }
+
+
+def search(index, query, locale="en"):
+    """Ids matching every word of query as a prefix; mirrors searchStickers()."""
+    tokens = normalize(query)
+    matches = None
+    i = 0
+    while i < len(tokens):
+        words = [tokens[i]]
+        if tokens[i].startswith("ال") and i + 1 < len(tokens) and tokens[i + 1] == tokens[i][2:]:
+            words.append(tokens[i + 1])
+            i += 1
+        i += 1
+        found = set()
+        for bucket in (locale, SHARED):
+            postings = index["tokens"].get(bucket, {})
+            keys = sorted(postings)
+            for word in words:
+                j = bisect.bisect_left(keys, word)
+                while j < len(keys) and keys[j].startswith(word):
+                    found.update(postings[keys[j]])
+                    j += 1
+        matches = found if matches is None else matches & found
+    positions = range(len(index["ids"])) if matches is None else sorted(matches)
+    return [index["ids"][pos] for pos in positions]
+
+
+def render(index):
+    # Compact separators: the file ships to browsers.
+    return json.dumps(index, ensure_ascii=False, separators=(",", ":"), sort_keys=False) + "\n"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the sticker search index.")
+    parser.add_argument("--manifest", default=MANIFEST, help="sticker manifest to index")
+    parser.add_argument("--out", default=INDEX, help="index file to write")
+    parser.add_argument("--check", action="store_true", help="exit 1 if --out is missing or stale")
+    args = parser.parse_args(argv)
+
+    with open(args.manifest, encoding="utf-8") as f:
+        text = render(build_index(json.load(f)))
+
+    try:
+        with open(args.out, encoding="utf-8") as f:
+            current = f.read()
+    except FileNotFoundError:
+        current = None
+    if args.check:
+        if current != text:
+            print(f"❌ {os.path.relpath(args.out)} is stale; run {os.path.relpath(__file__)}")
+            return 1
+        print(f"✅ {os.path.relpath(args.out)} is up to date")
+        return 0
+    if current == text:
+        print(f"✅ {os.path.relpath(args.out)} unchanged")
+        return 0
+    with open(args.out, "w", encoding="utf-8") as f:
+        f.write(text)
+    print(f"🔎 Wrote {os.path.relpath(args.out)} ({len(text.encode('utf-8'))} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+QXP Sticker Sprite Builder
+Packs the stickers listed in assests/manifests/stickers.manifest.json into one
+<symbol> sprite sheet per category (or per type), and generates the
+<Sticker id=...> component that references them:
+
+    python src/build_sticker_sprites.py            # write sprites + Sticker.tsx
+    python src/build_sticker_sprites.py --by type  # one sheet per usage type
+    python src/build_sticker_sprites.py --check    # exit 1 if outputs are stale
+
+Stickers go through optimize_stickers.optimize_svg() first. Each symbol
+keeps the sticker's viewBox, <title> and <desc>. Names that mean different
+things in different stickers would collide once they share a document, so
+inner ids (gradients, clip paths, masks) get the sticker id as a prefix, and
+url(#...) and href="#..." references follow. Class rules from the sticker's
+<style> block are resolved per element and shared across the sheet: each
+distinct set of declarations becomes one class rule (._s0, ._s1, ...) in a
+single <style> at the top of the sheet, so the stroke style most stickers
+use is written once. The rules still read var(--ink), var(--accent),
+var(--accent-2) and var(--surface), which inherit through <use>, so theming
+works as it does for the standalone files.
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import xml.etree.ElementTree as ET
+
+from optimize_stickers import (ASSETS, CLASS_RE, HERE, ID_SELECTOR_RE, IDREF_RE, MANIFEST, RULE_RE,
+                               SVG_NS, minify_css, optimize_svg, sticker_file)
+
+SPRITES = os.path.join(ASSETS, "sprites")
+COMPONENT = os.path.join(HERE, "components", "Sticker.tsx")
+
+SIMPLE_CLASS_RE = re.compile(r"\.[\w-]+")
+
+# Attributes that describe the standalone document, not the drawing.
+DOCUMENT_ATTRS = {"role", "focusable", "width", "height", "viewBox"}
+
+ET.register_namespace("", SVG_NS)
+
+
+def _tag(el):
+    return el.tag.rsplit("}", 1)[-1]
+
+
+def _scope_refs(value, ids):
+    return IDREF_RE.sub(lambda m: f"url(#{ids[m.group(1)]})" if m.group(1) in ids else m.group(0), value)
+
+
+def _scope_css(css, prefix, classes, ids):
+    """css with the given class names and ids prefixed, in selectors and url(#...)."""
+    def selector(sel):
+        sel = CLASS_RE.sub(lambda m: f".{prefix}-{m.group(1)}" if m.group(1) in classes else m.group(0), sel)
+        return ID_SELECTOR_RE.sub(lambda m: f"#{ids[m.group(1)]}" if m.group(1) in ids else m.group(0), sel)
+    return "".join(f"{selector(sel)}{{{_scope_refs(body, ids)}}}" for sel, body in RULE_RE.findall(css))
+
+
+def _scope(root, prefix):
+    """Make root's names unique in a shared sheet.
+
+    Rules of a single class selector (.face) are resolved onto the elements
+    as style attributes, in rule order; other rules keep their <style> with
+    the class names and ids they use prefixed. Inner ids are prefixed too.
+    """
+    ids = {el.get("id"): f"{prefix}-{el.get('id')}" for el in root.iter() if el is not root and el.get("id")}
+    simple, classes = {}, set()
+    for style in list(root.iter(f"{{{SVG_NS}}}style")):
+        rest = []
+        for sel, body in RULE_RE.findall(minify_css(style.text or "")):
+            if SIMPLE_CLASS_RE.fullmatch(sel):
+                simple[sel[1:]] = ";".join(filter(None, [simple.get(sel[1:]), _scope_refs(body, ids)]))
+            else:
+                rest.append(f"{sel}{{{body}}}")
+                classes.update(CLASS_RE.findall(sel))
+        style.text = "".join(rest)
+    for parent in list(root.iter()):
+        for style in [c for c in parent if _tag(c) == "style"]:
+            if style.text:
+                style.text = _scope_css(style.text, prefix, classes, ids)
+            else:
+                parent.remove(style)
+    order = list(simple)
+
+    for el in root.iter():
+        if el is root:
+            continue
+        for attr, value in el.attrib.items():
+            if attr == "id":
+                el.set(attr, ids[value])
+            elif value.startswith("#") and value[1:] in ids:
+                el.set(attr, f"#{ids[value[1:]]}")
+            elif attr != "class":
+                el.set(attr, _scope_refs(value, ids))
+        names = el.attrib.pop("class", "").split()
+        decls = [simple[c] for c in sorted({c for c in names if c in simple}, key=order.index)]
+        if el.get("style"):
+            decls.append(el.get("style"))
+        if decls:
+            el.set("style", ";".join(decls))
+        # Classes other rules select on stay (scoped); ones without any rule stay as hooks.
+        rest = [f"{prefix}-{c}" if c in classes else c for c in names if c in classes or c not in simple]
+        if rest:
+            el.set("class", " ".join(rest))
+
+
+def _share_styles(symbols):
+    """Move the symbols' style attributes into one class rule per distinct value."""
+    shared = {}
+    for symbol in symbols:
+        for el in symbol.iter():
+            style = el.attrib.pop("style", None)
+            if style is None:
+                continue
+            name = shared.setdefault(style, f"_s{len(shared)}")
+            el.set("class", " ".join([name, *el.get("class", "").split()]))
+    return "".join(f".{name}{{{style}}}" for style, name in shared.items())
+
+
+def build_symbol(item, path):
+    """The sticker at path as a <symbol> element, plus its title text."""
+    with open(path, encoding="utf-8") as f:
+        root = ET.fromstring(optimize_svg(f.read()))
+    symbol = ET.Element(f"{{{SVG_NS}}}symbol", {"id": item["id"]})
+    symbol.set("viewBox", root.get("viewBox") or item.get("viewBox", "0 0 256 256"))
+    _scope(root, item["id"])
+    title = ""
+    for child in root:
+        if _tag(child) == "title":
+            title = (child.text or "").strip()
+        child.tail = None
+        symbol.append(child)
+    for attr, value in root.attrib.items():
+        if attr not in DOCUMENT_ATTRS and not attr.startswith("{"):
+            symbol.set(attr, value)
+    return symbol, title or item.get("label", {}).get("en", item["id"])
+
+
+def build_sprites(manifest, by="category"):
+    """{group: sprite text} and the per-sticker entries for the component."""
+    groups, entries = {}, []
+    for item in manifest["items"]:
+        group = item.get(by) or "misc"
+        symbol, title = build_symbol(item, sticker_file(item))
+        groups.setdefault(group, []).append(symbol)
+        entries.append({"id": item["id"], "group": group, "viewBox": symbol.get("viewBox"), "title": title})
+
+    sprites = {}
+    for group, symbols in groups.items():
+        sheet = ET.Element(f"{{{SVG_NS}}}svg", {"aria-hidden": "true"})
+        sheet.text = "\n"
+        css = _share_styles(symbols)
+        if css:
+            style = ET.SubElement(sheet, f"{{{SVG_NS}}}style")
+            style.text = css
+            style.tail = "\n"
+        for symbol in symbols:
+            symbol.tail = "\n"
+            sheet.append(symbol)
+        sprites[group] = ET.tostring(sheet, encoding="unicode").replace(" />", "/>") + "\n"
+    return sprites, entries
+
+
+def _ident(group):
+    words = re.split(r"[^0-9A-Za-z]+", group)
+    return words[0].lower() + "".join(w.capitalize() for w in words[1:]) + "Sprite"
+
+
+def _ts_string(text):
+    return "'" + text.replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+def render_component(entries):
+    groups = sorted({e["group"] for e in entries})
+    imports = "\n".join(
+        f"import {_ident(g)} from '../assests/sprites/{g}.svg?no-inline';" for g in groups)
+    rows = "\n".join(
+        f"  {e['id']}: {{ sprite: {_ident(e['group'])}, viewBox: {_ts_string(e['viewBox'])}, "
+        f"title: {_ts_string(e['title'])} }},"
+        for e in entries)
+    return f"""\
+/**
+ * Sticker Component
+ * -----------------
+ * Generated by src/build_sticker_sprites.py from stickers.manifest.json; do
+ * not edit by hand. Renders one sticker by id from its category sprite sheet,
+ * so a screen full of stickers costs one cached request per sheet. Colours
+ * come from --ink, --accent, --accent-2 and --surface on any ancestor.
+ */
+
+import type {{ SVGProps }} from 'react';
+{imports}
+
+const STICKERS = {{
+{rows}
+}} as const;
+
+export type StickerId = keyof typeof STICKERS;
+
+export const STICKER_IDS = Object.keys(STICKERS) as StickerId[];
+
+interface StickerProps extends Omit<SVGProps<SVGSVGElement>, 'id'> {{
+  id: StickerId;
+  /** Accessible name; defaults to the sticker's English title. */
+  title?: string;
+  /** Hide from assistive technology when the sticker is purely ornamental. */
+  decorative?: boolean;
+  size?: number | string;
+  /** Flip horizontally, e.g. LocalizedSticker.mirror in an RTL locale. */
+  mirror?: boolean;
+}}
+
+export function Sticker({{ id, title, decorative = false, size = 64, mirror = false, style, ...props }}: StickerProps) {{
+  const sticker = STICKERS[id];
+  return (
+    <svg
+      viewBox={{sticker.viewBox}}
+      width={{size}}
+      height={{size}}
+      role={{decorative ? undefined : 'img'}}
+      aria-hidden={{decorative || undefined}}
+      focusable="false"
+      style={{mirror ? {{ transform: 'scaleX(-1)', ...style }} : style}}
+      {{...props}}
+    >
+      {{!decorative && <title>{{title ?? sticker.title}}</title>}}
+      <use href={{`${{sticker.sprite}}#${{id}}`}} />
+    </svg>
+  );
+}}
+
+export default Sticker;
+"""
+
+
+def _sync(path, text, check):
+    """Write text to path if it differs; returns True when the file was stale."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            current = f.read()
+    except FileNotFoundError:
+        current = None
+    if current == text:
+        return False
+    if not check:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build sticker sprite sheets and the Sticker component.")
+    parser.add_argument("--manifest", default=MANIFEST, help="sticker manifest to read")
+    parser.add_argument("--by", choices=("category", "type"), default="category",
+                        help="manifest field that decides which sheet a sticker goes in")
+    parser.add_argument("--out-dir", default=SPRITES, help="directory for the sprite sheets")
+    parser.add_argument("--component", default=COMPONENT, help="Sticker component to generate")
+    parser.add_argument("--check", action="store_true", help="exit 1 if any output is missing or stale")
+    args = parser.parse_args(argv)
+
+    with open(args.manifest, encoding="utf-8") as f:
+        sprites, entries = build_sprites(json.load(f), args.by)
+
+    outputs = {os.path.join(args.out_dir, f"{group}.svg"): text for group, text in sorted(sprites.items())}
+    outputs[args.component] = render_component(entries)
+    stale = [path for path, text in outputs.items() if _sync(path, text, args.check)]
+
+    # Sheets left over from a previous grouping.
+    expected = set(outputs)
+    if os.path.isdir(args.out_dir):
+        for name in sorted(os.listdir(args.out_dir)):
+            path = os.path.join(args.out_dir, name)
+            if name.endswith(".svg") and path not in expected:
+                stale.append(path)
+                if not args.check:
+                    os.remove(path)
+
+    if args.check:
+        for path in stale:
+            print(f"❌ {os.path.relpath(path)} is stale; run {os.path.relpath(__file__)}")
+        if not stale:
+            print(f"✅ {len(sprites)} sprite sheets and {os.path.relpath(args.component)} are up to date")
+        return 1 if stale else 0
+    for path in stale:
+        print(f"🧩 Wrote {os.path.relpath(path)}" if path in expected else f"🗑️  Removed {os.path.relpath(path)}")
+    print(f"✅ {len(entries)} stickers in {len(sprites)} sprite sheets")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
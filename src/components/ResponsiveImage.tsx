@@ -0,0 +1,78 @@
+/**
+ * Responsive Image Component
+ * --------------------------
+ * Generated by src/build_responsive_images.py; do not edit by hand. Renders a
+ * <picture> with AVIF/WebP/PNG srcsets from assests/responsive, so the
+ * browser picks the smallest variant that fills the rendered size. Pass
+ * sizes whenever the image is narrower than the viewport.
+ */
+
+import type { ImgHTMLAttributes } from 'react';
+import manifest from '../assests/responsive/responsive.manifest.json';
+
+// ?no-inline keeps every variant a separate file. With ?url, Vite would still
+// inline the ones under assetsInlineLimit into this chunk as base64.
+const urls = import.meta.glob<string>('../assests/responsive/*.{avif,webp,png}', {
+  eager: true,
+  query: '?no-inline',
+  import: 'default',
+});
+
+type Format = 'avif' | 'webp' | 'png';
+
+interface ResponsiveEntry {
+  source: string;
+  width: number;
+  height: number;
+  variants: Partial<Record<Format, [number, string][]>>;
+}
+
+const images = manifest.images as Record<string, ResponsiveEntry>;
+
+export type ResponsiveImageName = keyof typeof manifest.images;
+
+const MIME: Record<Format, string> = { avif: 'image/avif', webp: 'image/webp', png: 'image/png' };
+
+function srcSet(variants: [number, string][]): string {
+  return variants.map(([width, file]) => `${urls[`../assests/responsive/${file}`]} ${width}w`).join(', ');
+}
+
+interface ResponsiveImageProps extends Omit<ImgHTMLAttributes<HTMLImageElement>, 'src' | 'srcSet'> {
+  /** Source file name without extension, e.g. a hashed illustration name. */
+  image: ResponsiveImageName;
+  alt: string;
+}
+
+export function ResponsiveImage({
+  image,
+  sizes = '100vw',
+  loading = 'lazy',
+  decoding = 'async',
+  ...props
+}: ResponsiveImageProps) {
+  const entry = images[image];
+  const fallback = entry.variants.png ?? [];
+  const largest = fallback[fallback.length - 1];
+  return (
+    <picture>
+      {(['avif', 'webp'] as const).map((format) => {
+        const variants = entry.variants[format];
+        return variants ? (
+          <source key={format} type={MIME[format]} srcSet={srcSet(variants)} sizes={sizes} />
+        ) : null;
+      })}
+      <img
+        src={largest ? urls[`../assests/responsive/${largest[1]}`] : undefined}
+        srcSet={srcSet(fallback)}
+        sizes={sizes}
+        width={entry.width}
+        height={entry.height}
+        loading={loading}
+        decoding={decoding}
+        {...props}
+      />
+    </picture>
+  );
+}
+
+export default ResponsiveImage;
@@ -0,0 +1,65 @@
+/**
+ * Sticker Component
+ * -----------------
+ * Generated by src/build_sticker_sprites.py from stickers.manifest.json; do
+ * not edit by hand. Renders one sticker by id from its category sprite sheet,
+ * so a screen full of stickers costs one cached request per sheet. Colours
+ * come from --ink, --accent, --accent-2 and --surface on any ancestor.
+ */
+
+import type { SVGProps } from 'react';
+import animalsSprite from '../assests/sprites/animals.svg?no-inline';
+import emotionsSprite from '../assests/sprites/emotions.svg?no-inline';
+import natureSprite from '../assests/sprites/nature.svg?no-inline';
+import rewardsSprite from '../assests/sprites/rewards.svg?no-inline';
+import schoolSprite from '../assests/sprites/school.svg?no-inline';
+
+const STICKERS = {
+  reward_star_gold_fill_v1: { sprite: rewardsSprite, viewBox: '0 0 256 256', title: 'Gold Star' },
+  reward_ribbon_blue_fill_v1: { sprite: rewardsSprite, viewBox: '0 0 256 256', title: 'Blue Ribbon' },
+  reward_medal_bronze_fill_v1: { sprite: rewardsSprite, viewBox: '0 0 256 256', title: 'Bronze Medal' },
+  animal_lion_happy_fill_v1: { sprite: animalsSprite, viewBox: '0 0 256 256', title: 'Happy Lion' },
+  animal_elephant_calm_fill_v1: { sprite: animalsSprite, viewBox: '0 0 256 256', title: 'Calm Elephant' },
+  animal_giraffe_curious_fill_v1: { sprite: animalsSprite, viewBox: '0 0 256 256', title: 'Curious Giraffe' },
+  school_book_fill_v1: { sprite: schoolSprite, viewBox: '0 0 256 256', title: 'School Book' },
+  school_pencil_fill_v1: { sprite: schoolSprite, viewBox: '0 0 256 256', title: 'Pencil' },
+  emotion_happy_fill_v1: { sprite: emotionsSprite, viewBox: '0 0 256 256', title: 'Happy Face' },
+  emotion_proud_fill_v1: { sprite: emotionsSprite, viewBox: '0 0 256 256', title: 'Proud Face' },
+  nature_sun_fill_v1: { sprite: natureSprite, viewBox: '0 0 256 256', title: 'Bright Sun' },
+} as const;
+
+export type StickerId = keyof typeof STICKERS;
+
+export const STICKER_IDS = Object.keys(STICKERS) as StickerId[];
+
+interface StickerProps extends Omit<SVGProps<SVGSVGElement>, 'id'> {
+  id: StickerId;
+  /** Accessible name; defaults to the sticker's English title. */
+  title?: string;
+  /** Hide from assistive technology when the sticker is purely ornamental. */
+  decorative?: boolean;
+  size?: number | string;
+  /** Flip horizontally, e.g. LocalizedSticker.mirror in an RTL locale. */
+  mirror?: boolean;
+}
+
+export function Sticker({ id, title, decorative = false, size = 64, mirror = false, style, ...props }: StickerProps) {
+  const sticker = STICKERS[id];
+  return (
+    <svg
+      viewBox={sticker.viewBox}
+      width={size}
+      height={size}
+      role={decorative ? undefined : 'img'}
+      aria-hidden={decorative || undefined}
+      focusable="false"
+      style={mirror ? { transform: 'scaleX(-1)', ...style } : style}
+      {...props}
+    >
+      {!decorative && <title>{title ?? sticker.title}</title>}
+      <use href={`${sticker.sprite}#${id}`} />
+    </svg>
+  );
+}
+
+export default Sticker;
@@ -2,30 +2,519 @@
 """
 QXP Vite + React + Tailwind Marketing Starter Generator
 Creates a minimal, production-ready marketing site with GTM + CRM hooks
+
+Regeneration is incremental: a manifest of content hashes records what the
+previous run emitted, so only files whose rendered content changed are
+rewritten and files the generator never created (node_modules, .env, dist)
+are left alone. Pass --clean to wipe the output directory first.
+
+Rendering produces an in-memory tree of path -> bytes before anything touches
+disk; --dry-run reports what would change and --diff prints a unified diff
+against the existing output directory, both without writing. --zip streams
+the same tree into a reproducible archive instead of a directory.
+
+--profile PATH records per-stage durations, bytes and file counts (JSON lines,
+or a Chrome trace for *.json); --quiet drops the progress output.
+
+Output is split into named sections (--list-sections). --only 'lib/*' or
+--skip readme regenerate a subset and leave every other file untouched.
+--watch keeps an output directory in sync while templates or --config change.
+
+Every brand value (phone, colors, copy, meta) comes from a tenant config, so
+the same templates serve one site per school:
+
+    from create_vite_starter import generate
+    generate({"slug": "greenhill", "brand_name": "Greenhill"}, "sites/greenhill")
+
+or, for a whole rollout, a JSON/CSV file of tenants rendered across a pool:
+
+    python create_vite_starter.py --batch tenants.csv --out-dir sites
 """
 
 import os
+import re
+import sys
+import csv
+import io
+import html
 import json
+import time
+import difflib
+import fnmatch
+import hashlib
+import importlib.util
+import itertools
+import contextlib
+import marshal
+import argparse
 import textwrap
 import zipfile
-import pathlib
 import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+import lead_protocol
+
+DEFAULT_ROOT = "./qxp-vite-tailwind-starter"
+MANIFEST = ".qxp-starter-manifest.json"
+
+DEFAULT_CONFIG = {
+  "slug": "qxp-vite-tailwind-starter",
+  "brand_name": "QXP",
+  "legal_name": "QXP Global",
+  "logo_url": "https://qxp.global/assets/img/qxp-logo.png",
+  "title": "QXP – Kenya's Leading School Operations Suite",
+  "description": "QXP - Kenya's leading school operations suite. LMS for CBC, 8-4-4, BNC & IBE.",
+  "tagline": "Kenya's leading school operations suite.",
+  "headline": "Kenya's Leading School Operations Suite",
+  "subheadline": "LMS for CBC, 8-4-4, BNC & IBE — built for schools, teachers, students and parents.",
+  "phone_e164": "254700779977",
+  "phone_intl": "+254 700 779 977",
+  "email": "info@qxp.global",
+  "address_lines": [
+    "Nairobi Office - HQ",
+    "01, School Lane, Westlands",
+    "Nairobi, Kenya"
+  ],
+  "hours": "Mon–Fri: 8:00 AM – 6:00 PM EAT",
+  "whatsapp_greeting": "Hello QXP, I'd like to learn more about QXP LMS.",
+  "gtm_id": "GTM-XXXXXXX",
+  "gtm_load": "eager",
+  "gtm_defer_timeout_ms": 4000,
+  "analytics_beacon": "",
+  "crm_api": "",
+  "crm_ingest": False,
+  "prerender": False,
+  "npm_cache": "",
+  "colors": {
+    "qxp-navy": "#070745",
+    "qxp-navy-dark": "#0707a4",
+    "qxp-blue": "#0734ff",
+    "qxp-blue-bright": "#079dff",
+    "qxp-yellow": "#f2b91a",
+    "qxp-green": "#78c054",
+    "qxp-red": "#c72727"
+  }
+}
+
+SLUG_RE = re.compile(r"^[a-z0-9][a-z0-9._-]*$")
+# Color names become tailwind.config.js keys and class names (bg-qxp-red).
+COLOR_NAME_RE = re.compile(r"^[A-Za-z][A-Za-z0-9_-]*$")
+COLOR_RE = re.compile(r"^#(?:[0-9a-fA-F]{3}|[0-9a-fA-F]{6}|[0-9a-fA-F]{8})$")
+# eager: inject GTM before the first render. deferred: wait for idle time or
+# the first interaction (at most gtm_defer_timeout_ms), buffering events.
+GTM_LOAD_MODES = ("eager", "deferred")
+# Fields each form kind sends to the CRM (src/lead_protocol.py). Rendered into
+# lib/crm.js as expectedFields.
+LEAD_FIELDS = lead_protocol.LEAD_FIELDS
+
+
+# ---------------------------------------------------------------------------
+# Instrumentation
+#
+# Every stage of a run is recorded as a span (name, start, duration, plus
+# bytes/files where it applies) when a Profiler is passed in. --profile writes
+# the spans as JSON lines, or as a Chrome trace (chrome://tracing, Perfetto)
+# when the path ends in .json.
+# ---------------------------------------------------------------------------
+
+def stage_of(rel):
+    """The generator section an output file belongs to."""
+    if rel == "package.json":
+        return "package.json"
+    if rel == "README.md":
+        return "readme"
+    if rel.startswith("src/lib/"):
+        return "lib"
+    if rel.startswith("src/components/"):
+        return "components"
+    if rel in ("src/App.jsx", "src/main.jsx", "src/routes.js") or rel.startswith("src/pages/"):
+        return "pages"
+    if rel == "src/styles.css":
+        return "styles"
+    if rel.startswith("ingest/"):
+        return "ingest"
+    return "configs"
+
+
+class Profiler:
+    """Collects timed spans for one process."""
+
+    def __init__(self, enabled=True, **tags):
+        self.enabled = enabled
+        self.tags = tags
+        self.spans = []
+
+    @contextlib.contextmanager
+    def span(self, name, cat="generator", **fields):
+        """Time the block; the yielded dict can be updated with bytes/files."""
+        if not self.enabled:
+            yield fields
+            return
+        start = time.perf_counter_ns()
+        try:
+            yield fields
+        finally:
+            self.spans.append({"name": name, "cat": cat, "start_ns": start,
+                               "dur_ns": time.perf_counter_ns() - start,
+                               "pid": os.getpid(), **self.tags, **fields})
+
+
+NULL_PROFILER = Profiler(enabled=False)
+
+
+def write_profile(spans, path):
+    """Write spans as JSON lines, or a Chrome trace if path ends in .json."""
+    origin = min((s["start_ns"] for s in spans), default=0)
+    out = sys.stdout if path == "-" else open(path, "w")
+    try:
+        if path.endswith(".json"):
+            events = [{
+                "name": s["name"], "cat": s["cat"], "ph": "X",
+                "ts": (s["start_ns"] - origin) / 1000, "dur": s["dur_ns"] / 1000,
+                "pid": s["pid"], "tid": s["pid"],
+                "args": {k: v for k, v in s.items()
+                         if k not in ("name", "cat", "start_ns", "dur_ns", "pid")},
+            } for s in spans]
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, out)
+        else:
+            for s in spans:
+                record = {k: v for k, v in s.items() if k not in ("start_ns", "dur_ns")}
+                record["start_ms"] = round((s["start_ns"] - origin) / 1e6, 4)
+                record["duration_ms"] = round(s["dur_ns"] / 1e6, 4)
+                out.write(json.dumps(record) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+def _stat(path):
+    try:
+        return os.stat(path)
+    except FileNotFoundError:
+        return None
+
+
+def _atomic_write(path, data):
+    """Write data next to path and rename it into place.
+
+    The rename means a watching dev server never sees a half-written file.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.{os.getpid()}.tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+class IncrementalWriter:
+    """Syncs an in-memory file tree to root, touching only what changed.
+
+    With dry_run=True nothing is written or deleted; the report (and
+    diff_tree) still say what a real run would do.
+    """
+
+    def __init__(self, root, clean=False, dry_run=False):
+        self.root = root
+        self.dry_run = dry_run
+        self.manifest_bytes = None  # as last saved; an unchanged manifest is not rewritten
+        self.previous = {} if clean else self._load_manifest()
+        self.files = {}
+        self.added, self.changed, self.unchanged, self.removed = [], [], [], []
+        self.bytes_written = 0
+
+    def _load_manifest(self):
+        try:
+            with open(os.path.join(self.root, MANIFEST), "rb") as f:
+                self.manifest_bytes = f.read()
+            return json.loads(self.manifest_bytes).get("files", {})
+        except (OSError, ValueError):
+            return {}
+
+    def _is_current(self, rel, path, st, digest, data):
+        prev = self.previous.get(rel)
+        if prev and prev["sha256"] == digest and prev["size"] == st.st_size \
+                and prev["mtime_ns"] == st.st_mtime_ns:
+            return True
+        # Stat mismatch (hand edit, touched file, no manifest): compare bytes.
+        if st.st_size != len(data):
+            return False
+        with open(path, "rb") as f:
+            return f.read() == data
+
+    def emit(self, rel, content):
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        digest = hashlib.sha256(data).hexdigest()
+        path = os.path.join(self.root, rel)
+        st = _stat(path)
+        if st is not None and self._is_current(rel, path, st, digest, data):
+            self.unchanged.append(rel)
+        else:
+            (self.added if st is None else self.changed).append(rel)
+            if self.dry_run:
+                return
+            _atomic_write(path, data)
+            self.bytes_written += len(data)
+            st = os.stat(path)
+        self.files[rel] = {"sha256": digest, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+    def write_tree(self, tree, profiler=NULL_PROFILER, partial=False, owned=()):
+        """Emit every file of tree in one pass and finish the sync.
+
+        A partial tree (some sections only) keeps the files and manifest
+        entries of everything it did not render. owned lists the outputs of
+        the sections it did render; those missing from tree are removed.
+        """
+        for stage, items in itertools.groupby(tree.items(), key=lambda item: stage_of(item[0])):
+            with profiler.span(f"write:{stage}") as span:
+                files, written = len(self.added) + len(self.changed), self.bytes_written
+                for rel, data in items:
+                    self.emit(rel, data)
+                span.update(files=len(self.added) + len(self.changed) - files,
+                            bytes=self.bytes_written - written)
+        with profiler.span("finish") as span:
+            report = self.finish(tree, partial, owned)
+            span.update(removed=len(report["removed"]))
+        return report
+
+    def finish(self, tree=None, partial=False, owned=()):
+        """Remove files dropped since the last run and save the manifest."""
+        emitted = set(tree) if tree is not None else set(self.files)
+        if partial:
+            dropped = set(owned) - emitted
+            self.files = {rel: entry for rel, entry in {**self.previous, **self.files}.items()
+                          if rel not in dropped}
+            emitted = set(self.previous) - dropped
+        for rel in sorted(set(self.previous) - emitted):
+            path = os.path.join(self.root, rel)
+            if not os.path.exists(path):
+                continue
+            self.removed.append(rel)
+            if self.dry_run:
+                continue
+            os.unlink(path)
+            parent = os.path.dirname(path)
+            while os.path.abspath(parent) != os.path.abspath(self.root):
+                try:
+                    os.rmdir(parent)
+                except OSError:
+                    break
+                parent = os.path.dirname(parent)
+        manifest = {"version": 1, "files": dict(sorted(self.files.items()))}
+        data = json.dumps(manifest, indent=2).encode("utf-8")
+        if not self.dry_run and data != self.manifest_bytes:
+            _atomic_write(os.path.join(self.root, MANIFEST), data)
+            self.manifest_bytes = data
+        return {
+            "added": self.added,
+            "changed": self.changed,
+            "unchanged": self.unchanged,
+            "removed": self.removed,
+            "bytes_written": self.bytes_written,
+        }
+
+
+def diff_tree(tree, root, partial=False, owned=()):
+    """Yield a unified diff between the files under root and tree."""
+    report = IncrementalWriter(root, dry_run=True).write_tree(tree, partial=partial, owned=owned)
+
+    def lines(data):
+        return data.decode("utf-8", "replace").splitlines(keepends=True)
+
+    def on_disk(rel):
+        with open(os.path.join(root, rel), "rb") as f:
+            return lines(f.read())
+
+    for rel in report["added"] + report["changed"] + report["removed"]:
+        old = [] if rel in report["added"] else on_disk(rel)
+        new = [] if rel in report["removed"] else lines(tree[rel])
+        yield from difflib.unified_diff(
+            old, new,
+            fromfile="/dev/null" if rel in report["added"] else f"a/{rel}",
+            tofile="/dev/null" if rel in report["removed"] else f"b/{rel}")
+
+
+# ---------------------------------------------------------------------------
+# Templates
+#
+# Placeholders are written %%name%% or %%name|filter%%. Filters escape the
+# value for where it lands: js (a JS string/array literal), jsx (JSX text),
+# html (HTML text/attribute) and raw (as-is, the default).
+# ---------------------------------------------------------------------------
+
+PLACEHOLDER_RE = re.compile(r"%%([a-z_][a-z0-9_]*)(?:\|([a-z]+))?%%")
+
+
+def _js(value):
+    if isinstance(value, str):
+        quote = '"' if "'" in value and '"' not in value else "'"
+        escaped = value.replace("\\", "\\\\").replace(quote, "\\" + quote).replace("\n", "\\n")
+        return f"{quote}{escaped}{quote}"
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(_js(v) for v in value) + "]"
+    return json.dumps(value)
+
+
+def _jsx(value):
+    return (str(value).replace("{", "&#123;").replace("}", "&#125;")
+            .replace("<", "&lt;").replace(">", "&gt;"))
+
+
+def _html(value):
+    return html.escape(str(value), quote=False).replace('"', "&quot;")
+
+
+FILTERS = {"raw": str, "js": _js, "jsx": _jsx, "html": _html}
+
+
+class _FilteredValues(dict):
+    """(name, filter) -> escaped text, computed once per render_tree call."""
+
+    def __init__(self, context):
+        super().__init__()
+        self.context = context
+
+    def __missing__(self, key):
+        name, filt = key
+        value = self[key] = FILTERS[filt](self.context[name])
+        return value
+
 
-root = "./qxp-vite-tailwind-starter"
+class CompiledTemplate:
+    """A template split once into alternating literal text and placeholders."""
 
-print("🚀 Creating QXP Vite Marketing Starter...")
+    __slots__ = ("rel", "parts")
 
-# Clean up if exists
-if os.path.exists(root):
-    print(f"📁 Removing existing {root}...")
-    shutil.rmtree(root)
+    def __init__(self, rel, source):
+        self.rel = rel
+        parts, pos = [], 0
+        for m in PLACEHOLDER_RE.finditer(source):
+            name, filt = m.group(1), m.group(2) or "raw"
+            if filt not in FILTERS:
+                raise ValueError(f"{rel}: unknown filter {filt!r} for {name!r}")
+            parts.append(source[pos:m.start()])
+            parts.append((name, filt))
+            pos = m.end()
+        parts.append(source[pos:])
+        self.parts = tuple(parts)
+
+    @classmethod
+    def from_parts(cls, rel, parts):
+        tpl = cls.__new__(cls)
+        tpl.rel, tpl.parts = rel, tuple(parts)
+        return tpl
+
+    def render(self, values):
+        """Render with a context dict or a shared _FilteredValues."""
+        if not isinstance(values, _FilteredValues):
+            values = _FilteredValues(values)
+        out = list(self.parts)
+        try:
+            for i in range(1, len(out), 2):
+                out[i] = values[out[i]]
+        except KeyError as e:
+            raise ValueError(f"{self.rel}: missing config value {e.args[0]!r}") from None
+        return "".join(out)
+
+
+# Raw template sources, keyed by output path. They are dedented and parsed
+# only when the compiled cache (see load_templates) is missing or stale.
+TEMPLATES = {}
+
+# Every individually addressable part of the starter, in render order.
+SECTIONS = {}
+
+# Derived placeholders and the config keys they are computed from.
+DERIVED_INPUTS = {
+    "tailwind_colors": ("colors",),
+    "readme_colors": ("colors",),
+    "lead_fields": (),
+    "route_base": ("prerender",),
+    "routing": ("prerender",),
+}
+
+
+class Section:
+    """A named part of the starter with the files it writes.
+
+    Template sections derive their config inputs from their placeholders;
+    sections with a build callable (config -> {path: text}) declare them.
+    """
+
+    __slots__ = ("name", "outputs", "declared_inputs", "build")
+
+    def __init__(self, name, outputs, inputs=(), build=None):
+        self.name = name
+        self.outputs = tuple(outputs)
+        self.declared_inputs = tuple(inputs)
+        self.build = build
+
+    @property
+    def stage(self):
+        return stage_of(self.outputs[0])
+
+    def inputs(self, templates=None):
+        if self.build is not None:
+            return self.declared_inputs
+        templates = templates or compiled_templates()
+        names = set(self.declared_inputs)
+        for rel in self.outputs:
+            for name, _ in templates[rel].parts[1::2]:
+                names.update(DERIVED_INPUTS.get(name, (name,)))
+        return tuple(sorted(names))
+
+
+def section_name(rel):
+    """Default section name for an output path: src/lib/gtm.js -> lib/gtm."""
+    special = {"src/App.jsx": "app", "src/main.jsx": "main", "src/styles.css": "styles",
+               "README.md": "readme"}
+    if rel in special:
+        return special[rel]
+    if rel.startswith("src/"):
+        return os.path.splitext(rel[len("src/"):])[0]
+    return rel
+
+
+def register_section(section):
+    if section.name in SECTIONS:
+        raise ValueError(f"duplicate section {section.name!r}")
+    SECTIONS[section.name] = section
+    return section
+
+
+def template(rel, source, name=None):
+    TEMPLATES[rel] = source
+    register_section(Section(name or section_name(rel), (rel,)))
+
+
+def select_sections(only=None, skip=None):
+    """Sections matching any only pattern and no skip pattern.
+
+    Patterns are shell globs matched against section names and output
+    paths, e.g. only=["lib/*"] or skip=["readme"].
+    """
+    def matches(section, pattern):
+        return fnmatch.fnmatchcase(section.name, pattern) or any(
+            fnmatch.fnmatchcase(rel, pattern) for rel in section.outputs)
+
+    for pattern in (only or []) + (skip or []):
+        if not any(matches(sec, pattern) for sec in SECTIONS.values()):
+            raise ValueError(f"no section matches {pattern!r} (see --list-sections)")
+    return [sec for sec in SECTIONS.values()
+            if (not only or any(matches(sec, p) for p in only))
+            and not any(matches(sec, p) for p in skip or [])]
 
-os.makedirs(root, exist_ok=True)
 
 # package.json
-print("📦 Creating package.json...")
-package_json = {
-  "name": "qxp-vite-tailwind-starter",
+# With prerender, the build also renders every route to static HTML.
+PRERENDER_BUILD = ("vite build && vite build --ssr src/entry-server.jsx --outDir dist-ssr"
+                   " && node prerender.js")
+PACKAGE_JSON = {
   "version": "1.0.0",
   "private": True,
   "type": "module",
@@ -46,88 +535,94 @@ package_json = {
     "vite": "^5.2.0"
   }
 }
-with open(f"{root}/package.json", "w") as f:
-    f.write(json.dumps(package_json, indent=2))
+
+
+def _package_json(config):
+    data = {"name": config["slug"], **PACKAGE_JSON}
+    if config["prerender"]:
+        data["scripts"] = {**data["scripts"], "build": PRERENDER_BUILD}
+    if config["crm_ingest"]:
+        data["scripts"] = {**data["scripts"], "ingest": "python3 ingest/server.py"}
+    return {"package.json": json.dumps(data, indent=2)}
+
+
+register_section(Section("package.json", ["package.json"], inputs=["crm_ingest", "prerender", "slug"],
+                         build=_package_json))
+
 
 # vite.config.js
-print("⚙️  Creating vite.config.js...")
-with open(f"{root}/vite.config.js", "w") as f:
-    f.write(textwrap.dedent("""\
+template("vite.config.js", """\
     import { defineConfig } from 'vite'
     import react from '@vitejs/plugin-react'
 
     export default defineConfig({
       plugins: [react()],
+      // dist/.vite/manifest.json maps source modules to built chunks; post-build
+      // steps such as resource hints read it.
+      build: { manifest: true },
     })
-    """))
+    """)
 
 # postcss.config.js
-with open(f"{root}/postcss.config.js", "w") as f:
-    f.write(textwrap.dedent("""\
+template("postcss.config.js", """\
     export default {
       plugins: {
         tailwindcss: {},
         autoprefixer: {},
       },
     }
-    """))
+    """)
 
 # tailwind.config.js
-with open(f"{root}/tailwind.config.js", "w") as f:
-    f.write(textwrap.dedent("""\
+template("tailwind.config.js", """\
     /** @type {import('tailwindcss').Config} */
     export default {
       content: ["./index.html","./src/**/*.{js,jsx,ts,tsx}"],
       theme: {
         extend: {
           colors: {
-            'qxp-navy': '#070745',
-            'qxp-navy-dark': '#0707a4',
-            'qxp-blue': '#0734ff',
-            'qxp-blue-bright': '#079dff',
-            'qxp-yellow': '#f2b91a',
-            'qxp-green': '#78c054',
-            'qxp-red': '#c72727',
+    %%tailwind_colors%%
           }
         },
       },
       plugins: [],
     }
-    """))
+    """)
 
 # index.html
-print("🌐 Creating index.html...")
-with open(f"{root}/index.html", "w") as f:
-    f.write(textwrap.dedent("""\
+template("index.html", """\
     <!doctype html>
     <html lang="en">
       <head>
         <meta charset="UTF-8" />
         <meta name="viewport" content="width=device-width, initial-scale=1.0" />
-        <meta name="description" content="QXP - Kenya's leading school operations suite. LMS for CBC, 8-4-4, BNC & IBE.">
-        <title>QXP – Kenya's Leading School Operations Suite</title>
+        <meta name="description" content="%%description|html%%">
+        <title>%%title|html%%</title>
       </head>
       <body class="bg-white">
         <div id="root"></div>
         <script type="module" src="/src/main.jsx"></script>
       </body>
     </html>
-    """))
+    """)
 
 # .env.example
-print("🔐 Creating .env.example...")
-with open(f"{root}/.env.example", "w") as f:
-    f.write(textwrap.dedent("""\
+template(".env.example", """\
     # Google Tag Manager ID (optional)
-    VITE_GTM_ID=GTM-XXXXXXX
+    VITE_GTM_ID=%%gtm_id%%
+    # eager: load GTM before first render; deferred: after idle/first interaction
+    VITE_GTM_LOAD=%%gtm_load%%
+
+    # Endpoint that receives batched events via navigator.sendBeacon (optional)
+    VITE_ANALYTICS_BEACON=%%analytics_beacon%%
 
     # CRM API Endpoint (optional - falls back to console logging)
-    VITE_CRM_API=
-    """))
+    # With the generated ingest service (npm run ingest): http://127.0.0.1:8788/leads
+    VITE_CRM_API=%%crm_api%%
+    """)
 
 # .gitignore
-with open(f"{root}/.gitignore", "w") as f:
-    f.write(textwrap.dedent("""\
+template(".gitignore", """\
     # Logs
     logs
     *.log
@@ -142,6 +637,9 @@ with open(f"{root}/.gitignore", "w") as f:
     dist-ssr
     *.local
 
+    # Lead ingest database
+    ingest/*.db*
+
     # Editor directories and files
     .vscode/*
     !.vscode/extensions.json
@@ -155,18 +653,599 @@ with open(f"{root}/.gitignore", "w") as f:
 
     .env
     .env.local
-    """))
+    .qxp-starter-manifest.json
+    """)
+
+
+# .npmrc (only when tenants share a package cache)
+def _npmrc(config):
+    if not config["npm_cache"]:
+        return {}
+    return {".npmrc": textwrap.dedent(f"""\
+        # Shared package cache: new tenant sites install from disk when they can
+        cache={config["npm_cache"]}
+        prefer-offline=true
+        audit=false
+        fund=false
+        """)}
+
+
+register_section(Section(".npmrc", [".npmrc"], inputs=["npm_cache"], build=_npmrc))
+
+# ingest/ (only with crm_ingest): a lead-ingest service for VITE_CRM_API and
+# its benchmark. Python sources, so they are raw strings rather than """.
+# ingest/protocol.py is a copy of src/lead_protocol.py, which crm_standin.py
+# imports too. The generated sources leave the brand out of their docstrings,
+# so no brand name can break their syntax.
+INGEST_FILES = ("ingest/protocol.py", "ingest/server.py", "ingest/bench.py")
+
+TEMPLATES["ingest/server.py"] = r'''
+    #!/usr/bin/env python3
+    """
+    Lead ingest service
+    Generated by the QXP starter generator; do not edit by hand.
+
+    Receives the leads lib/crm.js posts to VITE_CRM_API and stores them in
+    SQLite:
+
+        python3 ingest/server.py                      # http://127.0.0.1:8788/leads
+        python3 ingest/server.py --db leads.db --port 9000
+
+    A request carries one lead ({id, kind, ...fields}) or a batch
+    ({"leads": [...]}). Every lead is validated against LEAD_FIELDS, the schema
+    crm.js renders as expectedFields. Valid leads go onto a bounded in-memory
+    queue. A single writer drains it and commits up to --batch-size leads per
+    transaction, in a SQLite database in WAL mode. A request is answered once its
+    leads are committed, so one fsync covers every request in the batch. When the
+    queue is full, requests wait up to --enqueue-timeout for room. After that they
+    get 503 with Retry-After, which the crm.js outbox retries. Lead ids are
+    primary keys, so retried leads are stored once.
+
+    Only the standard library is used. ingest/bench.py measures throughput.
+    """
+
+    import os
+    import sys
+    import json
+    import time
+    import uuid
+    import signal
+    import asyncio
+    import sqlite3
+    import argparse
+    from concurrent.futures import ThreadPoolExecutor
+    from urllib.parse import urlsplit
+
+    from protocol import MAX_BODY, BadRequest, http_response, parse_leads, read_request
+
+    DEFAULT_HOST = "127.0.0.1"
+    DEFAULT_PORT = 8788
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS leads (
+        id TEXT PRIMARY KEY,
+        kind TEXT NOT NULL,
+        email TEXT,
+        received_at REAL NOT NULL,
+        payload TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS leads_received_at ON leads (received_at);
+    """
+    INSERT = "INSERT OR IGNORE INTO leads (id, kind, email, received_at, payload) VALUES (?, ?, ?, ?, ?)"
+
+
+    class LeadStore:
+        """SQLite in WAL mode, used only from its own writer thread."""
+
+        def __init__(self, path, synchronous="NORMAL"):
+            self.path = path
+            self.synchronous = synchronous
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lead-writer")
+            self.db = None
+
+        def _open(self):
+            self.db = sqlite3.connect(self.path, isolation_level=None)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            # NORMAL in WAL mode only risks the last commits on power loss.
+            self.db.execute(f"PRAGMA synchronous={self.synchronous}")
+            self.db.executescript(SCHEMA)
+
+        def _write(self, rows):
+            before = self.db.total_changes
+            self.db.execute("BEGIN")
+            try:
+                self.db.executemany(INSERT, rows)
+                self.db.execute("COMMIT")
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                raise
+            return self.db.total_changes - before
+
+        def _count(self):
+            return self.db.execute("SELECT count(*) FROM leads").fetchone()[0]
+
+        async def run(self, fn, *args):
+            return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+        async def open(self):
+            await self.run(self._open)
+
+        async def write(self, rows):
+            """Insert rows in one transaction; returns how many were new."""
+            return await self.run(self._write, rows)
+
+        async def count(self):
+            return await self.run(self._count)
+
+        async def close(self):
+            if self.db is not None:
+                await self.run(self.db.close)
+            self.executor.shutdown()
+
+
+    class IngestService:
+        """HTTP front end, bounded queue and batching writer."""
+
+        def __init__(self, store, path="/leads", queue_size=10000, batch_size=500,
+                     enqueue_timeout=0.5, cors_origin="*"):
+            self.store = store
+            self.path = path
+            self.queue = asyncio.Queue(maxsize=queue_size)
+            self.batch_size = batch_size
+            self.enqueue_timeout = enqueue_timeout
+            self.cors = {
+                "Access-Control-Allow-Origin": cors_origin,
+                "Access-Control-Allow-Methods": "POST, OPTIONS",
+                "Access-Control-Allow-Headers": "Content-Type, Idempotency-Key",
+                "Access-Control-Max-Age": "600",
+            }
+            self.stats = {"requests": 0, "leads": 0, "stored": 0, "rejected": 0, "shed": 0, "batches": 0}
+            self.server = None
+            self.writer_task = None
+
+        async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+            await self.store.open()
+            self.writer_task = asyncio.create_task(self._writer())
+            self.server = await asyncio.start_server(self._serve, host, port, backlog=1024)
+            return self.server.sockets[0].getsockname()[:2]
+
+        async def stop(self):
+            """Stop accepting requests, then commit everything still queued."""
+            if self.server:
+                self.server.close()
+                await self.server.wait_closed()
+            await self.queue.join()
+            if self.writer_task:
+                self.writer_task.cancel()
+            await self.store.close()
+
+        async def _writer(self):
+            while True:
+                batch = [await self.queue.get()]
+                # Take whatever queued up during the previous commit, up to the limit.
+                while len(batch) < self.batch_size and not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+                # Any failure fails this batch only; the writer keeps serving the queue.
+                try:
+                    rows = [row for row, _ in batch]
+                    stored = await self.store.write(rows)
+                    self.stats["stored"] += stored
+                    self.stats["batches"] += 1
+                    outcome = None
+                except Exception as e:
+                    print(f"❌ Writing {len(batch)} leads failed: {type(e).__name__}: {e}", file=sys.stderr)
+                    outcome = e
+                for _, done in batch:
+                    if not done.done():
+                        if outcome is None:
+                            done.set_result(True)
+                        else:
+                            done.set_exception(outcome)
+                    self.queue.task_done()
+
+        async def _enqueue(self, rows):
+            """Queue rows and wait for their commit; False if the queue stayed full."""
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self.enqueue_timeout
+            futures = []
+            for row in rows:
+                done = loop.create_future()
+                try:
+                    self.queue.put_nowait((row, done))
+                except asyncio.QueueFull:
+                    try:
+                        await asyncio.wait_for(self.queue.put((row, done)), max(0.0, deadline - loop.time()))
+                    except asyncio.TimeoutError:
+                        # Rows queued so far are still committed; the client retries them with the same ids.
+                        return False
+                futures.append(done)
+            await asyncio.gather(*futures)
+            return True
+
+        async def handle(self, method, target, body):
+            """(status, JSON payload or None, extra headers) for one request."""
+            path = urlsplit(target).path
+            self.stats["requests"] += 1
+            if method == "OPTIONS":
+                return 204, None, {}
+            if method == "GET" and path == "/health":
+                return 200, {**self.stats, "queued": self.queue.qsize()}, {}
+            if path != self.path:
+                return 404, {"error": f"no such endpoint {path}"}, {}
+            if method != "POST":
+                return 405, {"error": "use POST"}, {"Allow": "POST, OPTIONS"}
+            if body is None:
+                return 413, {"error": f"body larger than {MAX_BODY} bytes"}, {}
+
+            leads, problems = parse_leads(body)
+            if problems:
+                self.stats["rejected"] += 1
+                return 422, {"error": "invalid leads", "problems": problems}, {}
+            now = time.time()
+            rows = []
+            for lead in leads:
+                lead_id = lead.get("id") or str(uuid.uuid4())
+                fields = {k: v for k, v in lead.items() if k not in ("id", "kind")}
+                rows.append((lead_id, lead["kind"], fields.get("email"), now,
+                             json.dumps(fields, ensure_ascii=False, separators=(",", ":"))))
+            try:
+                queued = await self._enqueue(rows)
+            except Exception:
+                return 503, {"error": "storage unavailable"}, {"Retry-After": "5"}
+            if not queued:
+                self.stats["shed"] += 1
+                return 503, {"error": "busy, retry later"}, {"Retry-After": "1"}
+            self.stats["leads"] += len(rows)
+            return 200, {"ok": True, "accepted": len(rows)}, {}
+
+        async def _serve(self, reader, writer):
+            try:
+                while True:
+                    try:
+                        request = await read_request(reader)
+                    except BadRequest as e:
+                        writer.write(http_response(400, {"error": str(e)}, self.cors, False))
+                        await writer.drain()
+                        break
+                    if request is None:
+                        break
+                    method, target, headers, body = request
+                    status, payload, extra = await self.handle(method, target, body)
+                    # An oversized body is never read, so the connection cannot be reused.
+                    keep_alive = body is not None and headers.get("connection", "").lower() != "close"
+                    writer.write(http_response(status, payload, {**self.cors, **extra}, keep_alive))
+                    await writer.drain()
+                    if not keep_alive:
+                        break
+            except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+                pass
+            except asyncio.CancelledError:
+                pass  # shutting down with the connection idle
+            finally:
+                writer.close()
+
+
+    def build_parser():
+        parser = argparse.ArgumentParser(description="Store leads posted by lib/crm.js in SQLite.")
+        parser.add_argument("--host", default=DEFAULT_HOST)
+        parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="0 picks a free port")
+        parser.add_argument("--path", default="/leads", help="endpoint path (default: /leads)")
+        parser.add_argument("--db", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "leads.db"),
+                            help="SQLite database (default: ingest/leads.db)")
+        parser.add_argument("--queue-size", type=int, default=10000, help="leads buffered before backpressure")
+        parser.add_argument("--batch-size", type=int, default=500, help="most leads per transaction")
+        parser.add_argument("--enqueue-timeout", type=float, default=0.5,
+                            help="seconds a request waits for queue space before 503")
+        parser.add_argument("--synchronous", choices=("OFF", "NORMAL", "FULL"), default="NORMAL",
+                            help="SQLite synchronous pragma (default: NORMAL)")
+        parser.add_argument("--cors-origin", default="*", help="Access-Control-Allow-Origin value")
+        return parser
+
+
+    async def serve(args):
+        service = IngestService(LeadStore(args.db, args.synchronous), args.path, args.queue_size,
+                                args.batch_size, args.enqueue_timeout, args.cors_origin)
+        host, port = await service.start(args.host, args.port)
+        print(f"📥 Lead ingest on http://{host}:{port}{args.path} -> {args.db}", flush=True)
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except (NotImplementedError, RuntimeError):
+                pass  # Windows: Ctrl+C raises KeyboardInterrupt instead
+        try:
+            await stop.wait()
+        finally:
+            await service.stop()
+            print(f"✅ Stopped; {service.stats['stored']} leads stored", flush=True)
+
+
+    def main(argv=None):
+        args = build_parser().parse_args(argv)
+        try:
+            asyncio.run(serve(args))
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+
+    if __name__ == "__main__":
+        sys.exit(main())
+    '''.lstrip("\n")
+
+TEMPLATES["ingest/bench.py"] = r'''
+    #!/usr/bin/env python3
+    """
+    Lead ingest benchmark
+    Generated by the QXP starter generator; do not edit by hand.
+
+    Starts ingest/server.py on a scratch database in a separate process and
+    posts synthetic leads to it over keep-alive connections as fast as it
+    accepts them:
+
+        python3 ingest/bench.py                        # 20000 single-lead requests
+        python3 ingest/bench.py --leads 50000 --batch 10 --min-rate 2000
+        python3 ingest/bench.py --url http://127.0.0.1:8788/leads
+
+    The report gives leads per second, request latency (p50/p95/p99/max) and
+    how many requests were shed with 503. It then checks that the database holds
+    every acknowledged lead. --min-rate exits 1 when throughput falls below it.
+    Latency is measured per request, from send to response. Options the
+    benchmark does not know are passed to server.py, e.g. --batch-size 200.
+    """
+
+    import os
+    import sys
+    import json
+    import time
+    import uuid
+    import random
+    import sqlite3
+    import asyncio
+    import argparse
+    import tempfile
+    import subprocess
+    from urllib.parse import urlsplit
+
+    HERE = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, HERE)
+
+    from protocol import LEAD_FIELDS, percentile, read_headers  # noqa: E402
+
+
+    def synthetic_lead(rng, kind):
+        values = {
+            "name": f"Lead {rng.randrange(10 ** 6)}",
+            "email": f"lead{rng.randrange(10 ** 9)}@example.com",
+            "school": "Benchmark Academy",
+            "phone": f"+2547{rng.randrange(10 ** 8):08d}",
+            "message": "Tell me more.",
+            "role": "Principal",
+            "date": "2026-01-15",
+            "time": "10:00",
+            "notes": "",
+            "source": "bench",
+            "page_path": "/",
+        }
+        return {"id": str(uuid.UUID(int=rng.getrandbits(128))), "kind": kind,
+                **{name: values[name] for name in LEAD_FIELDS[kind]}}
+
+
+    async def _client(host, port, path, bodies, latencies, outcomes):
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            while bodies:
+                body, count = bodies.pop()
+                started = time.perf_counter()
+                writer.write((f"POST {path} HTTP/1.1\r\nHost: {host}:{port}\r\n"
+                              f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n")
+                             .encode("latin-1") + body)
+                status = int((await reader.readline()).split()[1])
+                headers = await read_headers(reader)
+                await reader.readexactly(int(headers.get("content-length", 0)))
+                latencies.append((time.perf_counter() - started) * 1000)
+                outcomes[status] = outcomes.get(status, 0) + count
+        finally:
+            writer.close()
+
+
+    async def run(url, leads, batch, connections, seed):
+        parts = urlsplit(url)
+        rng = random.Random(seed)
+        bodies = []
+        for _ in range(0, leads, batch):
+            chunk = [synthetic_lead(rng, "demo" if rng.random() < 0.3 else "contact") for _ in range(batch)]
+            bodies.append((json.dumps(chunk[0] if batch == 1 else {"leads": chunk}).encode(), batch))
+        requests = len(bodies)
+        latencies, outcomes = [], {}
+        started = time.perf_counter()
+        await asyncio.gather(*(_client(parts.hostname, parts.port, parts.path, bodies, latencies, outcomes)
+                               for _ in range(connections)))
+        elapsed = time.perf_counter() - started
+        latencies.sort()
+        return {
+            "requests": requests,
+            "leads_per_request": batch,
+            "connections": connections,
+            "elapsed_s": round(elapsed, 3),
+            "leads_per_s": round(outcomes.get(200, 0) / elapsed, 1),
+            "requests_per_s": round(requests / elapsed, 1),
+            "acknowledged": outcomes.get(200, 0),
+            "shed": outcomes.get(503, 0),
+            "latency_ms": {**{f"p{p}": round(percentile(latencies, p), 2) for p in (50, 95, 99)},
+                           "max": round(latencies[-1], 2)},
+        }
+
 
-# src structure
-print("📁 Creating directory structure...")
-os.makedirs(f"{root}/src/lib", exist_ok=True)
-os.makedirs(f"{root}/src/components", exist_ok=True)
-os.makedirs(f"{root}/src/pages", exist_ok=True)
+    def start_server(db, extra):
+        proc = subprocess.Popen([sys.executable, os.path.join(HERE, "server.py"), "--port", "0", "--db", db, *extra],
+                                stdout=subprocess.PIPE, text=True)
+        line = proc.stdout.readline()
+        if not line:
+            raise SystemExit("❌ ingest server did not start")
+        return proc, line.split()[-3]
+
+
+    def main(argv=None):
+        parser = argparse.ArgumentParser(description="Benchmark the lead ingest service.")
+        parser.add_argument("--url", help="benchmark a running server instead of starting one")
+        parser.add_argument("--leads", type=int, default=20000, help="leads to send (default: 20000)")
+        parser.add_argument("--batch", type=int, default=1, help="leads per request, as the crm.js outbox batches")
+        parser.add_argument("--connections", type=int, default=32, help="concurrent keep-alive connections")
+        parser.add_argument("--min-rate", type=float, help="exit 1 below this many leads per second")
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--json", action="store_true", help="print the report as JSON")
+        args, server_args = parser.parse_known_args(argv)
+
+        proc = db = None
+        url = args.url
+        with tempfile.TemporaryDirectory() as tmp:
+            if not url:
+                db = os.path.join(tmp, "bench.db")
+                proc, url = start_server(db, server_args)
+            try:
+                report = asyncio.run(run(url, args.leads, args.batch, args.connections, args.seed))
+            finally:
+                if proc:
+                    proc.terminate()
+                    proc.wait()
+            if db:
+                with sqlite3.connect(db) as conn:
+                    report["stored"] = conn.execute("SELECT count(*) FROM leads").fetchone()[0]
+
+        if args.json:
+            print(json.dumps(report, indent=2))
+        else:
+            lat = report["latency_ms"]
+            print(f"🚀 {report['acknowledged']} leads in {report['elapsed_s']}s: {report['leads_per_s']} leads/s "
+                  f"({report['requests']} requests of {args.batch}, {args.connections} connections)")
+            print(f"   latency ms: p50 {lat['p50']}  p95 {lat['p95']}  p99 {lat['p99']}  max {lat['max']}")
+            if report["shed"]:
+                print(f"   {report['shed']} leads shed with 503 (queue full)")
+        status = 0
+        # A shed request may have queued some of its leads before the queue filled.
+        stored = report.get("stored", report["acknowledged"])
+        if not report["acknowledged"] <= stored <= report["acknowledged"] + report["shed"]:
+            print(f"❌ {report['acknowledged']} leads acknowledged but {stored} stored")
+            status = 1
+        if args.min_rate is not None and report["leads_per_s"] < args.min_rate:
+            print(f"❌ {report['leads_per_s']} leads/s is below {args.min_rate:g}")
+            status = 1
+        return status
+
+
+    if __name__ == "__main__":
+        sys.exit(main())
+    '''.lstrip("\n")
+
+
+def _ingest(config):
+    if not config["crm_ingest"]:
+        return {}
+    templates = compiled_templates()
+    with open(lead_protocol.__file__, encoding="utf-8") as f:
+        protocol = f.read()
+    return {
+        "ingest/protocol.py": "# Copied from src/lead_protocol.py by the QXP starter generator; "
+                              "do not edit by hand.\n" + protocol,
+        **{rel: templates[rel].render({}) for rel in INGEST_FILES[1:]},
+    }
+
+
+register_section(Section("ingest", INGEST_FILES, inputs=["crm_ingest"], build=_ingest))
+
+# Prerendering (only with prerender): an SSR entry and the script that
+# renders each route into dist/ after the client and SSR builds.
+PRERENDER_FILES = ("src/entry-server.jsx", "prerender.js")
+
+TEMPLATES["src/entry-server.jsx"] = """\
+    // Server entry for prerendering; built by `vite build --ssr` and used
+    // only by prerender.js.
+    import React from 'react';
+    import { Writable } from 'node:stream';
+    import { renderToPipeableStream } from 'react-dom/server';
+    import App from './App.jsx';
+
+    export { documentTitle, notFound, routes } from './routes.js';
+
+    /** HTML for url, once every lazy page chunk has resolved. */
+    export function render(url) {
+      return new Promise((resolve, reject) => {
+        let html = '';
+        const sink = new Writable({
+          write(chunk, _encoding, done) {
+            html += chunk;
+            done();
+          },
+        });
+        sink.on('finish', () => resolve(html));
+        const stream = renderToPipeableStream(
+          <React.StrictMode>
+            <App url={url} />
+          </React.StrictMode>,
+          {
+            onAllReady: () => stream.pipe(sink),
+            onShellError: reject,
+            onError: reject,
+          },
+        );
+      });
+    }
+    """
+
+TEMPLATES["prerender.js"] = """\
+    // Renders every route to static HTML after `vite build` (npm run build).
+    //
+    // dist/index.html is the template: each route gets its markup inside
+    // <div id="root"> and its own <title>, written to dist/<path>/index.html
+    // (dist/404.html for unknown paths). main.jsx hydrates that markup, so
+    // content paints before the JS bundle arrives.
+    import fs from 'node:fs/promises';
+    import path from 'node:path';
+    import { pathToFileURL } from 'node:url';
+
+    const DIST = path.resolve('dist');
+    const SSR_ENTRY = path.resolve('dist-ssr/entry-server.js');
+    const ROOT = '<div id="root"></div>';
+
+    const escapeHtml = (text) => text.replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;');
+
+    function withTitle(html, title) {
+      const start = html.indexOf('<title>');
+      const end = html.indexOf('</title>', start);
+      if (start === -1 || end === -1) return html;
+      return html.slice(0, start) + `<title>${escapeHtml(title)}` + html.slice(end);
+    }
+
+    const template = await fs.readFile(path.join(DIST, 'index.html'), 'utf8');
+    if (!template.includes(ROOT)) throw new Error(`dist/index.html has no ${ROOT}`);
+    const { render, routes, notFound, documentTitle } = await import(pathToFileURL(SSR_ENTRY).href);
+
+    for (const route of [...routes, notFound]) {
+      const markup = await render(route.path ?? '/404');
+      const html = withTitle(template.replace(ROOT, `<div id="root">${markup}</div>`), documentTitle(route));
+      const file = route === notFound ? '404.html' : path.join('.', route.path, 'index.html');
+      await fs.mkdir(path.dirname(path.join(DIST, file)), { recursive: true });
+      await fs.writeFile(path.join(DIST, file), html);
+      console.log(`📄 ${file} (${Buffer.byteLength(html)} bytes)`);
+    }
+    await fs.rm(path.dirname(SSR_ENTRY), { recursive: true, force: true });
+    """
+
+
+def _prerender(config):
+    if not config["prerender"]:
+        return {}
+    templates = compiled_templates()
+    values = build_context(config)
+    return {rel: templates[rel].render(values) for rel in PRERENDER_FILES}
+
+
+register_section(Section("prerender", PRERENDER_FILES, inputs=["prerender"], build=_prerender))
 
 # styles.css
-print("🎨 Creating styles...")
-with open(f"{root}/src/styles.css", "w") as f:
-    f.write(textwrap.dedent("""\
+template("src/styles.css", """\
     @tailwind base;
     @tailwind components;
     @tailwind utilities;
@@ -178,41 +1257,42 @@ with open(f"{root}/src/styles.css", "w") as f:
       -webkit-font-smoothing: antialiased;
       -moz-osx-font-smoothing: grayscale;
     }
-    """))
+    """)
 
 # lib/gtm.js
-print("🔧 Creating library files...")
-with open(f"{root}/src/lib/gtm.js", "w") as f:
-    f.write(textwrap.dedent("""\
+template("src/lib/gtm.js", """\
     // Google Tag Manager helper
-    export function initGTM(gtmId = 'GTM-XXXXXXX') {
-      if (!gtmId || gtmId === 'GTM-XXXXXXX') {
-        console.warn('⚠️  GTM not initialized: set VITE_GTM_ID in .env');
-        window.dataLayer = window.dataLayer || [];
-        return;
-      }
-      
-      window.dataLayer = window.dataLayer || [];
-      window.dataLayer.push({ 
-        'gtm.start': new Date().getTime(), 
-        event: 'gtm.js' 
-      });
-      
-      const script = document.createElement('script');
-      script.async = true;
-      script.src = `https://www.googletagmanager.com/gtm.js?id=${gtmId}`;
-      document.head.appendChild(script);
-      
-      // Optional <noscript> iframe for browsers without JS
-      const noscript = document.createElement('noscript');
-      noscript.innerHTML = `<iframe src="https://www.googletagmanager.com/ns.html?id=${gtmId}" height="0" width="0" style="display:none;visibility:hidden"></iframe>`;
-      document.body.prepend(noscript);
-      
-      console.log('✅ GTM initialized:', gtmId);
+    //
+    // trackEvent only appends to a queue, so click handlers never wait on
+    // analytics. The queue is drained once per animation frame, after the
+    // frame paints, and each batch fans out to dataLayer, gtag and fbq. When
+    // the page is hidden or unloaded, whatever is still queued is flushed at
+    // once, and if VITE_ANALYTICS_BEACON is set, every event since the last
+    // beacon is posted there with navigator.sendBeacon.
+    //
+    // With VITE_GTM_LOAD=deferred (or gtm_load: deferred in the generator
+    // config) the GTM script is injected once the browser is idle or the
+    // visitor first interacts, whichever comes first, and at the latest after
+    // DEFER_TIMEOUT_MS. Until then events stay queued and are replayed in
+    // order once GTM starts.
+    const LOAD_MODE = import.meta.env.VITE_GTM_LOAD || %%gtm_load|js%%;
+    const DEFER_TIMEOUT_MS = %%gtm_defer_timeout_ms%%;
+    const BEACON_URL = import.meta.env.VITE_ANALYTICS_BEACON || %%analytics_beacon|js%%;
+    const BEACON_MAX_EVENTS = 20;
+    const INTERACTIONS = ['pointerdown', 'keydown', 'touchstart', 'scroll'];
+
+    let started = false;
+    let scheduled = false;
+    const queue = [];
+    const beaconBatch = [];
+
+    // Debug logging. Guard every call with import.meta.env.DEV: it is false in
+    // production builds, so the bundler removes the call and its arguments.
+    function debug(...args) {
+      console.log(...args);
     }
 
-    export function trackEvent(name, params = {}) {
-      window.dataLayer = window.dataLayer || [];
+    function dispatch(name, params) {
       window.dataLayer.push({ event: name, ...params });
       
       // Also send to gtag if available
@@ -228,34 +1308,315 @@ with open(f"{root}/src/lib/gtm.js", "w") as f:
       } catch (e) {
         // Silently fail
       }
-      
-      console.log('📊 Event tracked:', name, params);
+    }
+
+    function flush() {
+      scheduled = false;
+      if (!started) return;
+      for (const [name, params] of queue.splice(0)) dispatch(name, params);
+    }
+
+    function sendBeacon() {
+      if (!BEACON_URL || !beaconBatch.length) return;
+      const body = JSON.stringify({ events: beaconBatch.splice(0) });
+      if (!navigator.sendBeacon?.(BEACON_URL, new Blob([body], { type: 'application/json' }))) {
+        fetch(BEACON_URL, { method: 'POST', body, keepalive: true }).catch(() => {});
+      }
+    }
+
+    // Drain after the next paint: rAF fires just before painting, the
+    // timeout lets the paint happen first. Hidden tabs get no rAF.
+    function schedule() {
+      if (scheduled || !started) return;
+      scheduled = true;
+      if (document.visibilityState === 'hidden') setTimeout(flush, 0);
+      else requestAnimationFrame(() => setTimeout(flush, 0));
+    }
+
+    function flushNow() {
+      flush();
+      sendBeacon();
+    }
+
+    function start(gtmId) {
+      if (started) return;
+      started = true;
+      if (gtmId) {
+        window.dataLayer.push({ 
+          'gtm.start': new Date().getTime(), 
+          event: 'gtm.js' 
+        });
+        
+        const script = document.createElement('script');
+        script.async = true;
+        script.src = `https://www.googletagmanager.com/gtm.js?id=${gtmId}`;
+        document.head.appendChild(script);
+        if (import.meta.env.DEV) debug('✅ GTM initialized:', gtmId, `(${LOAD_MODE})`);
+      }
+      schedule();
+    }
+
+    // Run once: on first interaction, when idle after load, or at timeoutMs.
+    function whenIdleOrInteractive(run, timeoutMs) {
+      let done = false;
+      const options = { capture: true, passive: true };
+      const fire = () => {
+        if (done) return;
+        done = true;
+        clearTimeout(timer);
+        INTERACTIONS.forEach((type) => window.removeEventListener(type, fire, options));
+        run();
+      };
+      const timer = setTimeout(fire, timeoutMs);
+      INTERACTIONS.forEach((type) => window.addEventListener(type, fire, options));
+      const idle = () => ('requestIdleCallback' in window
+        ? window.requestIdleCallback(fire, { timeout: timeoutMs })
+        : setTimeout(fire, 1));
+      if (document.readyState === 'complete') idle();
+      else window.addEventListener('load', idle, { once: true });
+    }
+
+    export function initGTM(gtmId = 'GTM-XXXXXXX') {
+      window.dataLayer = window.dataLayer || [];
+      // pagehide covers bfcache and iOS; visibilitychange covers tab switches
+      // and mobile app switching, where pagehide may never fire.
+      window.addEventListener('pagehide', flushNow);
+      document.addEventListener('visibilitychange', () => {
+        if (document.visibilityState === 'hidden') flushNow();
+      });
+      if (!gtmId || gtmId === 'GTM-XXXXXXX') {
+        console.warn('⚠️  GTM not initialized: set VITE_GTM_ID in .env');
+        start(null);
+        return;
+      }
+      if (LOAD_MODE === 'deferred') {
+        whenIdleOrInteractive(() => start(gtmId), DEFER_TIMEOUT_MS);
+      } else {
+        start(gtmId);
+      }
+    }
+
+    export function trackEvent(name, params = {}) {
+      queue.push([name, params]);
+      if (BEACON_URL) {
+        beaconBatch.push({ event: name, ...params, ts: Date.now() });
+        if (beaconBatch.length >= BEACON_MAX_EVENTS) setTimeout(sendBeacon, 0);
+      }
+      schedule();
+      if (import.meta.env.DEV) debug('📊 Event tracked:', name, params);
     }
 
     export function trackPageView(path) {
       trackEvent('page_view', { page_path: path });
     }
-    """))
+    """)
 
 # lib/crm.js
-with open(f"{root}/src/lib/crm.js", "w") as f:
-    f.write(textwrap.dedent("""\
+template("src/lib/crm.js", """\
     // QXP CRM bridge
     // Captures leads from contact and demo forms
+    //
+    // Leads bound for VITE_CRM_API go into an IndexedDB outbox and
+    // captureLead returns as soon as they are stored, so forms never wait on
+    // the CRM. The outbox drains in the background: queued leads are batched
+    // into one request, each attempt is cut off after REQUEST_TIMEOUT_MS, and
+    // failures retry with exponential backoff. Draining resumes on the next
+    // page load and whenever the browser comes back online. Every lead keeps
+    // its id across retries (also sent as Idempotency-Key), so the CRM can
+    // drop duplicates.
 
     export const expectedFields = {
-      contact: ['name', 'email', 'school', 'phone', 'message', 'source', 'page_path'],
-      demo: ['name', 'email', 'school', 'role', 'date', 'time', 'notes', 'source', 'page_path'],
+    %%lead_fields%%
     };
 
+    const CRM_ENDPOINT = import.meta.env.VITE_CRM_API;
+    const DB_NAME = 'qxp-crm';
+    const STORE = 'outbox';
+    const REQUEST_TIMEOUT_MS = 8000;
+    const BATCH_MAX = 10;
+    const BACKOFF_BASE_MS = 2000;
+    const BACKOFF_MAX_MS = 5 * 60 * 1000;
+    const MAX_ATTEMPTS = 12;
+
+    // Call as if (import.meta.env.DEV) debug(...), so production builds drop
+    // the call and its arguments.
+    function debug(...args) {
+      console.log(...args);
+    }
+
+    // --- Outbox storage (IndexedDB, or memory when it is unavailable) -------
+
+    let dbPromise = null;
+    const memoryOutbox = new Map();
+
+    function openDb() {
+      if (!dbPromise) {
+        dbPromise = new Promise((resolve) => {
+          if (typeof indexedDB === 'undefined') return resolve(null);
+          const request = indexedDB.open(DB_NAME, 1);
+          request.onupgradeneeded = () => {
+            request.result.createObjectStore(STORE, { keyPath: 'id' }).createIndex('createdAt', 'createdAt');
+          };
+          request.onsuccess = () => resolve(request.result);
+          // Private browsing modes may refuse IndexedDB; keep leads in memory.
+          request.onerror = () => resolve(null);
+          request.onblocked = () => resolve(null);
+        });
+      }
+      return dbPromise;
+    }
+
+    async function withStore(mode, fn) {
+      const db = await openDb();
+      if (!db) return fn(null);
+      return new Promise((resolve, reject) => {
+        const tx = db.transaction(STORE, mode);
+        let result;
+        Promise.resolve(fn(tx.objectStore(STORE))).then((value) => { result = value; }, reject);
+        tx.oncomplete = () => resolve(result);
+        tx.onerror = () => reject(tx.error);
+        tx.onabort = () => reject(tx.error);
+      });
+    }
+
+    function putLeads(leads) {
+      return withStore('readwrite', (store) => {
+        for (const lead of leads) {
+          if (store) store.put(lead);
+          else memoryOutbox.set(lead.id, lead);
+        }
+      });
+    }
+
+    function deleteLeads(ids) {
+      return withStore('readwrite', (store) => {
+        for (const id of ids) {
+          if (store) store.delete(id);
+          else memoryOutbox.delete(id);
+        }
+      });
+    }
+
+    function allLeads() {
+      return withStore('readonly', (store) => {
+        if (!store) return [...memoryOutbox.values()];
+        return new Promise((resolve, reject) => {
+          const request = store.index('createdAt').getAll();
+          request.onsuccess = () => resolve(request.result);
+          request.onerror = () => reject(request.error);
+        });
+      });
+    }
+
+    // --- Background delivery -------------------------------------------------
+
+    let draining = null;
+    let retryTimer = null;
+
+    function backoff(attempts) {
+      const delay = Math.min(BACKOFF_MAX_MS, BACKOFF_BASE_MS * 2 ** (attempts - 1));
+      return delay / 2 + Math.random() * delay / 2;
+    }
+
+    async function post(batch) {
+      const controller = new AbortController();
+      const timer = setTimeout(() => controller.abort(), REQUEST_TIMEOUT_MS);
+      const leads = batch.map(({ id, kind, payload }) => ({ id, kind, ...payload }));
+      try {
+        const response = await fetch(CRM_ENDPOINT, {
+          method: 'POST',
+          headers: {
+            'Content-Type': 'application/json',
+            'Idempotency-Key': batch.map((lead) => lead.id).join(','),
+          },
+          // A single lead keeps the original { kind, ...payload } shape.
+          body: JSON.stringify(leads.length === 1 ? leads[0] : { leads }),
+          signal: controller.signal,
+          keepalive: true,
+        });
+        return response;
+      } finally {
+        clearTimeout(timer);
+      }
+    }
+
+    async function drainOnce() {
+      const now = Date.now();
+      const leads = await allLeads();
+      const due = leads.filter((lead) => lead.nextAttemptAt <= now).slice(0, BATCH_MAX);
+      if (!due.length) return leads;
+
+      let retryable = true;
+      try {
+        const response = await post(due);
+        if (response.ok) {
+          await deleteLeads(due.map((lead) => lead.id));
+          if (import.meta.env.DEV) debug('✅ Leads delivered to CRM:', due.length);
+          return drainOnce();
+        }
+        // Client errors other than timeouts and throttling will not improve.
+        retryable = response.status >= 500 || response.status === 408 || response.status === 429;
+        console.warn(`⚠️  CRM responded ${response.status}`);
+      } catch (e) {
+        console.warn('⚠️  CRM request failed:', e.name === 'AbortError' ? 'timeout' : e.message);
+      }
+
+      const dropped = due.filter((lead) => !retryable || lead.attempts + 1 >= MAX_ATTEMPTS);
+      if (dropped.length) {
+        console.error('❌ Dropping undeliverable leads:', dropped);
+        await deleteLeads(dropped.map((lead) => lead.id));
+      }
+      await putLeads(due.filter((lead) => !dropped.includes(lead)).map((lead) => ({
+        ...lead,
+        attempts: lead.attempts + 1,
+        nextAttemptAt: Date.now() + backoff(lead.attempts + 1),
+      })));
+      return allLeads();
+    }
+
+    function scheduleRetry(leads) {
+      clearTimeout(retryTimer);
+      if (!leads.length) return;
+      const wait = Math.max(0, Math.min(...leads.map((lead) => lead.nextAttemptAt)) - Date.now());
+      retryTimer = setTimeout(drainOutbox, wait);
+    }
+
+    /** Deliver queued leads now; concurrent calls share one run. */
+    export function drainOutbox() {
+      if (!CRM_ENDPOINT || draining) return draining || Promise.resolve();
+      if (globalThis.navigator?.onLine === false) return Promise.resolve();
+      // Only one tab drains at a time when the Web Locks API is available.
+      const run = () => drainOnce().then(scheduleRetry);
+      draining = (globalThis.navigator?.locks?.request('qxp-crm-outbox', { ifAvailable: true },
+        (lock) => (lock ? run() : undefined)) ?? run())
+        .catch((e) => console.error('❌ CRM outbox failed:', e))
+        .finally(() => { draining = null; });
+      return draining;
+    }
+
+    /** Number of leads still waiting for the CRM. */
+    export async function pendingLeads() {
+      return (await allLeads()).length;
+    }
+
+    if (CRM_ENDPOINT && typeof window !== 'undefined') {
+      window.addEventListener('online', () => drainOutbox());
+      // Resume whatever a previous visit left behind.
+      setTimeout(drainOutbox, 0);
+    }
+
+    function newLeadId() {
+      return globalThis.crypto?.randomUUID?.() ?? `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+    }
+
     export async function captureLead(kind, payload) {
-      console.log('📝 Capturing lead:', kind, payload);
+      if (import.meta.env.DEV) debug('📝 Capturing lead:', kind, payload);
       
       // Method 1: Try embedded portal API (if this site is embedded in QXP Admin Portal)
       try {
         if (window.QXP_CRM?.captureLead) {
           const result = await window.QXP_CRM.captureLead({ kind, ...payload });
-          console.log('✅ Lead captured via QXP_CRM API');
+          if (import.meta.env.DEV) debug('✅ Lead captured via QXP_CRM API');
           return { ok: true, method: 'QXP_CRM', result };
         }
       } catch (e) {
@@ -269,47 +1630,38 @@ with open(f"{root}/src/lib/crm.js", "w") as f:
             { type: 'QXP_LEAD', kind, payload }, 
             '*'
           );
-          console.log('✅ Lead sent via postMessage to parent');
+          if (import.meta.env.DEV) debug('✅ Lead sent via postMessage to parent');
           return { ok: true, method: 'postMessage' };
         }
       } catch (e) {
         console.warn('⚠️  postMessage failed:', e.message);
       }
       
-      // Method 3: Try external CRM API endpoint
-      const crmEndpoint = import.meta.env.VITE_CRM_API;
-      if (crmEndpoint) {
-        try {
-          const response = await fetch(crmEndpoint, {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ kind, ...payload }),
-          });
-          const data = await response.json();
-          console.log('✅ Lead captured via external API');
-          return { ok: true, method: 'api', data };
-        } catch (e) {
-          console.error('❌ External API failed:', e.message);
-        }
+      // Method 3: Queue for the external CRM API endpoint
+      if (CRM_ENDPOINT) {
+        const lead = { id: newLeadId(), kind, payload, createdAt: Date.now(), attempts: 0, nextAttemptAt: 0 };
+        await putLeads([lead]);
+        setTimeout(drainOutbox, 0);
+        if (import.meta.env.DEV) debug('📮 Lead queued for CRM:', lead.id);
+        return { ok: true, method: 'outbox', id: lead.id };
       }
       
       // Fallback: Console logging for development
-      console.log('📋 [DEV MODE] Lead captured:', { kind, payload });
+      if (import.meta.env.DEV) debug('📋 [DEV MODE] Lead captured:', { kind, payload });
       return { ok: true, method: 'console' };
     }
-    """))
+    """)
 
 # lib/whatsapp.js
-with open(f"{root}/src/lib/whatsapp.js", "w") as f:
-    f.write(textwrap.dedent("""\
+template("src/lib/whatsapp.js", """\
     import { trackEvent } from './gtm';
 
     const CONTACT = { 
-      phoneE164: '254700779977',
-      phoneIntl: '+254 700 779 977'
+      phoneE164: %%phone_e164|js%%,
+      phoneIntl: %%phone_intl|js%%
     };
 
-    export const waLink = (text = "Hello QXP, I'd like to learn more about QXP LMS.") =>
+    export const waLink = (text = %%whatsapp_greeting|js%%) =>
       `https://wa.me/${CONTACT.phoneE164}?text=${encodeURIComponent(text)}`;
 
     export function trackWhatsAppClick(source) {
@@ -318,16 +1670,13 @@ with open(f"{root}/src/lib/whatsapp.js", "w") as f:
         phone: CONTACT.phoneE164 
       });
     }
-    """))
+    """)
 
-print("🧩 Creating components...")
-
-# Components will be created in next sections due to length
-# For brevity, I'll create simplified versions
 
 # src/components/Button.jsx
-with open(f"{root}/src/components/Button.jsx", "w") as f:
-    f.write(textwrap.dedent("""\
+template("src/components/Button.jsx", """\
+    import Link from './Link';
+
     export default function Button({ 
       as: As = 'button', 
       href, 
@@ -352,7 +1701,7 @@ with open(f"{root}/src/components/Button.jsx", "w") as f:
       
       if (href) {
         return (
-          <a 
+          <Link 
             href={href} 
             onClick={onClick} 
             target={target}
@@ -361,7 +1710,7 @@ with open(f"{root}/src/components/Button.jsx", "w") as f:
             {...props}
           >
             {children}
-          </a>
+          </Link>
         );
       }
       
@@ -376,11 +1725,10 @@ with open(f"{root}/src/components/Button.jsx", "w") as f:
         </As>
       );
     }
-    """))
+    """)
 
 # src/components/Card.jsx
-with open(f"{root}/src/components/Card.jsx", "w") as f:
-    f.write(textwrap.dedent("""\
+template("src/components/Card.jsx", """\
     export default function Card({ children, className = '' }) {
       return (
         <div className={`rounded-2xl border border-black/10 bg-white shadow-sm ${className}`}>
@@ -388,11 +1736,31 @@ with open(f"{root}/src/components/Card.jsx", "w") as f:
         </div>
       );
     }
-    """))
+    """)
+
+# src/components/Placeholder.jsx
+template("src/components/Placeholder.jsx", """\
+    import Button from './Button';
+
+    // Stand-in for a page whose copy the site owner has not written yet. The
+    // generator only emits the route; the content is theirs to supply.
+    export default function Placeholder({ title, file }) {
+      return (
+        <div className="mx-auto max-w-3xl px-4 sm:px-6 lg:px-8 py-16">
+          <h1 className="text-3xl sm:text-5xl font-bold tracking-tight text-qxp-navy">{title}</h1>
+          <p className="mt-6 rounded-xl border border-dashed border-amber-400 bg-amber-50 p-4 text-amber-900">
+            TODO: this page has no content yet. Edit <code>{file}</code> to add it.
+          </p>
+          <div className="mt-8">
+            <Button href="%%route_base%%/contact" variant="secondary">Contact us</Button>
+          </div>
+        </div>
+      );
+    }
+    """)
 
 # src/components/Form.jsx
-with open(f"{root}/src/components/Form.jsx", "w") as f:
-    f.write(textwrap.dedent("""\
+template("src/components/Form.jsx", """\
     export function FormGrid({ children }) {
       return <div className="grid sm:grid-cols-2 gap-4">{children}</div>;
     }
@@ -451,23 +1819,24 @@ with open(f"{root}/src/components/Form.jsx", "w") as f:
         </div>
       );
     }
-    """))
+    """)
 
-# src/components/Header.jsx  
-with open(f"{root}/src/components/Header.jsx", "w") as f:
-    f.write(textwrap.dedent("""\
+# src/components/Header.jsx
+template("src/components/Header.jsx", """\
     import { useState } from 'react';
     import Button from './Button';
+    import Link from './Link';
+    import { trackEvent } from '../lib/gtm';
 
     const BRAND = { 
-      name: 'QXP', 
-      logo: 'https://qxp.global/assets/img/qxp-logo.png' 
+      name: %%brand_name|js%%, 
+      logo: %%logo_url|js%% 
     };
 
     const NAV = [
-      { label: 'Solutions', href: '#/solutions' },
-      { label: 'Pricing', href: '#/pricing' },
-      { label: 'Contact', href: '#/contact' },
+      { label: 'Solutions', href: '%%route_base%%/solutions' },
+      { label: 'Pricing', href: '%%route_base%%/pricing' },
+      { label: 'Contact', href: '%%route_base%%/contact' },
     ];
 
     export default function Header() {
@@ -476,21 +1845,23 @@ with open(f"{root}/src/components/Header.jsx", "w") as f:
       return (
         <header className="sticky top-0 z-50 bg-white/80 backdrop-blur border-b border-black/10">
           <div className="mx-auto max-w-7xl px-4 sm:px-6 lg:px-8 h-16 flex items-center justify-between">
-            <a href="#/" className="flex items-center gap-3">
+            <Link href="%%route_base%%/" className="flex items-center gap-3">
               <img src={BRAND.logo} alt={`${BRAND.name} logo`} className="h-8 w-auto" />
-            </a>
+            </Link>
             
             <nav className="hidden md:flex items-center gap-6">
               {NAV.map(n => (
-                <a
+                <Link
                   key={n.href}
                   href={n.href}
                   className="text-sm text-black/70 hover:text-black transition"
                 >
                   {n.label}
-                </a>
+                </Link>
               ))}
-              <Button href="#/demo">Book Demo</Button>
+              <Button href="%%route_base%%/demo" onClick={() => trackEvent('cta_click', { cta: 'book_demo', location: 'header' })}>
+                Book Demo
+              </Button>
             </nav>
             
             <button
@@ -508,44 +1879,46 @@ with open(f"{root}/src/components/Header.jsx", "w") as f:
             <div className="md:hidden border-t border-black/10">
               <div className="px-4 py-3 flex flex-col gap-2">
                 {NAV.map(n => (
-                  <a
+                  <Link
                     key={n.href}
                     href={n.href}
                     className="px-3 py-2 rounded-lg hover:bg-black/5"
                     onClick={() => setOpen(false)}
                   >
                     {n.label}
-                  </a>
+                  </Link>
                 ))}
-                <Button href="#/demo" className="w-full">Book Demo</Button>
+                <Button
+                  href="%%route_base%%/demo"
+                  className="w-full"
+                  onClick={() => trackEvent('cta_click', { cta: 'book_demo', location: 'mobile_menu' })}
+                >
+                  Book Demo
+                </Button>
               </div>
             </div>
           )}
         </header>
       );
     }
-    """))
+    """)
 
 # src/components/Footer.jsx
-with open(f"{root}/src/components/Footer.jsx", "w") as f:
-    f.write(textwrap.dedent("""\
-    import { waLink } from '../lib/whatsapp';
+template("src/components/Footer.jsx", """\
+    import Link from './Link';
+    import { waLink, trackWhatsAppClick } from '../lib/whatsapp';
 
     const BRAND = { 
-      name: 'QXP', 
-      logo: 'https://qxp.global/assets/img/qxp-logo.png' 
+      name: %%brand_name|js%%, 
+      logo: %%logo_url|js%% 
     };
 
     const CONTACT = {
-      phoneE164: '254700779977',
-      phoneIntl: '+254 700 779 977',
-      email: 'info@qxp.global',
-      addressLines: [
-        'Nairobi Office - HQ',
-        '01, School Lane, Westlands',
-        'Nairobi, Kenya'
-      ],
-      hours: 'Mon–Fri: 8:00 AM – 6:00 PM EAT',
+      phoneE164: %%phone_e164|js%%,
+      phoneIntl: %%phone_intl|js%%,
+      email: %%email|js%%,
+      addressLines: %%address_lines|js%%,
+      hours: %%hours|js%%,
     };
 
     export default function Footer() {
@@ -556,24 +1929,24 @@ with open(f"{root}/src/components/Footer.jsx", "w") as f:
               <div className="flex items-center gap-3">
                 <img src={BRAND.logo} alt={`${BRAND.name} logo`} className="h-8 w-auto" />
               </div>
-              <p className="mt-3 text-sm text-black/70">Kenya's leading school operations suite.</p>
+              <p className="mt-3 text-sm text-black/70">%%tagline|jsx%%</p>
             </div>
             
             <div>
               <div className="font-medium mb-2">Product</div>
               <ul className="space-y-2 text-sm text-black/70">
-                <li><a href="#/solutions" className="hover:text-black transition">Solutions</a></li>
-                <li><a href="#/pricing" className="hover:text-black transition">Pricing</a></li>
-                <li><a href="#/privacy" className="hover:text-black transition">Privacy</a></li>
-                <li><a href="#/terms" className="hover:text-black transition">Terms</a></li>
+                <li><Link href="%%route_base%%/solutions" className="hover:text-black transition">Solutions</Link></li>
+                <li><Link href="%%route_base%%/pricing" className="hover:text-black transition">Pricing</Link></li>
+                <li><Link href="%%route_base%%/privacy" className="hover:text-black transition">Privacy</Link></li>
+                <li><Link href="%%route_base%%/terms" className="hover:text-black transition">Terms</Link></li>
               </ul>
             </div>
             
             <div>
               <div className="font-medium mb-2">Company</div>
               <ul className="space-y-2 text-sm text-black/70">
-                <li><a href="#/contact" className="hover:text-black transition">Contact</a></li>
-                <li><a href="#/demo" className="hover:text-black transition">Book Demo</a></li>
+                <li><Link href="%%route_base%%/contact" className="hover:text-black transition">Contact</Link></li>
+                <li><Link href="%%route_base%%/demo" className="hover:text-black transition">Book Demo</Link></li>
               </ul>
             </div>
             
@@ -582,7 +1955,7 @@ with open(f"{root}/src/components/Footer.jsx", "w") as f:
               <address className="not-italic text-sm text-black/70 leading-6">
                 {CONTACT.addressLines.map((l, i) => <div key={i}>{l}</div>)}
                 <div className="mt-2">
-                  Phone: <a className="underline hover:text-black transition" href={waLink('Hi QXP')} target="_blank" rel="noreferrer">{CONTACT.phoneIntl}</a>
+                  Phone: <a className="underline hover:text-black transition" href={waLink(`Hi ${BRAND.name}`)} target="_blank" rel="noreferrer" onClick={() => trackWhatsAppClick('footer')}>{CONTACT.phoneIntl}</a>
                 </div>
                 <div>
                   Email: <a className="underline hover:text-black transition" href={`mailto:${CONTACT.email}`}>{CONTACT.email}</a>
@@ -593,127 +1966,419 @@ with open(f"{root}/src/components/Footer.jsx", "w") as f:
           </div>
           
           <div className="text-center text-xs text-black/60 pb-8">
-            © {new Date().getFullYear()} {BRAND.name} Global. All rights reserved.
+            © {new Date().getFullYear()} %%legal_name|jsx%%. All rights reserved.
           </div>
         </footer>
       );
     }
-    """))
+    """)
+
+
+# src/routes.js
+template("src/routes.js", """\
+    // Route table
+    //
+    // Every page is its own chunk: the entry bundle holds only the shell
+    // (header, footer, router) and a route's code is fetched the first time it
+    // renders. Links prefetch their route's chunk on hover, focus or touch and
+    // once they scroll into view (see components/Link.jsx), so navigating
+    // rarely waits on the network.
+    //
+    // ROUTING is 'hash' (#/pricing) or, for prerendered sites, 'path'
+    // (/pricing), where every route also exists as static HTML.
+
+    export const ROUTING = %%routing|js%%;
+    const SITE_TITLE = %%title|js%%;
+    const BRAND_NAME = %%brand_name|js%%;
+
+    export const routes = [
+      { path: '/', title: null, load: () => import('./pages/Home.jsx') },
+      { path: '/solutions', title: 'Solutions', load: () => import('./pages/Solutions.jsx') },
+      { path: '/pricing', title: 'Pricing', load: () => import('./pages/Pricing.jsx') },
+      { path: '/contact', title: 'Contact', load: () => import('./pages/Contact.jsx') },
+      { path: '/demo', title: 'Book a Demo', load: () => import('./pages/Demo.jsx') },
+      // Both legal pages share one chunk.
+      { path: '/privacy', title: 'Privacy Policy', load: () => import('./pages/Legal.jsx').then((m) => ({ default: m.Privacy })) },
+      { path: '/terms', title: 'Terms of Service', load: () => import('./pages/Legal.jsx').then((m) => ({ default: m.Terms })) },
+    ];
+
+    export const notFound = { path: null, title: 'Page Not Found', load: () => import('./pages/NotFound.jsx') };
+
+    const byPath = new Map(routes.map((route) => [route.path, route]));
+    const loading = new Map();
+
+    export function findRoute(path) {
+      // Static hosts may serve /pricing/index.html as /pricing/.
+      const key = path && path.length > 1 && path.endsWith('/') ? path.slice(0, -1) : path || '/';
+      return byPath.get(key) ?? notFound;
+    }
 
-print("📄 Creating pages...")
+    export function documentTitle(route) {
+      return route.title ? `${route.title} – ${BRAND_NAME}` : SITE_TITLE;
+    }
 
-# Due to length constraints, I'll create a comprehensive README instead of all pages
-# The full implementation would include Home, Solutions, Pricing, Contact, Demo, Legal, NotFound
+    /** The path the browser is on, for either routing mode. */
+    export function currentPath() {
+      return ROUTING === 'path' ? location.pathname : location.hash.replace(/^#/, '') || '/';
+    }
 
-# src/App.jsx
-with open(f"{root}/src/App.jsx", "w") as f:
-    f.write(textwrap.dedent("""\
-    import { useEffect, useMemo, useState } from 'react';
-    import Header from './components/Header';
-    import Footer from './components/Footer';
-    import { trackPageView } from './lib/gtm';
+    /** Client-side navigation for path routing; App listens for popstate. */
+    export function navigate(path) {
+      if (path !== currentPath()) {
+        history.pushState(null, '', path);
+        window.dispatchEvent(new PopStateEvent('popstate'));
+      }
+      window.scrollTo(0, 0);
+    }
 
-    // Simple home page component
-    function Home() {
+    /** The route's module; requested once, retried if the request failed. */
+    export function loadRoute(route) {
+      let module = loading.get(route);
+      if (!module) {
+        module = route.load();
+        module.catch(() => loading.delete(route));
+        loading.set(route, module);
+      }
+      return module;
+    }
+
+    /** Route path for an in-app href ('#/pricing' or '/pricing'), else null. */
+    export function routePath(href) {
+      if (typeof href !== 'string') return null;
+      if (href.startsWith('#/')) return href.slice(1);
+      return href.startsWith('/') && !href.startsWith('//') ? href : null;
+    }
+
+    /** Warm the chunk for href's route unless the visitor asked to save data. */
+    export function prefetchRoute(href) {
+      const path = routePath(href);
+      const connection = navigator.connection;
+      if (path === null || connection?.saveData || /2g/.test(connection?.effectiveType ?? '')) return;
+      const route = findRoute(path);
+      if (route !== notFound) loadRoute(route).catch(() => {});
+    }
+    """)
+
+# src/components/Link.jsx
+template("src/components/Link.jsx", """\
+    import { useEffect, useRef } from 'react';
+    import { ROUTING, navigate, prefetchRoute, routePath } from '../routes';
+
+    const whenIdle = (fn) =>
+      'requestIdleCallback' in window ? requestIdleCallback(fn, { timeout: 2000 }) : setTimeout(fn, 200);
+
+    // An <a> that prefetches its route's chunk when hovered, focused or
+    // touched, and (prefetch="visible", the default) once it is on screen.
+    // With path routing, plain left clicks navigate without a page load.
+    // Links outside the app (mailto:, https:) render as plain anchors.
+    export default function Link({ href, prefetch = 'visible', onClick, onMouseEnter, onFocus, onTouchStart, ...props }) {
+      const ref = useRef(null);
+      const internal = routePath(href) !== null;
+
+      useEffect(() => {
+        if (!internal || prefetch !== 'visible' || !('IntersectionObserver' in window)) return;
+        const observer = new IntersectionObserver((entries) => {
+          if (entries.some((entry) => entry.isIntersecting)) {
+            observer.disconnect();
+            whenIdle(() => prefetchRoute(href));
+          }
+        });
+        observer.observe(ref.current);
+        return () => observer.disconnect();
+      }, [href, internal, prefetch]);
+
+      if (!internal) {
+        return <a href={href} onClick={onClick} onMouseEnter={onMouseEnter} onFocus={onFocus} onTouchStart={onTouchStart} {...props} />;
+      }
+
+      const warm = (handler) => (event) => {
+        prefetchRoute(href);
+        handler?.(event);
+      };
+      const follow = (event) => {
+        onClick?.(event);
+        if (ROUTING !== 'path' || event.defaultPrevented || event.button !== 0 || props.target
+          || event.metaKey || event.ctrlKey || event.shiftKey || event.altKey) return;
+        event.preventDefault();
+        navigate(routePath(href));
+      };
+      return (
+        <a
+          ref={ref}
+          href={href}
+          onClick={follow}
+          onMouseEnter={warm(onMouseEnter)}
+          onFocus={warm(onFocus)}
+          onTouchStart={warm(onTouchStart)}
+          {...props}
+        />
+      );
+    }
+    """)
+
+# src/pages/Home.jsx
+template("src/pages/Home.jsx", """\
+    import Button from '../components/Button';
+
+    export default function Home() {
       return (
         <div className="mx-auto max-w-7xl px-4 sm:px-6 lg:px-8 py-16">
           <div className="text-center">
             <h1 className="text-4xl sm:text-6xl font-bold tracking-tight text-qxp-navy">
-              Kenya's Leading School Operations Suite
+              %%headline|jsx%%
             </h1>
             <p className="mt-6 text-lg text-gray-600">
-              LMS for CBC, 8-4-4, BNC & IBE — built for schools, teachers, students and parents.
+              %%subheadline|jsx%%
             </p>
             <div className="mt-8 flex justify-center gap-4">
-              <a href="#/demo" className="inline-flex items-center justify-center gap-2 rounded-xl px-6 py-3 bg-qxp-blue text-white hover:bg-qxp-blue-bright transition">
+              <Button href="%%route_base%%/demo" className="px-6 py-3 text-base">
                 Book a Demo
-              </a>
-              <a href="#/pricing" className="inline-flex items-center justify-center gap-2 rounded-xl px-6 py-3 bg-white text-qxp-navy border border-gray-200 hover:bg-gray-50 transition">
+              </Button>
+              <Button href="%%route_base%%/pricing" variant="secondary" className="px-6 py-3 text-base">
                 See Pricing
-              </a>
+              </Button>
             </div>
           </div>
         </div>
       );
     }
+    """)
+
+# src/pages/Solutions.jsx
+template("src/pages/Solutions.jsx", """\
+    import Placeholder from '../components/Placeholder';
+
+    // TODO(tenant): describe your products here.
+    export default function Solutions() {
+      return <Placeholder title="Solutions" file="src/pages/Solutions.jsx" />;
+    }
+    """)
+
+# src/pages/Pricing.jsx
+template("src/pages/Pricing.jsx", """\
+    import Placeholder from '../components/Placeholder';
+
+    // TODO(tenant): publish your plans and prices here.
+    export default function Pricing() {
+      return <Placeholder title="Pricing" file="src/pages/Pricing.jsx" />;
+    }
+    """)
+
+# src/pages/Contact.jsx
+template("src/pages/Contact.jsx", """\
+    import { useState } from 'react';
+    import Button from '../components/Button';
+    import Card from '../components/Card';
+    import { FormGrid, InputField, TextAreaField } from '../components/Form';
+    import { captureLead } from '../lib/crm';
+    import { trackEvent } from '../lib/gtm';
+
+    export default function Contact() {
+      const [sent, setSent] = useState(false);
+
+      async function onSubmit(event) {
+        event.preventDefault();
+        const fields = Object.fromEntries(new FormData(event.currentTarget));
+        await captureLead('contact', { ...fields, source: 'website', page_path: '/contact' });
+        trackEvent('generate_lead', { form: 'contact' });
+        setSent(true);
+      }
+
+      return (
+        <div className="mx-auto max-w-3xl px-4 sm:px-6 lg:px-8 py-16">
+          <h1 className="text-3xl sm:text-5xl font-bold tracking-tight text-qxp-navy">Contact us</h1>
+          <p className="mt-4 text-lg text-gray-600">
+            Email %%email|jsx%% or call %%phone_intl|jsx%%, or leave a message below.
+          </p>
+          <Card className="mt-8 p-6">
+            {sent ? (
+              <p className="text-qxp-navy">Thanks! We'll be in touch shortly.</p>
+            ) : (
+              <form onSubmit={onSubmit} className="space-y-4">
+                <FormGrid>
+                  <InputField label="Name" id="contact-name" name="name" required />
+                  <InputField label="Email" id="contact-email" name="email" type="email" required />
+                  <InputField label="School" id="contact-school" name="school" />
+                  <InputField label="Phone" id="contact-phone" name="phone" type="tel" />
+                </FormGrid>
+                <TextAreaField label="Message" id="contact-message" name="message" required />
+                <Button type="submit">Send message</Button>
+              </form>
+            )}
+          </Card>
+        </div>
+      );
+    }
+    """)
+
+# src/pages/Demo.jsx
+template("src/pages/Demo.jsx", """\
+    import { useState } from 'react';
+    import Button from '../components/Button';
+    import Card from '../components/Card';
+    import { FormGrid, InputField, SelectField, TextAreaField } from '../components/Form';
+    import { captureLead } from '../lib/crm';
+    import { trackEvent } from '../lib/gtm';
+
+    const ROLES = ['Principal', 'Deputy Principal', 'Teacher', 'Bursar', 'ICT Lead', 'Other'];
+
+    export default function Demo() {
+      const [sent, setSent] = useState(false);
+
+      async function onSubmit(event) {
+        event.preventDefault();
+        const fields = Object.fromEntries(new FormData(event.currentTarget));
+        await captureLead('demo', { ...fields, source: 'website', page_path: '/demo' });
+        trackEvent('generate_lead', { form: 'demo' });
+        setSent(true);
+      }
+
+      return (
+        <div className="mx-auto max-w-3xl px-4 sm:px-6 lg:px-8 py-16">
+          <h1 className="text-3xl sm:text-5xl font-bold tracking-tight text-qxp-navy">Book a demo</h1>
+          <p className="mt-4 text-lg text-gray-600">See %%brand_name|jsx%% with your own school's workflows.</p>
+          <Card className="mt-8 p-6">
+            {sent ? (
+              <p className="text-qxp-navy">Thanks! We'll confirm your demo by email.</p>
+            ) : (
+              <form onSubmit={onSubmit} className="space-y-4">
+                <FormGrid>
+                  <InputField label="Name" id="demo-name" name="name" required />
+                  <InputField label="Email" id="demo-email" name="email" type="email" required />
+                  <InputField label="School" id="demo-school" name="school" required />
+                  <SelectField label="Role" id="demo-role" name="role" options={ROLES} />
+                  <InputField label="Preferred date" id="demo-date" name="date" type="date" />
+                  <InputField label="Preferred time" id="demo-time" name="time" type="time" />
+                </FormGrid>
+                <TextAreaField label="Anything we should know?" id="demo-notes" name="notes" rows={3} />
+                <Button type="submit">Request demo</Button>
+              </form>
+            )}
+          </Card>
+        </div>
+      );
+    }
+    """)
+
+# src/pages/Legal.jsx
+template("src/pages/Legal.jsx", """\
+    import Placeholder from '../components/Placeholder';
+
+    // TODO(tenant): replace both placeholders with the policy and terms your
+    // organisation has approved. The generator does not write legal text.
+    export function Privacy() {
+      return <Placeholder title="Privacy Policy" file="src/pages/Legal.jsx" />;
+    }
+
+    export function Terms() {
+      return <Placeholder title="Terms of Service" file="src/pages/Legal.jsx" />;
+    }
+    """)
 
-    function NotFound() {
+# src/pages/NotFound.jsx
+template("src/pages/NotFound.jsx", """\
+    import Link from '../components/Link';
+
+    export default function NotFound() {
       return (
         <div className="mx-auto max-w-7xl px-4 sm:px-6 lg:px-8 py-16 text-center">
           <h1 className="text-4xl font-bold">Page Not Found</h1>
           <p className="mt-4 text-gray-600">The page you're looking for doesn't exist.</p>
           <div className="mt-6">
-            <a href="#/" className="text-qxp-blue hover:underline">Go home</a>
+            <Link href="%%route_base%%/" className="text-qxp-blue hover:underline">Go home</Link>
           </div>
         </div>
       );
     }
+    """)
+
+# src/App.jsx
+template("src/App.jsx", """\
+    import { Suspense, lazy, useEffect, useState } from 'react';
+    import Header from './components/Header';
+    import Footer from './components/Footer';
+    import { trackPageView } from './lib/gtm';
+    import { ROUTING, currentPath, documentTitle, findRoute, loadRoute, notFound, routes } from './routes';
 
-    function useHashRoute() {
-      const [route, setRoute] = useState(() => location.hash.replace(/^#/, '') || '/');
+    // One lazy component per route, created once so React keeps page state
+    // across renders.
+    const pages = new Map([...routes, notFound].map((route) => [route, lazy(() => loadRoute(route))]));
+
+    // url is given when prerendering, where there is no location.
+    function useRoutePath(url) {
+      const [path, setPath] = useState(() => url ?? currentPath());
       
       useEffect(() => {
-        const onHash = () => setRoute(location.hash.replace(/^#/, '') || '/');
-        window.addEventListener('hashchange', onHash);
-        return () => window.removeEventListener('hashchange', onHash);
+        const event = ROUTING === 'path' ? 'popstate' : 'hashchange';
+        const onChange = () => setPath(currentPath());
+        window.addEventListener(event, onChange);
+        return () => window.removeEventListener(event, onChange);
       }, []);
       
-      return route;
+      return path;
     }
 
-    export default function App() {
-      const route = useHashRoute();
+    export default function App({ url }) {
+      const path = useRoutePath(url);
+      const route = findRoute(path);
+      const Page = pages.get(route);
       
       useEffect(() => {
-        trackPageView(route || '/');
-      }, [route]);
-      
-      let page = <Home />;
-      
-      // Simple routing
-      if (route !== '/' && route !== '') {
-        page = <NotFound />;
-      }
+        trackPageView(path || '/');
+        document.title = documentTitle(route);
+      }, [path, route]);
       
       return (
         <div className="min-h-screen bg-white text-gray-900">
           <Header />
-          <main>{page}</main>
+          <main>
+            {/* Keeps the footer in place while a page chunk loads. */}
+            <Suspense fallback={<div className="min-h-[60vh]" aria-busy="true" />}>
+              <Page />
+            </Suspense>
+          </main>
           <Footer />
         </div>
       );
     }
-    """))
+    """)
 
 # src/main.jsx
-with open(f"{root}/src/main.jsx", "w") as f:
-    f.write(textwrap.dedent("""\
+template("src/main.jsx", """\
     import React from 'react'
     import ReactDOM from 'react-dom/client'
     import App from './App.jsx'
     import './styles.css'
     import { initGTM } from './lib/gtm.js'
+    import { currentPath, findRoute, loadRoute } from './routes.js'
 
-    // Initialize GTM (set VITE_GTM_ID in .env)
+    // Initialize GTM (set VITE_GTM_ID in .env; VITE_GTM_LOAD=deferred defers it)
     const GTM_ID = import.meta.env.VITE_GTM_ID || 'GTM-XXXXXXX';
     initGTM(GTM_ID);
 
-    ReactDOM.createRoot(document.getElementById('root')).render(
+    const container = document.getElementById('root');
+    const app = (
       <React.StrictMode>
         <App />
-      </React.StrictMode>,
-    )
-    """))
+      </React.StrictMode>
+    );
+
+    if (container.hasChildNodes()) {
+      // Prerendered HTML: attach to it once the current page's chunk is here.
+      loadRoute(findRoute(currentPath())).finally(() => ReactDOM.hydrateRoot(container, app));
+    } else {
+      ReactDOM.createRoot(container).render(app);
+    }
+    """)
 
 # README.md
-print("📝 Creating README.md...")
-with open(f"{root}/README.md", "w") as f:
-    f.write(textwrap.dedent("""\
-    # QXP Marketing — Vite + React + Tailwind Starter
-
-    Minimal, production-ready marketing site for QXP with:
-    - Hash-based routing (no extra deps)
-    - React + Tailwind with QXP brand colors
+template("README.md", """\
+    # %%brand_name%% Marketing — Vite + React + Tailwind Starter
+
+    Minimal, production-ready marketing site for %%brand_name%% with:
+    - Hash-based routing (no extra deps), one lazily loaded chunk per page,
+      or path-based routing with every route prerendered to HTML
+    - React + Tailwind with %%brand_name%% brand colors
     - WhatsApp click-to-chat with tracking
     - Google Tag Manager events (page views, form submissions, WhatsApp clicks)
     - CRM bridge to QXP Admin Portal (window.QXP_CRM.captureLead) with safe fallbacks
@@ -721,11 +2386,20 @@ with open(f"{root}/README.md", "w") as f:
     ## Quick start
 
     ```bash
-    npm install
+    npm install             # or `npm ci` when package-lock.json is present
     cp .env.example .env  # Then edit .env with your GTM ID
     npm run dev
     ```
 
+    The generator keeps `node_modules` and `package-lock.json` across
+    regenerations and only drops the lockfile when the dependencies in
+    `package.json` change. It ships no lockfile of its own, so the first
+    `npm install` on a machine still resolves the whole dependency tree.
+    The next time the generator runs, it copies the lockfile that install
+    wrote into a shared lock store (`~/.cache/qxp-starter/locks`, or
+    `$QXP_STARTER_LOCKS`). Sites generated after that are seeded from the
+    store and can use `npm ci`.
+
     Visit http://localhost:5173
 
     ## Build for production
@@ -735,6 +2409,16 @@ with open(f"{root}/README.md", "w") as f:
     npm run preview
     ```
 
+    ## Prerendering
+
+    Sites generated with `prerender` enabled (`--prerender`) route on real
+    paths (`/pricing` rather than `#/pricing`). `npm run build` then renders
+    every route to static HTML: `dist/pricing/index.html`, and so on, plus
+    `dist/404.html`. Pages paint and can be indexed before any JavaScript
+    runs. The bundle hydrates the markup instead of rendering from scratch.
+    `prerender.js` does the rendering with the server build of
+    `src/entry-server.jsx`.
+
     ## Deploy
 
     Deploy the `dist/` folder to:
@@ -751,6 +2435,10 @@ with open(f"{root}/README.md", "w") as f:
        ```
        VITE_GTM_ID=GTM-XXXXXXX
        ```
+    3. Optionally set `VITE_GTM_LOAD=deferred` to keep GTM off the critical
+       path: it then loads when the browser is idle or on the first tap,
+       scroll or key press (after %%gtm_defer_timeout_ms%% ms at the latest).
+       Events tracked earlier are buffered and replayed in order.
 
     ### CRM Integration
 
@@ -758,17 +2446,28 @@ with open(f"{root}/README.md", "w") as f:
 
     1. **Embedded API** (highest priority): `window.QXP_CRM.captureLead()`
     2. **PostMessage** (iframe): Sends to parent via `postMessage`
-    3. **External API**: Set `VITE_CRM_API` in `.env`
+    3. **External API**: Set `VITE_CRM_API` in `.env`. Leads are stored in an
+       IndexedDB outbox and sent in the background, batched, with timeouts and
+       retries. A slow or offline CRM never holds up the form, and leads
+       survive reloads. Batches of more than one lead are posted as
+       `{ "leads": [...] }`, and every lead carries a stable `id`.
     4. **Console** (dev): Logs to console
 
+    Sites generated with `crm_ingest` enabled (`--crm-ingest`) include
+    `ingest/server.py`, a dependency-free Python service for `VITE_CRM_API`.
+    It validates leads against `expectedFields` and queues them in memory.
+    It writes them to SQLite (WAL mode) in batched transactions. A full queue
+    answers 503, and the outbox retries later. Run it with `npm run ingest`.
+    Measure it with `python3 ingest/bench.py --batch 10 --min-rate 2000`.
+
     ### WhatsApp
 
     Edit contact phone in `src/lib/whatsapp.js`:
 
     ```javascript
     const CONTACT = { 
-      phoneE164: '254700779977',  // Change to your number
-      phoneIntl: '+254 700 779 977'
+      phoneE164: %%phone_e164|js%%,  // Change to your number
+      phoneIntl: %%phone_intl|js%%
     };
     ```
 
@@ -776,41 +2475,58 @@ with open(f"{root}/README.md", "w") as f:
 
     ### Brand Colors
 
-    QXP brand colors are pre-configured in `tailwind.config.js`:
+    %%brand_name%% brand colors are pre-configured in `tailwind.config.js`:
 
-    - `qxp-navy`: #070745
-    - `qxp-navy-dark`: #0707a4
-    - `qxp-blue`: #0734ff
-    - `qxp-blue-bright`: #079dff
-    - `qxp-yellow`: #f2b91a
-    - `qxp-green`: #78c054
-    - `qxp-red`: #c72727
+    %%readme_colors%%
 
     ### Logo
 
     Update logo URL in `src/components/Header.jsx` and `src/components/Footer.jsx`.
 
+    ### Pages
+
+    Each page in `src/pages/` is built as its own chunk, and the first visit
+    only downloads the page it lands on. To add a page, create the component
+    and add a `{ path, title, load: () => import('./pages/MyPage.jsx') }`
+    entry to `src/routes.js`. Link to it with `components/Link.jsx` (or
+    `Button` with `href`), which prefetches the chunk when the link is hovered
+    or scrolls into view.
+
+    Solutions, Pricing, Privacy Policy and Terms of Service are placeholders
+    marked TODO. Replace them with your own copy before launch; the generator
+    does not write product or legal text.
+
     ## Structure
 
     ```
     src/
     ├── main.jsx              # Entry point with GTM init
     ├── App.jsx               # Router & page orchestration
+    ├── routes.js             # Route table: path -> lazily imported page
     ├── styles.css            # Tailwind imports
     ├── lib/
     │   ├── gtm.js           # Google Tag Manager helpers
     │   ├── crm.js           # Lead capture with fallbacks
     │   └── whatsapp.js      # WhatsApp link generator
+    ├── pages/               # One chunk per route (Home, Solutions, Pricing, ...)
     └── components/
+        ├── Link.jsx         # <a> that prefetches its route's chunk
         ├── Button.jsx       # Primary/secondary/ghost variants
         ├── Card.jsx         # Container component
         ├── Form.jsx         # Input/TextArea/Select fields
+        ├── Placeholder.jsx  # TODO notice for pages you still have to write
         ├── Header.jsx       # Sticky header with mobile menu
         └── Footer.jsx       # Footer with contact info
     ```
 
     ## Tracking Events
 
+    `trackEvent` only queues the event, so it is safe in click handlers. Events
+    reach GTM, gtag and the Facebook Pixel in one batch per frame, and anything
+    still queued is flushed when the page is hidden. Set
+    `VITE_ANALYTICS_BEACON` to also post batches to your own endpoint with
+    `navigator.sendBeacon`. Debug logs only appear in `npm run dev`.
+
     ```javascript
     import { trackEvent } from './lib/gtm';
 
@@ -823,16 +2539,761 @@ with open(f"{root}/README.md", "w") as f:
 
     ## License
 
-    © 2025 QXP Global. All rights reserved.
-    """))
-
-print("\n✅ Starter created successfully!")
-print(f"\n📦 Location: {root}/")
-print("\n🚀 Next steps:")
-print(f"   cd {root}")
-print("   npm install")
-print("   cp .env.example .env  # Then edit .env with your GTM ID")
-print("   npm run dev")
-print("\n🎯 To create a zip:")
-print(f"   cd {root} && zip -r ../qxp-vite-starter.zip .")
-print("\n📚 See README.md for full documentation")
+    © 2025 %%legal_name%%. All rights reserved.
+    """)
+
+
+# Bump when the compiled representation changes shape.
+TEMPLATE_CACHE_VERSION = 1
+# Compiled templates written longer ago than this are pruned; one still in use
+# is simply rebuilt. Other checkouts and versions of the generator share the
+# cache directory, so a fresh entry is never removed for not being ours.
+TEMPLATE_CACHE_MAX_AGE = 30 * 24 * 3600
+
+_compiled = None
+
+
+def templates_digest():
+    """Hash of every template source; a changed template invalidates the cache."""
+    h = hashlib.sha256(f"qxp-templates-v{TEMPLATE_CACHE_VERSION}\n".encode())
+    for rel in sorted(TEMPLATES):
+        h.update(rel.encode("utf-8") + b"\0" + TEMPLATES[rel].encode("utf-8") + b"\0")
+    return h.hexdigest()
+
+
+def template_cache_dir():
+    """Where compiled templates live; QXP_STARTER_CACHE=off disables the cache."""
+    override = os.environ.get("QXP_STARTER_CACHE")
+    if override:
+        return None if override == "off" else override
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "qxp-starter")
+
+
+def compile_templates():
+    """Dedent and parse every template; the result is shared by all renders."""
+    return {rel: CompiledTemplate(rel, textwrap.dedent(src)) for rel, src in TEMPLATES.items()}
+
+
+def load_templates():
+    """Compiled templates from the on-disk cache, rebuilding it when stale."""
+    cache_dir = template_cache_dir()
+    if cache_dir is None:
+        return compile_templates()
+    digest = templates_digest()
+    path = os.path.join(cache_dir, f"templates-v{TEMPLATE_CACHE_VERSION}-{digest[:16]}.marshal")
+    try:
+        with open(path, "rb") as f:
+            data = marshal.load(f)
+        if data["digest"] == digest:
+            return {rel: CompiledTemplate.from_parts(rel, parts)
+                    for rel, parts in data["templates"].items()}
+    except (OSError, EOFError, ValueError, TypeError, KeyError):
+        pass
+
+    templates = compile_templates()
+    data = {"digest": digest, "templates": {rel: t.parts for rel, t in templates.items()}}
+    try:
+        _atomic_write(path, marshal.dumps(data))
+        prune_template_cache(cache_dir)
+    except OSError:
+        pass  # read-only home, full disk: compiling each run still works
+    return templates
+
+
+def prune_template_cache(cache_dir, max_age=TEMPLATE_CACHE_MAX_AGE, now=None):
+    """Remove compiled templates not written for max_age seconds."""
+    cutoff = (time.time() if now is None else now) - max_age
+    for name in os.listdir(cache_dir):
+        if not (name.startswith("templates-") and name.endswith(".marshal")):
+            continue
+        path = os.path.join(cache_dir, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.unlink(path)
+        except FileNotFoundError:
+            pass  # another generator pruned it first
+
+
+def compiled_templates():
+    global _compiled
+    if _compiled is None:
+        _compiled = load_templates()
+    return _compiled
+
+
+def resolve_config(overrides=None):
+    """Merge tenant overrides onto DEFAULT_CONFIG and validate the result."""
+    overrides = dict(overrides or {})
+    unknown = sorted(set(overrides) - set(DEFAULT_CONFIG))
+    if unknown:
+        raise ValueError(f"unknown config keys: {', '.join(unknown)}")
+    config = {**DEFAULT_CONFIG, **overrides}
+    colors = overrides.get("colors") or {}
+    if not isinstance(colors, dict):
+        raise ValueError(f"invalid colors {colors!r}: expected an object of name: #hex")
+    config["colors"] = {**DEFAULT_CONFIG["colors"], **colors}
+    if not SLUG_RE.match(str(config["slug"])):
+        raise ValueError(f"invalid slug {config['slug']!r}: use lowercase letters, digits, '.', '_' or '-'")
+    for name, value in config["colors"].items():
+        if not COLOR_NAME_RE.match(str(name)):
+            raise ValueError(f"invalid color name {name!r}: use letters, digits, '-' or '_', "
+                             "starting with a letter")
+        if not COLOR_RE.match(str(value)):
+            raise ValueError(f"invalid color {name}={value!r}: expected #rgb, #rrggbb or #rrggbbaa")
+    if config["gtm_load"] not in GTM_LOAD_MODES:
+        raise ValueError(f"invalid gtm_load {config['gtm_load']!r}: expected {' or '.join(GTM_LOAD_MODES)}")
+    try:
+        config["gtm_defer_timeout_ms"] = int(config["gtm_defer_timeout_ms"])
+    except (TypeError, ValueError):
+        raise ValueError(f"invalid gtm_defer_timeout_ms {config['gtm_defer_timeout_ms']!r}: "
+                         "expected milliseconds") from None
+    for key in ("crm_ingest", "prerender"):
+        if isinstance(config[key], str):  # CSV tenants
+            config[key] = config[key].strip().lower() in ("1", "true", "yes")
+    if isinstance(config["address_lines"], str):
+        config["address_lines"] = [l.strip() for l in config["address_lines"].split("|") if l.strip()]
+    return config
+
+
+def build_context(config):
+    """Placeholder values for a resolved config, including derived blocks."""
+    context = dict(config)
+    context["tailwind_colors"] = "\n".join(
+        f"        '{name}': '{value}'," for name, value in config["colors"].items())
+    context["readme_colors"] = "\n".join(
+        f"- `{name}`: {value}" for name, value in config["colors"].items())
+    context["lead_fields"] = "\n".join(
+        f"  {kind}: {_js(fields)}," for kind, fields in LEAD_FIELDS.items())
+    # Prerendered sites route on real paths (/pricing), others on #/pricing.
+    context["route_base"] = "" if config["prerender"] else "#"
+    context["routing"] = "path" if config["prerender"] else "hash"
+    return context
+
+
+def render_tree(config, templates=None, profiler=NULL_PROFILER, sections=None):
+    """Render the output files for a resolved config as {path: bytes}.
+
+    sections limits rendering to a subset (see select_sections). Pure and
+    in-memory: nothing touches the filesystem until the tree is handed to
+    IncrementalWriter.write_tree (or diff_tree).
+    """
+    templates = templates or compiled_templates()
+    values = _FilteredValues(build_context(config))
+    tree = {}
+    selected = SECTIONS.values() if sections is None else sections
+    for stage, group in itertools.groupby(selected, key=lambda sec: sec.stage):
+        with profiler.span(f"render:{stage}") as span:
+            files = size = 0
+            for sec in group:
+                if sec.build is not None:
+                    rendered = sec.build(config)
+                else:
+                    rendered = {rel: templates[rel].render(values) for rel in sec.outputs}
+                for rel, text in rendered.items():
+                    data = tree[rel] = text.encode("utf-8")
+                    files, size = files + 1, size + len(data)
+            span.update(files=files, bytes=size)
+    return tree
+
+
+def generate(config=None, out_dir=None, clean=False, templates=None, dry_run=False,
+             profiler=NULL_PROFILER, only=None, skip=None):
+    """Render a tenant's starter into out_dir and return the sync report.
+
+    config is a dict of overrides for DEFAULT_CONFIG; out_dir defaults to
+    ./<slug>. Only files whose content changed are rewritten, and with
+    dry_run=True nothing is written at all. only/skip restrict the run to
+    some sections; files of the other sections are left as they are. Pass a
+    Profiler to time each stage.
+    """
+    with profiler.span("resolve_config"):
+        config = resolve_config(config)
+    sections = select_sections(only, skip) if only or skip else None
+    out_dir = out_dir or os.path.join(".", config["slug"])
+    tree = render_tree(config, templates, profiler, sections)
+    if clean and not dry_run and os.path.exists(out_dir):
+        with profiler.span("clean"):
+            shutil.rmtree(out_dir)
+    writer = IncrementalWriter(out_dir, clean=clean, dry_run=dry_run)
+    report = writer.write_tree(tree, profiler, partial=sections is not None, owned=section_outputs(sections))
+    if not dry_run and "package.json" in tree:
+        with profiler.span("npm_state") as span:
+            report["npm"] = span["state"] = sync_npm_state(out_dir, config["slug"])
+    report["out_dir"] = out_dir
+    return report
+
+
+# ---------------------------------------------------------------------------
+# npm state
+#
+# node_modules and package-lock.json are never emitted, so regeneration leaves
+# them alone. What is left is keeping the lockfile in step with package.json:
+# a lockfile whose root dependencies match PACKAGE_JSON is kept (and copied
+# into a shared lock store keyed by the dependency hash); a stale one is
+# dropped together with npm's node_modules/.package-lock.json; and a site
+# without one is seeded from the store, so `npm ci` installs the exact tree
+# another tenant already resolved. No lockfile ships with the generator, so
+# the store starts empty: until one real `npm install` has run against the
+# current PACKAGE_JSON, sites get no lockfile and npm resolves the tree.
+# ---------------------------------------------------------------------------
+
+def dependency_set():
+    return {"dependencies": PACKAGE_JSON["dependencies"],
+            "devDependencies": PACKAGE_JSON["devDependencies"]}
+
+
+def dependency_hash():
+    return hashlib.sha256(json.dumps(dependency_set(), sort_keys=True).encode()).hexdigest()
+
+
+def lock_store_dir():
+    """Shared lockfile store; QXP_STARTER_LOCKS overrides the cache location."""
+    override = os.environ.get("QXP_STARTER_LOCKS")
+    if override:
+        return override
+    cache = template_cache_dir()
+    return os.path.join(cache, "locks") if cache else None
+
+
+def _read_json(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _lock_matches(lock):
+    root = (lock.get("packages") or {}).get("", {})
+    return all(root.get(key, {}) == deps for key, deps in dependency_set().items())
+
+
+def _retag_lock(lock, name):
+    lock = dict(lock, name=name)
+    packages = dict(lock.get("packages") or {})
+    if "" in packages:
+        packages[""] = dict(packages[""], name=name)
+    lock["packages"] = packages
+    return (json.dumps(lock, indent=2) + "\n").encode("utf-8")
+
+
+def sync_npm_state(out_dir, slug, store=None):
+    """Keep, invalidate, seed or harvest out_dir's package-lock.json.
+
+    Returns "kept", "harvested", "invalidated", "seeded", "reseeded" or
+    None when there is no lockfile to manage yet.
+    """
+    store = lock_store_dir() if store is None else store
+    stored = os.path.join(store, f"{dependency_hash()[:16]}.json") if store else None
+    lock_path = os.path.join(out_dir, "package-lock.json")
+    lock = _read_json(lock_path)
+
+    if lock is not None and _lock_matches(lock):
+        if stored and not os.path.exists(stored):
+            try:
+                _atomic_write(stored, _retag_lock(lock, DEFAULT_CONFIG["slug"]))
+                return "harvested"
+            except OSError:
+                pass
+        return "kept"
+
+    state = None
+    if os.path.exists(lock_path):
+        os.unlink(lock_path)
+        hidden = os.path.join(out_dir, "node_modules", ".package-lock.json")
+        if os.path.exists(hidden):
+            os.unlink(hidden)
+        state = "invalidated"
+    seed = _read_json(stored) if stored else None
+    if seed is not None and _lock_matches(seed):
+        _atomic_write(lock_path, _retag_lock(seed, slug))
+        state = "reseeded" if state else "seeded"
+    return state
+
+
+# ---------------------------------------------------------------------------
+# Watch mode
+#
+# Polls the generator source (where the templates live) and the tenant
+# config. A config edit re-renders only the sections whose inputs changed; a
+# template edit reloads the generator and re-renders everything in memory,
+# which takes well under a millisecond. Either way the writer only touches
+# files whose bytes changed, so Vite hot-updates just those modules.
+# ---------------------------------------------------------------------------
+
+def _mtime(path):
+    st = _stat(path) if path else None
+    return st.st_mtime_ns if st else None
+
+
+def _load_generator(path):
+    """Execute a fresh copy of the generator source as its own module."""
+    spec = importlib.util.spec_from_file_location("_qxp_starter_watch", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _read_config(path):
+    """Config overrides from the JSON file at path ({} without one)."""
+    if not path:
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except OSError as e:
+        raise ValueError(f"{path}: {e.strerror or e}") from None
+    except ValueError as e:
+        raise ValueError(f"{path}: invalid JSON: {e}") from None
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: config is {type(data).__name__}, expected an object")
+    return data
+
+
+def section_outputs(sections):
+    """Every path the given sections can write, emitted or not."""
+    return {rel for sec in sections or () for rel in sec.outputs}
+
+
+def changed_sections(old_config, new_config, sections, templates):
+    """Sections whose declared or template-derived inputs differ between configs."""
+    keys = {k for k in set(old_config) | set(new_config) if old_config.get(k) != new_config.get(k)}
+    return [sec for sec in sections if keys & set(sec.inputs(templates))]
+
+
+def watch(out_dir, config_path=None, only=None, skip=None, interval=0.05, debounce=0.03,
+          say=print, should_stop=None, base_config=None):
+    """Keep out_dir in sync with the templates and config until interrupted.
+
+    base_config holds overrides from the command line; the config file's
+    keys win over them, as in a one-shot run, on every reload.
+    """
+    source = os.path.abspath(__file__)
+    gen = sys.modules[__name__]
+    templates = compiled_templates()
+    base_config = dict(base_config or {})
+    config = resolve_config({**base_config, **_read_config(config_path)})
+    report = generate(config, out_dir, templates=templates, only=only, skip=skip)
+    say(f"👀 Watching {os.path.relpath(source)}"
+        + (f" and {config_path}" if config_path else "") + f" -> {out_dir}/ (Ctrl+C to stop)")
+    stamps = (_mtime(source), _mtime(config_path))
+
+    while not (should_stop and should_stop()):
+        time.sleep(interval)
+        current = (_mtime(source), _mtime(config_path))
+        if current == stamps:
+            continue
+        # Debounce: editors often write a file more than once per save.
+        while True:
+            time.sleep(debounce)
+            settled = (_mtime(source), _mtime(config_path))
+            if settled == current:
+                break
+            current = settled
+        started = time.perf_counter()
+        source_changed = current[0] != stamps[0]
+        stamps = current
+        try:
+            if source_changed:
+                gen = _load_generator(source)
+                templates = gen.compile_templates()
+            new_config = gen.resolve_config({**base_config, **_read_config(config_path)})
+            selected = gen.select_sections(only, skip) if only or skip else list(gen.SECTIONS.values())
+            partial = bool(only or skip)
+            if not source_changed:
+                selected = changed_sections(config, new_config, selected, templates)
+                partial = True
+            config = new_config
+            tree = gen.render_tree(config, templates, sections=selected)
+            writer = gen.IncrementalWriter(out_dir)
+            report = writer.write_tree(tree, partial=partial, owned=section_outputs(selected))
+            if "package.json" in report["changed"]:
+                gen.sync_npm_state(out_dir, config["slug"])
+        except Exception as e:  # keep watching through a bad edit
+            say(f"❌ {type(e).__name__}: {e}")
+            continue
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        written = report["added"] + report["changed"] + report["removed"]
+        say(f"⚡ {len(written)} file(s) updated in {elapsed_ms:.1f}ms"
+            + (f": {', '.join(written)}" if written else ""))
+    return report
+
+
+# ---------------------------------------------------------------------------
+# Zip output
+#
+# Archives are reproducible: entries are sorted, timestamps pinned to the zip
+# epoch and permissions normalised, so the same tree always produces the same
+# bytes. A sidecar <archive>.sha256 records the tree digest and lets
+# package() skip tenants whose content has not changed.
+# ---------------------------------------------------------------------------
+
+ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+ZIP_FORMAT = 1
+
+
+def tree_digest(tree):
+    """Stable digest of a rendered tree (paths and contents)."""
+    h = hashlib.sha256(f"qxp-zip-v{ZIP_FORMAT}\n".encode())
+    for rel in sorted(tree):
+        h.update(rel.encode("utf-8") + b"\0" + hashlib.sha256(tree[rel]).digest())
+    return h.hexdigest()
+
+
+def write_zip(tree, fileobj):
+    """Stream tree into a deterministic zip archive on fileobj."""
+    with zipfile.ZipFile(fileobj, "w", zipfile.ZIP_DEFLATED, compresslevel=9) as zf:
+        for rel in sorted(tree):
+            info = zipfile.ZipInfo(rel, date_time=ZIP_EPOCH)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.create_system = 3
+            info.external_attr = 0o100644 << 16
+            zf.writestr(info, tree[rel], compresslevel=9)
+
+
+def package(config=None, dest=None, templates=None, force=False, profiler=NULL_PROFILER):
+    """Render a tenant straight into a zip archive without staging on disk.
+
+    dest is a path or "-" for stdout. Returns {"path", "skipped", "bytes"};
+    skipped is True when the archive already holds identical content.
+    """
+    config = resolve_config(config)
+    dest = dest or f"{config['slug']}.zip"
+    tree = render_tree(config, templates, profiler)
+    if dest == "-":
+        # Built in memory first: zipfile lays out a seekable file differently
+        # from a pipe, and the archive must not depend on where it is going.
+        buf = io.BytesIO()
+        write_zip(tree, buf)
+        sys.stdout.buffer.write(buf.getvalue())
+        sys.stdout.buffer.flush()
+        return {"path": dest, "skipped": False, "bytes": len(buf.getvalue())}
+
+    digest = tree_digest(tree)
+    stamp = dest + ".sha256"
+    if not force and os.path.exists(dest):
+        try:
+            with open(stamp) as f:
+                if f.read().strip() == digest:
+                    return {"path": dest, "skipped": True, "bytes": os.path.getsize(dest)}
+        except OSError:
+            pass
+    with profiler.span("zip") as span:
+        buf = io.BytesIO()
+        write_zip(tree, buf)
+        _atomic_write(dest, buf.getvalue())
+        span.update(files=len(tree), bytes=len(buf.getvalue()))
+    _atomic_write(stamp, (digest + "\n").encode())
+    return {"path": dest, "skipped": False, "bytes": len(buf.getvalue())}
+
+
+# ---------------------------------------------------------------------------
+# Batch mode
+# ---------------------------------------------------------------------------
+
+def load_tenants(path):
+    """Read tenant configs from a JSON list (or {"tenants": [...]}) or a CSV.
+
+    CSV columns are config keys; use colors.<name> for individual colors and
+    separate address_lines with '|'. Empty cells fall back to the defaults.
+    """
+    try:
+        with open(path, newline="", encoding="utf-8") as f:
+            text = f.read()
+    except OSError as e:
+        raise ValueError(f"{path}: {e.strerror or e}") from None
+    if path.lower().endswith(".csv"):
+        tenants = []
+        for row in csv.DictReader(io.StringIO(text, newline="")):
+            tenant = {}
+            for key, value in row.items():
+                if key is None or value is None or value.strip() == "":
+                    continue
+                if key.startswith("colors."):
+                    tenant.setdefault("colors", {})[key[len("colors."):]] = value.strip()
+                else:
+                    tenant[key] = value.strip()
+            tenants.append(tenant)
+        return tenants
+    data = json.loads(text)
+    if isinstance(data, dict):
+        data = data.get("tenants", [])
+    if not isinstance(data, list):
+        raise ValueError(f"{path}: expected a list of tenant configs")
+    for i, tenant in enumerate(data):
+        if not isinstance(tenant, dict):
+            raise ValueError(f"{path}: tenant {i} is {type(tenant).__name__}, expected an object")
+    return data
+
+
+def _init_worker(templates):
+    global _compiled
+    _compiled = templates
+
+
+def _generate_tenant(job):
+    tenant, out_dir, options = job
+    slug = tenant.get("slug", "?")
+    profiler = Profiler(enabled=options.get("profile", False), tenant=slug)
+    started = time.perf_counter()
+    try:
+        with profiler.span(f"tenant:{slug}", cat="tenant"):
+            if options.get("zip"):
+                result = package(tenant, os.path.join(out_dir, f"{slug}.zip"), profiler=profiler)
+                summary = {"skipped": result["skipped"], "bytes": result["bytes"]}
+            else:
+                report = generate(tenant, os.path.join(out_dir, slug), clean=options.get("clean", False),
+                                  dry_run=options.get("dry_run", False), profiler=profiler,
+                                  only=options.get("only"), skip=options.get("skip"))
+                summary = {k: len(report[k]) for k in ("added", "changed", "unchanged", "removed")}
+                summary["bytes_written"] = report["bytes_written"]
+                summary["npm"] = report.get("npm")
+    except Exception as e:
+        summary = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+    else:
+        summary["ok"] = True
+    result = {"slug": slug, "seconds": time.perf_counter() - started, **summary}
+    if profiler.enabled:
+        result["spans"] = profiler.spans
+    return result
+
+
+def generate_batch(tenants, out_dir, jobs=None, clean=False, dry_run=False, zip=False,
+                   profile=False, only=None, skip=None):
+    """Generate one site per tenant under out_dir/<slug> across a process pool.
+
+    With zip=True each tenant becomes out_dir/<slug>.zip instead. Templates
+    are parsed once in the parent and handed to each worker. A failing
+    tenant is reported in its result and never stops the others. With
+    profile=True each result carries its tenant's spans under "spans".
+    only/skip select sections as for generate().
+    """
+    if zip and (only or skip):
+        raise ValueError("zip archives always contain every section")
+    if only or skip:
+        select_sections(only, skip)  # fail fast on patterns that match nothing
+    seen = set()
+    for tenant in tenants:
+        slug = tenant.get("slug")
+        if not slug:
+            raise ValueError("every tenant needs a slug")
+        if slug in seen:
+            raise ValueError(f"duplicate tenant slug {slug!r}")
+        seen.add(slug)
+
+    jobs = jobs or os.cpu_count() or 1
+    templates = compiled_templates()
+    options = {"clean": clean, "dry_run": dry_run, "zip": zip, "profile": profile,
+               "only": only, "skip": skip}
+    work = [(tenant, out_dir, options) for tenant in tenants]
+    if jobs == 1 or len(work) <= 1:
+        return [_generate_tenant(job) for job in work]
+    chunksize = max(1, len(work) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(templates,)) as pool:
+        return list(pool.map(_generate_tenant, work, chunksize=chunksize))
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def _print_report(report, elapsed_ms, say=print):
+    say(f"\n🔁 {len(report['added'])} added, {len(report['changed'])} changed, "
+        f"{len(report['unchanged'])} unchanged, {len(report['removed'])} removed "
+        f"in {elapsed_ms:.1f}ms")
+    for kind in ("added", "changed", "removed"):
+        for rel in report[kind]:
+            say(f"   {kind[0].upper()} {rel}")
+
+
+def _quiet(*args, **kwargs):
+    pass
+
+
+def _run_batch(args, say, profiler):
+    tenants = load_tenants(args.batch)
+    if args.npm_cache:
+        for tenant in tenants:
+            tenant.setdefault("npm_cache", os.path.abspath(args.npm_cache))
+    if args.gtm_load:
+        for tenant in tenants:
+            tenant.setdefault("gtm_load", args.gtm_load)
+    if args.crm_ingest:
+        for tenant in tenants:
+            tenant.setdefault("crm_ingest", True)
+    if args.prerender:
+        for tenant in tenants:
+            tenant.setdefault("prerender", True)
+    started = time.perf_counter()
+    os.makedirs(args.out_dir, exist_ok=True)
+    with profiler.span("batch", cat="batch", tenants=len(tenants)):
+        results = generate_batch(tenants, args.out_dir, jobs=args.jobs, clean=args.clean,
+                                 dry_run=args.dry_run, zip=bool(args.zip),
+                                 profile=profiler.enabled, only=args.only, skip=args.skip)
+    elapsed = time.perf_counter() - started
+    for r in results:
+        profiler.spans.extend(r.pop("spans", ()))
+    failed = [r for r in results if not r["ok"]]
+    for r in failed:
+        print(f"❌ {r['slug']}: {r['error']}", file=sys.stderr)
+    verb = "checked (dry run)" if args.dry_run else "packaged" if args.zip else "generated"
+    if args.zip:
+        skipped = sum(1 for r in results if r.get("skipped"))
+        say(f"📦 {skipped} archives unchanged and skipped")
+    say(f"\n✅ {len(results) - len(failed)}/{len(results)} sites {verb} in {elapsed:.2f}s "
+        f"({args.out_dir}/)")
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump({"seconds": elapsed, "results": results}, f, indent=2)
+        say(f"📊 Per-tenant timings written to {args.report}")
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the QXP Vite marketing starter.")
+    parser.add_argument("out", nargs="?", help=f"output directory (default: {DEFAULT_ROOT})")
+    parser.add_argument("--config", help="JSON file of config overrides for a single site")
+    parser.add_argument("--clean", action="store_true",
+                        help="delete the output directory (including node_modules) before generating")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="render in memory and report what would change without writing")
+    parser.add_argument("--diff", action="store_true",
+                        help="print a unified diff against the output directory (implies --dry-run)")
+    parser.add_argument("--zip", metavar="ARCHIVE", nargs="?", const=True,
+                        help="write a reproducible zip (path, or - for stdout) instead of a directory; "
+                             "in batch mode takes no path and writes <out-dir>/<slug>.zip")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="write per-stage timings as JSON lines (- for stdout), "
+                             "or a Chrome trace if PATH ends in .json")
+    parser.add_argument("--only", action="append", metavar="PATTERN",
+                        help="only render sections (or output paths) matching this glob, e.g. 'lib/*'; "
+                             "repeatable")
+    parser.add_argument("--skip", action="append", metavar="PATTERN",
+                        help="skip sections matching this glob, e.g. readme; repeatable")
+    parser.add_argument("--watch", action="store_true",
+                        help="regenerate changed files whenever the templates or --config change")
+    parser.add_argument("--list-sections", action="store_true",
+                        help="list sections with their output files and config inputs")
+    parser.add_argument("-q", "--quiet", action="store_true", help="no progress output")
+    batch = parser.add_argument_group("batch mode")
+    batch.add_argument("--batch", metavar="TENANTS",
+                       help="JSON or CSV file of tenant configs; one site per tenant")
+    batch.add_argument("--out-dir", default="sites", help="parent directory for batch sites")
+    batch.add_argument("--jobs", type=int, help="worker processes (default: CPU count)")
+    batch.add_argument("--report", help="write per-tenant timings and failures as JSON")
+    parser.add_argument("--npm-cache", metavar="DIR",
+                        help="point every generated site at this shared npm cache (writes .npmrc)")
+    parser.add_argument("--gtm-load", choices=GTM_LOAD_MODES,
+                        help="when generated sites load GTM: eager, or deferred to idle time "
+                             "or the first interaction (default: the config's gtm_load)")
+    parser.add_argument("--crm-ingest", action="store_true",
+                        help="also emit ingest/, a Python service that stores posted leads in SQLite")
+    parser.add_argument("--prerender", action="store_true",
+                        help="route on real paths and prerender every route to static HTML at build time")
+    args = parser.parse_args(argv)
+    args.dry_run = args.dry_run or args.diff
+    if args.watch and (args.batch or args.zip or args.dry_run):
+        parser.error("--watch works on a single output directory")
+    if args.zip and args.dry_run:
+        parser.error("--zip writes an archive; it cannot be combined with --dry-run or --diff")
+    if args.zip and (args.only or args.skip):
+        parser.error("--zip always packages every section; drop --only/--skip")
+    if args.batch and args.zip not in (None, True):
+        parser.error("--zip takes no path with --batch; archives go to --out-dir as <slug>.zip")
+    if args.zip == "-" and args.profile == "-":
+        parser.error("--zip - and --profile - cannot both write to stdout")
+    if args.list_sections:
+        for sec in SECTIONS.values():
+            print(f"{sec.name:<22} {', '.join(sec.outputs):<32} <- {', '.join(sec.inputs()) or '-'}")
+        return 0
+    say = _quiet if args.quiet or args.profile == "-" else print
+    profiler = Profiler(enabled=bool(args.profile))
+
+    try:
+        with profiler.span("templates") as span:
+            span.update(templates=len(compiled_templates()))
+        status = _run(args, say, profiler)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        status = 2
+    finally:
+        if args.profile:
+            write_profile(profiler.spans, args.profile)
+    if args.profile and args.profile != "-":
+        message = f"⏱️  Profile written to {args.profile}"
+        if args.zip == "-":  # stdout carries the archive
+            print(message, file=sys.stderr)
+        else:
+            say(message)
+    return status
+
+
+def _run(args, say, profiler):
+    if args.batch:
+        return _run_batch(args, say, profiler)
+
+    # Command-line overrides; keys the config file sets win over them.
+    overrides = {}
+    if args.npm_cache:
+        overrides["npm_cache"] = os.path.abspath(args.npm_cache)
+    if args.gtm_load:
+        overrides["gtm_load"] = args.gtm_load
+    if args.crm_ingest:
+        overrides["crm_ingest"] = True
+    if args.prerender:
+        overrides["prerender"] = True
+    config = {**overrides, **_read_config(args.config)}
+    root = args.out or DEFAULT_ROOT
+
+    if args.watch:
+        try:
+            watch(root, args.config, only=args.only, skip=args.skip, say=say, base_config=overrides)
+        except KeyboardInterrupt:
+            say("\n👋 Stopped watching")
+        return 0
+    if args.zip:
+        result = package(config, None if args.zip is True else args.zip, profiler=profiler)
+        if result["path"] != "-":
+            state = "unchanged, skipped" if result["skipped"] else f"{result['bytes']} bytes"
+            say(f"📦 {result['path']} ({state})")
+        return 0
+    if args.diff:
+        sections = select_sections(args.only, args.skip) if args.only or args.skip else None
+        tree = render_tree(resolve_config(config), profiler=profiler, sections=sections)
+        sys.stdout.writelines(diff_tree(tree, root, partial=sections is not None,
+                                          owned=section_outputs(sections)))
+        return 0
+    if args.dry_run:
+        started = time.perf_counter()
+        report = generate(config, root, dry_run=True, profiler=profiler,
+                          only=args.only, skip=args.skip)
+        _print_report(report, (time.perf_counter() - started) * 1000, say)
+        return 0
+
+    say("🚀 Creating QXP Vite Marketing Starter...")
+    if args.clean and os.path.exists(root):
+        say(f"📁 Removing existing {root}...")
+    started = time.perf_counter()
+    report = generate(config, root, clean=args.clean, profiler=profiler,
+                      only=args.only, skip=args.skip)
+    _print_report(report, (time.perf_counter() - started) * 1000, say)
+    if report.get("npm"):
+        say(f"🔒 package-lock.json {report['npm']}")
+
+    say("\n✅ Starter created successfully!")
+    say(f"\n📦 Location: {root}/")
+    say("\n🚀 Next steps:")
+    say(f"   cd {root}")
+    say("   npm ci" if os.path.exists(os.path.join(root, "package-lock.json")) else "   npm install")
+    say("   cp .env.example .env  # Then edit .env with your GTM ID")
+    say("   npm run dev")
+    say("\n🎯 To create a zip:")
+    say(f"   python {sys.argv[0]} --zip qxp-vite-starter.zip")
+    say("\n📚 See README.md for full documentation")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,519 @@
+#!/usr/bin/env python3
+"""
+QXP Critical CSS Inliner
+Post-build step that inlines the CSS each page needs for its first screen
+and loads the full stylesheet without blocking render:
+
+    npm run build && python src/critical_css.py              # dist/
+    python src/critical_css.py path/to/site/dist --budget 8192
+    python src/critical_css.py --dry-run                     # report only
+
+For every HTML file in the build, the above-the-fold markup is the <header>
+and the first element inside <main>, plus their ancestors. For the generated
+starter that is the header, the hero and its CTAs. A rule is critical when
+every compound of one of its selectors matches some element of that markup
+by tag, classes, id and attribute names. Pseudo-classes and combinators are
+ignored, so hover, focus and responsive variants of the brand classes
+(qxp-*) come along. Matching errs towards including a rule. @media and
+@supports blocks keep their critical rules. @keyframes and @font-face are
+kept when a critical rule uses them.
+
+The critical CSS goes into a <style data-critical> in <head>. Each linked
+stylesheet then loads with media="print" and switches to all on load, with a
+<noscript> fallback. Pages whose critical CSS exceeds --budget bytes are left
+as they are and fail the run. Client-rendered pages, whose #root is empty
+until JS runs, have no markup to measure and are skipped; generate the
+starter with --prerender to get per-route HTML. Pages that already carry
+critical CSS are skipped too, so the step can run twice.
+"""
+
+import os
+import re
+import sys
+import gzip
+import argparse
+import posixpath
+from html.parser import HTMLParser
+
+DEFAULT_DIST = "dist"
+DEFAULT_BUDGET = 10 * 1024
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+             "param", "source", "track", "wbr"}
+# At-rules whose blocks hold rules to filter; other blocks are kept or dropped whole.
+GROUPING_AT_RULES = ("@media", "@supports", "@layer", "@container")
+LINK_RE = re.compile(r"<link\b[^>]*>", re.I)
+ATTR_RE = re.compile(r"""([^\s=/>]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+)))?""")
+URL_RE = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+FONT_FAMILY_RE = re.compile(r"font-family:([^;}]+)")
+KEYFRAMES_NAME_RE = re.compile(r"@(?:-[a-z]+-)?keyframes\s+([^\s{]+)")
+
+
+# ---------------------------------------------------------------------------
+# HTML
+# ---------------------------------------------------------------------------
+
+class Element:
+    __slots__ = ("tag", "attrs", "classes", "children", "parent")
+
+    def __init__(self, tag, attrs, parent):
+        self.tag = tag
+        self.attrs = {name: value or "" for name, value in attrs}
+        self.classes = set(self.attrs.get("class", "").split())
+        self.children = []
+        self.parent = parent
+
+    def iter(self):
+        yield self
+        for child in self.children:
+            yield from child.iter()
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Element("#document", [], None)
+        self.stack = [self.root]
+
+    def handle_starttag(self, tag, attrs):
+        el = Element(tag, attrs, self.stack[-1])
+        self.stack[-1].children.append(el)
+        if tag not in VOID_TAGS:
+            self.stack.append(el)
+
+    def handle_startendtag(self, tag, attrs):
+        self.stack[-1].children.append(Element(tag, attrs, self.stack[-1]))
+
+    def handle_endtag(self, tag):
+        for i in range(len(self.stack) - 1, 0, -1):
+            if self.stack[i].tag == tag:
+                del self.stack[i:]
+                return
+
+
+def parse_html(text):
+    builder = _TreeBuilder()
+    builder.feed(text)
+    builder.close()
+    return builder.root
+
+
+def _first(root, tag):
+    return next((el for el in root.iter() if el.tag == tag), None)
+
+
+def fold_elements(document, full_page=False):
+    """Elements rendered above the fold, or None if the page has no markup."""
+    body = _first(document, "body")
+    if body is None:
+        return None
+    app = next((el for el in body.iter() if el.attrs.get("id") == "root"), body)
+    if not app.children:
+        return None
+    if full_page:
+        roots = [body]
+    else:
+        main = _first(app, "main")
+        roots = [r for r in (_first(app, "header"), main.children[0] if main and main.children else main) if r]
+        if not roots:
+            roots = [app]
+    fold = set()
+    for root in roots:
+        fold.update(root.iter())
+        node = root.parent
+        while node is not None and node.tag != "#document":
+            fold.add(node)
+            node = node.parent
+    return fold
+
+
+# ---------------------------------------------------------------------------
+# CSS
+# ---------------------------------------------------------------------------
+
+def _block_end(css, start):
+    """Index just past the } closing the block whose { is at start."""
+    depth, i, quote = 0, start, None
+    while i < len(css):
+        c = css[i]
+        if quote:
+            if c == "\\":
+                i += 1
+            elif c == quote:
+                quote = None
+        elif c in "\"'":
+            quote = c
+        elif c == "\\":
+            i += 1
+        elif c == "{":
+            depth += 1
+        elif c == "}":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return len(css)
+
+
+def parse_css(css):
+    """[(prelude, body)] at the top level of css. body is a nested list for
+    grouping at-rules, the declaration text otherwise, and None for
+    statements such as @import."""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    items, i = [], 0
+    while i < len(css):
+        brace, semi = css.find("{", i), css.find(";", i)
+        if brace == -1 and semi == -1:
+            break
+        if css[i:].lstrip().startswith("@") and semi != -1 and (brace == -1 or semi < brace):
+            items.append((css[i:semi].strip(), None))
+            i = semi + 1
+            continue
+        if brace == -1:
+            break
+        end = _block_end(css, brace)
+        prelude, inner = css[i:brace].strip(), css[brace + 1:end - 1]
+        if prelude.lower().startswith(GROUPING_AT_RULES):
+            items.append((prelude, parse_css(inner)))
+        else:
+            items.append((prelude, inner.strip()))
+        i = end
+    return items
+
+
+def serialize_css(items):
+    out = []
+    for prelude, body in items:
+        if body is None:
+            out.append(prelude + ";")
+        elif isinstance(body, list):
+            inner = serialize_css(body)
+            if inner:
+                out.append(f"{prelude}{{{inner}}}")
+        else:
+            out.append(f"{prelude}{{{body}}}")
+    return "".join(out)
+
+
+def _split_top(text, sep):
+    """text split on sep outside brackets, parentheses, strings and escapes."""
+    parts, depth, quote, start, i = [], 0, None, 0, 0
+    while i < len(text):
+        c = text[i]
+        if c == "\\":
+            i += 2
+            continue
+        if quote:
+            quote = None if c == quote else quote
+        elif c in "\"'":
+            quote = c
+        elif c in "([":
+            depth += 1
+        elif c in ")]":
+            depth -= 1
+        elif c == sep and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+        i += 1
+    parts.append(text[start:])
+    return parts
+
+
+def _read_ident(sel, i):
+    """(unescaped identifier starting at i, index after it)."""
+    out = []
+    while i < len(sel):
+        c = sel[i]
+        if c == "\\":
+            hex_digits = re.match(r"[0-9a-fA-F]{1,6} ?", sel[i + 1:])
+            if hex_digits:
+                out.append(chr(int(hex_digits.group().strip(), 16)))
+                i += 1 + len(hex_digits.group())
+            else:
+                out.append(sel[i + 1:i + 2])
+                i += 2
+        elif c.isalnum() or c in "-_" or ord(c) > 127:
+            out.append(c)
+            i += 1
+        else:
+            break
+    return "".join(out), i
+
+
+def _skip_group(sel, i, open_char, close_char):
+    depth = 0
+    while i < len(sel):
+        if sel[i] == "\\":
+            i += 2
+            continue
+        if sel[i] == open_char:
+            depth += 1
+        elif sel[i] == close_char:
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return i
+
+
+def compounds(selector):
+    """[(tag, classes, ids, attribute names)] for each compound of selector,
+    with pseudo-classes and pseudo-elements dropped."""
+    result, current = [], [None, set(), set(), set()]
+    i, sel = 0, selector.strip()
+
+    def close():
+        nonlocal current
+        if current[0] or current[1] or current[2] or current[3]:
+            result.append(tuple(current))
+        current = [None, set(), set(), set()]
+
+    while i < len(sel):
+        c = sel[i]
+        if c in " >+~\t\n":
+            close()
+            i += 1
+        elif c == ".":
+            name, i = _read_ident(sel, i + 1)
+            current[1].add(name)
+        elif c == "#":
+            name, i = _read_ident(sel, i + 1)
+            current[2].add(name)
+        elif c == "[":
+            end = _skip_group(sel, i, "[", "]")
+            name = re.split(r"[~|^$*]?=", sel[i + 1:end - 1], maxsplit=1)[0].strip().lower()
+            current[3].add(name.split("|")[-1])
+            i = end
+        elif c == ":":
+            i += 2 if sel[i + 1:i + 2] == ":" else 1
+            _, i = _read_ident(sel, i)
+            if sel[i:i + 1] == "(":
+                i = _skip_group(sel, i, "(", ")")
+        elif c == "*":
+            i += 1
+        else:
+            name, j = _read_ident(sel, i)
+            if j == i:  # unexpected character; skip it
+                i += 1
+                continue
+            current[0], i = name.lower(), j
+    close()
+    return result
+
+
+class FoldIndex:
+    """Fast lookups of fold elements by tag, class, id and attribute."""
+
+    def __init__(self, elements):
+        self.elements = list(elements)
+        self.by_class = {}
+        for el in self.elements:
+            for cls in el.classes:
+                self.by_class.setdefault(cls, []).append(el)
+
+    def matches(self, compound):
+        tag, classes, ids, attrs = compound
+        candidates = self.by_class.get(next(iter(classes)), []) if classes else self.elements
+        return any((tag is None or el.tag == tag)
+                   and classes <= el.classes
+                   and all(el.attrs.get("id") == i for i in ids)
+                   and all(a in el.attrs for a in attrs)
+                   for el in candidates)
+
+    def selector_matches(self, selector):
+        return all(self.matches(compound) for compound in compounds(selector))
+
+
+def critical_items(items, index):
+    """The rules of items that apply to the fold, keeping at-rule nesting."""
+    kept = []
+    for prelude, body in items:
+        if body is None:
+            if prelude.lower().startswith("@layer"):
+                kept.append((prelude, body))
+        elif isinstance(body, list):
+            inner = critical_items(body, index)
+            if inner:
+                kept.append((prelude, inner))
+        elif prelude.startswith("@"):
+            if prelude.lower().startswith("@property"):
+                kept.append((prelude, body))
+        elif any(index.selector_matches(sel) for sel in _split_top(prelude, ",")):
+            kept.append((prelude, body))
+    return kept
+
+
+def _supporting_items(items, critical_text):
+    """@font-face and @keyframes blocks that critical_text refers to."""
+    families = {f.strip().strip("'\"").lower()
+                for value in FONT_FAMILY_RE.findall(critical_text) for f in value.split(",")}
+    kept = []
+    for prelude, body in items:
+        if not isinstance(body, str):
+            continue
+        lower = prelude.lower()
+        if lower == "@font-face":
+            match = FONT_FAMILY_RE.search(body)
+            if match and match.group(1).strip().strip("'\"").lower() in families:
+                kept.append((prelude, body))
+        elif "keyframes" in lower:
+            name = KEYFRAMES_NAME_RE.match(prelude)
+            if name and re.search(r"animation[^;}]*\b%s\b" % re.escape(name.group(1)), critical_text):
+                kept.append((prelude, body))
+    return kept
+
+
+def _absolute_urls(css, css_url):
+    def replace(match):
+        url = match.group(2).strip()
+        if url.startswith(("/", "data:", "#")) or "://" in url:
+            return match.group(0)
+        return f"url({posixpath.normpath(posixpath.join(posixpath.dirname(css_url), url))})"
+    return URL_RE.sub(replace, css)
+
+
+def extract_critical(html_text, stylesheets, full_page=False):
+    """Critical CSS for html_text given [(url, css text)], or None if the page
+    has no prerendered markup."""
+    fold = fold_elements(parse_html(html_text), full_page)
+    if fold is None:
+        return None
+    index = FoldIndex(fold)
+    out = []
+    for url, css in stylesheets:
+        items = parse_css(css)
+        critical = serialize_css(critical_items(items, index))
+        support = serialize_css(_supporting_items(items, critical))
+        out.append(_absolute_urls(support + critical, url))
+    return "".join(out)
+
+
+# ---------------------------------------------------------------------------
+# Inlining
+# ---------------------------------------------------------------------------
+
+def tag_attrs(tag):
+    """Attributes of a start tag's text, e.g. '<link rel="x" href="y">'."""
+    return {m.group(1).lower(): next((g for g in m.groups()[1:] if g is not None), "")
+            for m in ATTR_RE.finditer(re.sub(r"^<[\w-]+", "", tag).rstrip("/>"))}
+
+
+def stylesheet_links(html_text, deferred=False):
+    """[(tag text, href)] for local render-blocking stylesheets.
+
+    With deferred, stylesheets that inline_critical switched to loading
+    asynchronously (media="print" plus onload) count too.
+    """
+    links = []
+    for match in LINK_RE.finditer(html_text):
+        attrs = tag_attrs(match.group(0))
+        href = attrs.get("href", "")
+        blocking = "media" not in attrs or (deferred and attrs["media"] == "print" and "onload" in attrs)
+        if ("stylesheet" in attrs.get("rel", "").lower().split() and blocking
+                and href and "://" not in href and not href.startswith("//")):
+            links.append((match.group(0), href))
+    return links
+
+
+def inline_critical(html_text, critical, links):
+    """html_text with critical CSS in <head> and links loading asynchronously."""
+    first = True
+    for tag, _ in links:
+        body = tag[:-2].rstrip() if tag.endswith("/>") else tag[:-1]
+        deferred = f"{body} media=\"print\" onload=\"this.media='all'\">"
+        replacement = f"{deferred}<noscript>{tag}</noscript>"
+        if first:
+            replacement = f"<style data-critical>{critical}</style>\n    {replacement}"
+            first = False
+        html_text = html_text.replace(tag, replacement, 1)
+    return html_text
+
+
+def _resolve(dist, page_rel, href, base):
+    """Filesystem path of an href found in dist/page_rel."""
+    path = href.split("?")[0].split("#")[0]
+    if path.startswith(base):
+        return os.path.join(dist, path[len(base):])
+    if path.startswith("/"):
+        return os.path.join(dist, path.lstrip("/"))
+    return os.path.join(dist, os.path.dirname(page_rel), path)
+
+
+def _gzip_size(text):
+    return len(gzip.compress(text.encode("utf-8"), 9))
+
+
+def process(dist, budget=DEFAULT_BUDGET, full_page=False, base="/", dry_run=False):
+    """Inline critical CSS into every page of dist; returns report rows."""
+    rows = []
+    for dirpath, dirnames, filenames in os.walk(dist):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if not name.endswith(".html"):
+                continue
+            path = os.path.join(dirpath, name)
+            rel = os.path.relpath(path, dist)
+            with open(path, encoding="utf-8") as f:
+                html_text = f.read()
+            row = {"page": rel, "status": "ok", "critical": 0, "gzip": 0, "full": 0}
+            rows.append(row)
+            if "<style data-critical>" in html_text:
+                row["status"] = "already inlined"
+                continue
+            links = stylesheet_links(html_text)
+            if not links:
+                row["status"] = "no stylesheet"
+                continue
+            sheets = []
+            for _, href in links:
+                with open(_resolve(dist, rel, href, base), encoding="utf-8") as f:
+                    sheets.append((href, f.read()))
+            row["full"] = sum(len(css.encode("utf-8")) for _, css in sheets)
+            critical = extract_critical(html_text, sheets, full_page)
+            if critical is None:
+                row["status"] = "client-rendered"
+                continue
+            row["critical"] = len(critical.encode("utf-8"))
+            row["gzip"] = _gzip_size(critical)
+            if row["critical"] > budget:
+                row["status"] = "over budget"
+                continue
+            if not dry_run:
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(inline_critical(html_text, critical, links))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inline above-the-fold CSS into each built page.")
+    parser.add_argument("dist", nargs="?", default=DEFAULT_DIST, help=f"build output (default: {DEFAULT_DIST})")
+    parser.add_argument("--budget", type=int, default=DEFAULT_BUDGET,
+                        help=f"maximum inlined CSS per page in bytes (default: {DEFAULT_BUDGET})")
+    parser.add_argument("--full-page", action="store_true",
+                        help="treat the whole page as above the fold")
+    parser.add_argument("--base", default="/", help="public base path the site is served from (Vite's base)")
+    parser.add_argument("--dry-run", action="store_true", help="report without changing any page")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.dist):
+        print(f"❌ {args.dist} does not exist; run the build first")
+        return 1
+    base = "/" + args.base.strip("/") + "/" if args.base.strip("/") else "/"
+    rows = process(args.dist, args.budget, args.full_page, base, args.dry_run)
+
+    print(f"{'page':<32} {'critical':>9} {'gzip':>7} {'full css':>9} {'share':>6}  status")
+    for row in rows:
+        share = f"{row['critical'] / row['full']:.0%}" if row["full"] and row["critical"] else "-"
+        print(f"{row['page']:<32} {row['critical']:>9} {row['gzip']:>7} {row['full']:>9} {share:>6}  {row['status']}")
+    inlined = [r for r in rows if r["status"] == "ok"]
+    over = [r for r in rows if r["status"] == "over budget"]
+    verb = "would inline" if args.dry_run else "inlined"
+    print(f"\n🎨 {verb} critical CSS in {len(inlined)} of {len(rows)} pages (budget {args.budget} bytes)")
+    if any(r["status"] == "client-rendered" for r in rows):
+        print("   Client-rendered pages were skipped; generate the starter with --prerender to cover them")
+    for row in over:
+        print(f"❌ {row['page']}: {row['critical']} bytes of critical CSS exceeds the budget")
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+QXP CRM Stand-in
+A local stand-in for the CRM endpoint that the generated lib/crm.js posts to
+(VITE_CRM_API), plus a load generator for sizing that path offline:
+
+    python src/crm_standin.py serve --latency 150 --jitter 100 --error-rate 0.05
+    python src/crm_standin.py load --url http://127.0.0.1:8787/leads --rate 200
+    python src/crm_standin.py load --rate 500 --duration 20 --rate-limit 300
+
+serve accepts what the outbox sends: a single {id, kind, ...fields} lead or a
+batch {"leads": [...]}. Validation and HTTP framing come from
+lead_protocol.py, which generated sites run as ingest/protocol.py. Each lead
+is checked against LEAD_FIELDS, the schema crm.js renders as expectedFields.
+Unknown kinds, unknown fields and non-string values are rejected with 422.
+Leads are deduplicated by id, so outbox retries are counted once. Faults can be
+injected: a fixed latency plus uniform jitter, a share of 503 responses, and a
+request rate limit that answers 429 with Retry-After. CORS is open, so a dev
+server can point VITE_CRM_API at http://127.0.0.1:8787/leads. GET /leads
+returns the stored leads and GET /stats the counters.
+
+load replays synthetic contact and demo leads at a fixed arrival rate (open
+loop) over a bounded pool of keep-alive connections. Latency is measured from
+each request's scheduled start, so time spent queueing for a connection when
+the server falls behind is included. The report gives throughput and
+p50/p95/p99/max latency per outcome. Without --url it starts an in-process
+stand-in with the given fault options. --max-p99 exits 1 when p99 exceeds the
+limit.
+
+Only the standard library is used.
+"""
+
+import sys
+import json
+import time
+import uuid
+import random
+import asyncio
+import argparse
+from collections import Counter
+from urllib.parse import urlsplit
+
+import lead_protocol as protocol
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8787
+CORS_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Methods": "POST, GET, OPTIONS",
+    "Access-Control-Allow-Headers": "Content-Type, Idempotency-Key",
+    "Access-Control-Max-Age": "600",
+}
+
+
+# ---------------------------------------------------------------------------
+# Stand-in server
+# ---------------------------------------------------------------------------
+
+class Faults:
+    """Latency, error and throttling behaviour of the stand-in."""
+
+    def __init__(self, latency_ms=0, jitter_ms=0, error_rate=0.0, rate_limit=0, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.random = random.Random(seed)
+        self._tokens = float(rate_limit)
+        self._refilled = time.monotonic()
+
+    def delay(self):
+        return (self.latency_ms + self.random.uniform(0, self.jitter_ms)) / 1000
+
+    def throttled(self):
+        """Token bucket of rate_limit requests per second (burst of one second)."""
+        if not self.rate_limit:
+            return False
+        now = time.monotonic()
+        self._tokens = min(self.rate_limit, self._tokens + (now - self._refilled) * self.rate_limit)
+        self._refilled = now
+        if self._tokens < 1:
+            return True
+        self._tokens -= 1
+        return False
+
+    def failed(self):
+        return self.error_rate > 0 and self.random.random() < self.error_rate
+
+
+class CRMStandin:
+    """In-memory CRM endpoint speaking just enough HTTP/1.1 for crm.js."""
+
+    def __init__(self, faults=None, path="/leads", verbose=False):
+        self.faults = faults or Faults()
+        self.path = path
+        self.verbose = verbose
+        self.leads = {}
+        self.stats = Counter()
+        self.server = None
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.server = await asyncio.start_server(self._serve, host, port, backlog=1024)
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def _serve(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await protocol.read_request(reader)
+                except protocol.BadRequest as e:
+                    writer.write(protocol.http_response(400, {"error": str(e)}, CORS_HEADERS, False))
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                method, target, headers, body = request
+                status, payload, extra = await self.handle(method, target, body)
+                # An oversized body is never read, so the connection cannot be reused.
+                keep_alive = body is not None and headers.get("connection", "").lower() != "close"
+                writer.write(protocol.http_response(status, payload, {**CORS_HEADERS, **extra}, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        except asyncio.CancelledError:
+            pass  # shutting down with the connection idle
+        finally:
+            writer.close()
+
+    async def handle(self, method, target, body):
+        """(status, JSON payload or None, extra headers) for one request."""
+        path = urlsplit(target).path
+        self.stats["requests"] += 1
+        if method == "OPTIONS":
+            return 204, None, {}
+        if method == "GET" and path == "/stats":
+            return 200, dict(self.stats, stored=len(self.leads)), {}
+        if path != self.path:
+            return 404, {"error": f"no such endpoint {path}"}, {}
+        if method == "GET":
+            return 200, {"leads": list(self.leads.values())}, {}
+        if method != "POST":
+            return 405, {"error": "use POST"}, {"Allow": "POST, GET, OPTIONS"}
+
+        faults = self.faults
+        if faults.throttled():
+            self.stats["throttled"] += 1
+            return 429, {"error": "rate limited"}, {"Retry-After": "1"}
+        delay = faults.delay()
+        if delay:
+            await asyncio.sleep(delay)
+        if faults.failed():
+            self.stats["failed"] += 1
+            return 503, {"error": "injected failure"}, {}
+        if body is None:
+            return 413, {"error": f"body larger than {protocol.MAX_BODY} bytes"}, {}
+
+        leads, problems = protocol.parse_leads(body)
+        if problems:
+            self.stats["rejected"] += 1
+            return 422, {"error": "invalid leads", "problems": problems}, {}
+        accepted = duplicates = 0
+        for lead in leads:
+            lead_id = lead.get("id") or str(uuid.uuid4())
+            if lead_id in self.leads:
+                duplicates += 1
+                continue
+            self.leads[lead_id] = {**lead, "id": lead_id}
+            accepted += 1
+            if self.verbose:
+                print(f"📥 {lead['kind']} lead {lead_id}: {lead.get('email') or lead.get('name') or '-'}")
+        self.stats["accepted"] += accepted
+        self.stats["duplicates"] += duplicates
+        return 200, {"ok": True, "accepted": accepted, "duplicates": duplicates}, {}
+
+
+# ---------------------------------------------------------------------------
+# Load generator
+# ---------------------------------------------------------------------------
+
+FIRST_NAMES = ("Amina", "Brian", "Cynthia", "David", "Esther", "Faith", "George", "Halima", "Ian", "Joy")
+LAST_NAMES = ("Otieno", "Wanjiru", "Mwangi", "Achieng", "Kiptoo", "Njeri", "Omondi", "Mutua")
+SCHOOLS = ("Greenhill Academy", "Riverside Primary", "Lakeview High", "Sunrise Junior School")
+ROLES = ("Principal", "Deputy Principal", "Teacher", "Bursar", "ICT Lead")
+
+
+def synthetic_lead(rng, kind):
+    """A lead shaped like the site's contact or demo form would send."""
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    values = {
+        "name": f"{first} {last}",
+        "email": f"{first}.{last}{rng.randrange(1000)}@example.com".lower(),
+        "school": rng.choice(SCHOOLS),
+        "phone": f"+2547{rng.randrange(10 ** 8):08d}",
+        "message": "We would like to learn more about QXP LMS.",
+        "role": rng.choice(ROLES),
+        "date": f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        "time": f"{rng.randint(8, 16):02d}:00",
+        "notes": "",
+        "source": "load-test",
+        "page_path": "/" if kind == "contact" else "/#demo",
+    }
+    return {"id": str(uuid.UUID(int=rng.getrandbits(128))), "kind": kind,
+            **{name: values[name] for name in protocol.LEAD_FIELDS[kind]}}
+
+
+class _Pool:
+    """Up to size keep-alive connections to one host."""
+
+    def __init__(self, host, port, size):
+        self.host, self.port = host, port
+        self.idle = []
+        self.slots = asyncio.Semaphore(size)
+
+    async def request(self, path, body):
+        async with self.slots:
+            conn = self.idle.pop() if self.idle else await asyncio.open_connection(self.host, self.port)
+            reader, writer = conn
+            try:
+                writer.write((f"POST {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+                              f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n")
+                             .encode("latin-1") + body)
+                await writer.drain()
+                status_line = await reader.readline()
+                if not status_line:
+                    raise ConnectionError("connection closed by server")
+                headers = await protocol.read_headers(reader)
+                await reader.readexactly(int(headers.get("content-length", 0)))
+            except BaseException:
+                writer.close()
+                raise
+            if headers.get("connection", "").lower() == "close":
+                writer.close()
+            else:
+                self.idle.append(conn)
+            return int(status_line.split()[1])
+
+    async def close(self):
+        for _, writer in self.idle:
+            writer.close()
+        await asyncio.gather(*(writer.wait_closed() for _, writer in self.idle), return_exceptions=True)
+
+
+async def run_load(url, rate, duration, concurrency=64, batch=1, demo_share=0.3, seed=None, timeout=10.0):
+    """Post synthetic leads at rate requests/s for duration seconds; returns a report dict."""
+    parts = urlsplit(url)
+    pool = _Pool(parts.hostname, parts.port or 80, concurrency)
+    rng = random.Random(seed)
+    results = []
+
+    async def one(scheduled, body, leads):
+        await asyncio.sleep(max(0.0, scheduled - time.monotonic()))
+        try:
+            status = await asyncio.wait_for(pool.request(parts.path or "/", body), timeout)
+            outcome = "ok" if status == 200 else str(status)
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+        except OSError:
+            outcome = "error"
+        results.append((outcome, time.monotonic() - scheduled, leads))
+
+    total = int(rate * duration)
+    start = time.monotonic() + 0.05
+    tasks = []
+    for i in range(total):
+        leads = [synthetic_lead(rng, "demo" if rng.random() < demo_share else "contact")
+                 for _ in range(batch)]
+        body = json.dumps(leads[0] if batch == 1 else {"leads": leads}).encode()
+        tasks.append(asyncio.ensure_future(one(start + i / rate, body, batch)))
+    await asyncio.gather(*tasks)
+    elapsed = time.monotonic() - start
+    await pool.close()
+
+    by_outcome = {}
+    for outcome, latency, _ in results:
+        by_outcome.setdefault(outcome, []).append(latency * 1000)
+    summary = {}
+    for outcome, latencies in sorted(by_outcome.items()):
+        latencies.sort()
+        summary[outcome] = {"count": len(latencies),
+                            **{f"p{p}": round(protocol.percentile(latencies, p), 2) for p in (50, 95, 99)},
+                            "max": round(latencies[-1], 2)}
+    delivered = sum(leads for outcome, _, leads in results if outcome == "ok")
+    return {"requests": total, "elapsed_s": round(elapsed, 3),
+            "target_rps": rate, "achieved_rps": round(len(results) / elapsed, 1),
+            "leads_per_s": round(delivered / elapsed, 1), "leads_delivered": delivered,
+            "outcomes": summary}
+
+
+def _print_report(report):
+    print(f"🚚 {report['requests']} requests in {report['elapsed_s']}s: "
+          f"{report['achieved_rps']} req/s (target {report['target_rps']}), "
+          f"{report['leads_per_s']} leads/s delivered")
+    print(f"   {'outcome':<10} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for outcome, row in report["outcomes"].items():
+        print(f"   {outcome:<10} {row['count']:>7} {row['p50']:>9} {row['p95']:>9} "
+              f"{row['p99']:>9} {row['max']:>9}")
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def _add_fault_options(parser):
+    parser.add_argument("--latency", type=float, default=0, metavar="MS", help="added latency per request")
+    parser.add_argument("--jitter", type=float, default=0, metavar="MS", help="extra uniform random latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered 503 (0-1)")
+    parser.add_argument("--rate-limit", type=int, default=0, metavar="RPS",
+                        help="answer 429 above this many requests per second (0: unlimited)")
+    parser.add_argument("--seed", type=int, help="seed for injected faults and synthetic leads")
+
+
+def _faults(args):
+    if not 0 <= args.error_rate <= 1:
+        raise SystemExit("❌ --error-rate must be between 0 and 1")
+    return Faults(args.latency, args.jitter, args.error_rate, args.rate_limit, args.seed)
+
+
+async def _serve_forever(args):
+    standin = CRMStandin(_faults(args), args.path, verbose=not args.quiet)
+    host, port = await standin.start(args.host, args.port)
+    print(f"🧪 CRM stand-in on http://{host}:{port}{args.path} "
+          f"(latency {args.latency:g}+{args.jitter:g}ms, errors {args.error_rate:.0%}, "
+          f"rate limit {args.rate_limit or 'none'})")
+    print(f"   Set VITE_CRM_API=http://{host}:{port}{args.path} in the site's .env")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await standin.close()
+
+
+async def _load(args):
+    standin = None
+    url = args.url
+    if not url:
+        standin = CRMStandin(_faults(args))
+        host, port = await standin.start(DEFAULT_HOST, 0)
+        url = f"http://{host}:{port}{standin.path}"
+    try:
+        report = await run_load(url, args.rate, args.duration, args.concurrency, args.batch,
+                                args.demo_share, args.seed, args.timeout)
+    finally:
+        if standin:
+            await standin.close()
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_report(report)
+    ok = report["outcomes"].get("ok")
+    if args.max_p99 is not None and (not ok or ok["p99"] > args.max_p99):
+        print(f"❌ p99 {ok['p99'] if ok else '-'}ms exceeds {args.max_p99:g}ms")
+        return 1
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local CRM stand-in and lead load generator.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="run the CRM stand-in")
+    serve.add_argument("--host", default=DEFAULT_HOST)
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve.add_argument("--path", default="/leads", help="endpoint path (default: /leads)")
+    serve.add_argument("--quiet", action="store_true", help="do not print each lead")
+    _add_fault_options(serve)
+
+    load = commands.add_parser("load", help="replay synthetic leads and report latency")
+    load.add_argument("--url", help="endpoint to load (default: an in-process stand-in)")
+    load.add_argument("--rate", type=float, default=100, help="requests per second (default: 100)")
+    load.add_argument("--duration", type=float, default=10, help="seconds to run (default: 10)")
+    load.add_argument("--concurrency", type=int, default=64, help="maximum open connections")
+    load.add_argument("--batch", type=int, default=1, help="leads per request, as the outbox batches them")
+    load.add_argument("--demo-share", type=float, default=0.3, help="share of demo leads (default: 0.3)")
+    load.add_argument("--timeout", type=float, default=10.0, help="seconds before a request counts as timed out")
+    load.add_argument("--max-p99", type=float, metavar="MS", help="exit 1 if p99 of successful requests exceeds this")
+    load.add_argument("--json", action="store_true", help="print the report as JSON")
+    _add_fault_options(load)
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "serve":
+            asyncio.run(_serve_forever(args))
+            return 0
+        return asyncio.run(_load(args))
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+QXP Static Asset Fingerprinter
+Post-build step that gives every static asset in the build output a
+content-addressed name, so it can be served with a year-long immutable
+Cache-Control header:
+
+    npm run build && python src/fingerprint_assets.py          # dist/
+    python src/fingerprint_assets.py dist --prune              # drop originals
+
+Vite already hashes what src/ imports (dist/assets/name-HASH.ext) but copies
+public/ verbatim. This script hashes both. Each distinct content is stored
+once: files Vite already hashed are the stored copy, and every other asset
+becomes dist/static/<name>.<sha256[:10]>.<ext>. Byte-identical files share one
+copy, whichever directory they came from. References in HTML, CSS and JS and
+the icon entries of *.webmanifest files are rewritten to the stored names.
+Each web manifest is fingerprinted after its icons are rewritten. A Vite
+chunk whose references were rewritten no longer matches the hash in its name,
+so it is renamed with a new hash, as is every chunk that imports it, and
+references to it (including Vite's build manifest) follow.
+
+A stored copy that already exists is never written again, since its name is
+its content; originals are hard-linked rather than copied where the
+filesystem allows. The script also writes dist/asset-manifest.json, mapping
+original URLs to fingerprinted ones, and a dist/_headers file with
+immutable caching for /static/* and /assets/* (Netlify and Cloudflare Pages
+read it; other hosts need the equivalent rule).
+"""
+
+import os
+import re
+import sys
+import json
+import shutil
+import hashlib
+import argparse
+import posixpath
+
+DEFAULT_DIST = "dist"
+STORE = "static"
+VITE_ASSETS = "assets"
+HASH_LEN = 10
+ASSET_EXTS = {".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif", ".svg", ".ico",
+              ".woff", ".woff2", ".ttf", ".otf", ".webmanifest"}
+TEXT_EXTS = {".html", ".css", ".js", ".mjs", ".webmanifest"}
+# Vite's default output naming: name-HASH.ext with an 8 character hash.
+VITE_HASHED_RE = re.compile(r"-[\w-]{8}\.[^.]+$")
+URL_RE = re.compile(
+    r"(?P<q>[\"'(])(?P<url>[^\"'()\s]+?\.(?:%s))(?P<tail>[?#][^\"'()\s]*)?(?=[\"')])"
+    % "|".join(sorted(ext[1:] for ext in ASSET_EXTS)))
+IMMUTABLE = "public, max-age=31536000, immutable"
+# Vite's build manifests name chunks, so they follow renamed ones.
+VITE_MANIFESTS = (os.path.join(".vite", "manifest.json"), "manifest.json")
+
+
+def file_digest(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _url(rel):
+    return "/" + rel.replace(os.sep, "/")
+
+
+def _scan(dist):
+    """Asset files (relative paths) under dist, Vite-hashed ones first."""
+    vite, other = [], []
+    for dirpath, dirnames, filenames in os.walk(dist):
+        dirnames.sort()
+        rel_dir = os.path.relpath(dirpath, dist)
+        if rel_dir.split(os.sep)[0] == STORE:
+            continue
+        for name in sorted(filenames):
+            if os.path.splitext(name)[1].lower() not in ASSET_EXTS:
+                continue
+            rel = os.path.normpath(os.path.join(rel_dir, name))
+            if rel.split(os.sep)[0] == VITE_ASSETS and VITE_HASHED_RE.search(name):
+                vite.append(rel)
+            else:
+                other.append(rel)
+    return vite, other
+
+
+def _store(src, dest):
+    """Put src's bytes at dest unless dest already holds them; True if written."""
+    if os.path.exists(dest) and os.path.getsize(dest) == os.path.getsize(src):
+        return False
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    tmp = f"{dest}.{os.getpid()}.tmp"
+    try:
+        os.link(src, tmp)
+    except OSError:
+        shutil.copyfile(src, tmp)
+    os.replace(tmp, dest)
+    return True
+
+
+def rewrite_references(text, base_url, mapping, base="/"):
+    """text with every asset URL that resolves to a key of mapping replaced.
+
+    Relative URLs resolve against base_url, the URL of the file the text
+    came from.
+    """
+    def replace(match):
+        url = match.group("url")
+        if "://" in url or url.startswith(("data:", "//")):
+            return match.group(0)
+        if url.startswith(base):
+            resolved = "/" + url[len(base):]
+        elif url.startswith("/"):
+            return match.group(0)
+        else:
+            resolved = posixpath.normpath(posixpath.join(posixpath.dirname(base_url), url))
+        target = mapping.get(resolved)
+        if target is None:
+            return match.group(0)
+        return match.group("q") + base + target.lstrip("/") + (match.group("tail") or "")
+    return URL_RE.sub(replace, text)
+
+
+def _rewrite_file(path, url, mapping, base):
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    new = rewrite_references(text, url, mapping, base)
+    if new == text:
+        return False
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(new)
+    return True
+
+
+def _text_files(dist):
+    """HTML, CSS and JS files under dist (relative paths), outside the store."""
+    files = []
+    for dirpath, dirnames, filenames in os.walk(dist):
+        dirnames[:] = sorted(d for d in dirnames if d != STORE)
+        for name in sorted(filenames):
+            if os.path.splitext(name)[1] in TEXT_EXTS:
+                files.append(os.path.relpath(os.path.join(dirpath, name), dist))
+    return files
+
+
+def _rehash_chunks(dist, rewritten, mapping):
+    """{old: new relative path} for Vite chunks whose content changed.
+
+    A chunk changes when it was rewritten or references (through other
+    chunks) one that was. Its new hash covers its Vite name, which stands for
+    its original content, and the stored names its reference closure now
+    points at, so chunks that import each other still get stable names.
+    """
+    chunks = [rel for rel in _text_files(dist)
+              if rel.split(os.sep)[0] == VITE_ASSETS and VITE_HASHED_RE.search(rel)]
+    texts = {}
+    for rel in chunks:
+        with open(os.path.join(dist, rel), encoding="utf-8") as f:
+            texts[rel] = f.read()
+    refs = {rel: [other for other in chunks if other != rel and os.path.basename(other) in texts[rel]]
+            for rel in chunks}
+    stored = sorted({posixpath.basename(target) for url, target in mapping.items() if url != target})
+
+    renames = {}
+    for rel in chunks:
+        reach, todo = set(), [rel]
+        while todo:
+            current = todo.pop()
+            if current not in reach:
+                reach.add(current)
+                todo.extend(refs[current])
+        if not reach & rewritten:
+            continue
+        used = [name for name in stored if any(name in texts[r] for r in reach)]
+        digest = hashlib.sha256("\n".join([os.path.basename(rel), *used]).encode()).hexdigest()[:8]
+        renames[rel] = VITE_HASHED_RE.sub(f"-{digest}{os.path.splitext(rel)[1]}", rel)
+    return renames
+
+
+def _rename_references(path, renames):
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    new = text
+    for old, renamed in renames.items():
+        new = new.replace(os.path.basename(old), os.path.basename(renamed))
+    if new != text:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(new)
+
+
+def fingerprint(dist, base="/", prune=False):
+    """Fingerprint and dedupe the assets under dist; returns a report dict."""
+    vite, other = _scan(dist)
+    mapping, stored = {}, {}
+    report = {"assets": 0, "stored": 0, "reused": 0, "deduped": 0, "rewritten": [], "pruned": 0}
+
+    for rel in vite:
+        stored.setdefault(file_digest(os.path.join(dist, rel)), _url(rel))
+
+    def add(rel):
+        path = os.path.join(dist, rel)
+        digest = file_digest(path)
+        report["assets"] += 1
+        if digest in stored:
+            report["deduped"] += 1
+        else:
+            stem, ext = os.path.splitext(os.path.basename(rel))
+            target = posixpath.join(STORE, f"{stem}.{digest[:HASH_LEN]}{ext}")
+            report["stored" if _store(path, os.path.join(dist, target)) else "reused"] += 1
+            stored[digest] = "/" + target
+        mapping[_url(rel)] = stored[digest]
+
+    # Web manifests reference icons, so they are hashed after the icons and
+    # after their own references are rewritten.
+    manifests = [rel for rel in other if rel.endswith(".webmanifest")]
+    for rel in other:
+        if rel not in manifests:
+            add(rel)
+    for rel in manifests:
+        if _rewrite_file(os.path.join(dist, rel), _url(rel), mapping, base):
+            report["rewritten"].append(rel)
+        add(rel)
+
+    for rel in _text_files(dist):
+        if not rel.endswith(".webmanifest") and _rewrite_file(os.path.join(dist, rel), _url(rel), mapping, base):
+            report["rewritten"].append(rel)
+
+    # A rewritten chunk keeps Vite's hash in its name but not its content, so
+    # it (and every chunk that references it) gets a new name before the
+    # immutable caching rule applies to it.
+    renames = _rehash_chunks(dist, set(report["rewritten"]), mapping)
+    if renames:
+        for rel in _text_files(dist) + [p for p in VITE_MANIFESTS if os.path.isfile(os.path.join(dist, p))]:
+            _rename_references(os.path.join(dist, rel), renames)
+        for old, new in renames.items():
+            os.replace(os.path.join(dist, old), os.path.join(dist, new))
+    report["renamed"] = renames
+
+    if prune:
+        for url, target in mapping.items():
+            if url != target:
+                os.remove(os.path.join(dist, url.lstrip("/")))
+                report["pruned"] += 1
+    mapping.update({_url(old): _url(new) for old, new in renames.items()})
+
+    # Merged with the previous run's, so pruned originals keep their entries.
+    manifest_path = os.path.join(dist, "asset-manifest.json")
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            previous = json.load(f)
+    except FileNotFoundError:
+        previous = {}
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(dict(sorted({**previous, **mapping}.items())), f, indent=2)
+        f.write("\n")
+    _write_headers(dist, base)
+    report["mapping"] = mapping
+    return report
+
+
+def _write_headers(dist, base):
+    path = os.path.join(dist, "_headers")
+    try:
+        with open(path, encoding="utf-8") as f:
+            existing = f.read()
+    except FileNotFoundError:
+        existing = ""
+    rules = "".join(f"{base}{prefix}/*\n  Cache-Control: {IMMUTABLE}\n"
+                    for prefix in (STORE, VITE_ASSETS)
+                    if f"{base}{prefix}/*\n" not in existing)
+    if rules:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(("\n" if existing and not existing.endswith("\n") else "") + rules)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fingerprint and dedupe static assets in a build.")
+    parser.add_argument("dist", nargs="?", default=DEFAULT_DIST, help=f"build output (default: {DEFAULT_DIST})")
+    parser.add_argument("--base", default="/", help="public base path the site is served from (Vite's base)")
+    parser.add_argument("--prune", action="store_true",
+                        help="delete the original files once they are stored under a fingerprinted name")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.dist):
+        print(f"❌ {args.dist} does not exist; run the build first")
+        return 1
+    base = "/" + args.base.strip("/") + "/" if args.base.strip("/") else "/"
+    report = fingerprint(args.dist, base, args.prune)
+    print(f"🔖 {report['assets']} assets: {report['stored']} stored, {report['reused']} unchanged, "
+          f"{report['deduped']} duplicates")
+    for rel in report["rewritten"]:
+        print(f"   rewrote {rel}")
+    for old, new in report["renamed"].items():
+        print(f"   renamed {old} -> {os.path.basename(new)}")
+    if report["pruned"]:
+        print(f"🗑️  Removed {report['pruned']} originals")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+QXP Lead Protocol
+What the generated lib/crm.js sends to VITE_CRM_API and how it travels. A
+request body is one lead ({id, kind, ...fields}) or a batch
+({"leads": [...]}). LEAD_FIELDS is the schema crm.js renders as
+expectedFields. HTTP/1.1 framing is kept to what the outbox needs:
+Content-Length bodies and keep-alive connections. A body over MAX_BODY is
+never read: the server answers 413 and closes the connection.
+
+crm_standin.py imports this module. create_vite_starter.py copies it into
+sites generated with crm_ingest as ingest/protocol.py, which the ingest
+server and benchmark import, so the stand-in and the service accept the
+same leads. Only the standard library is used.
+"""
+
+import json
+
+# Fields each form kind sends to the CRM.
+LEAD_FIELDS = {
+    "contact": ("name", "email", "school", "phone", "message", "source", "page_path"),
+    "demo": ("name", "email", "school", "role", "date", "time", "notes", "source", "page_path"),
+}
+
+MAX_BODY = 1 << 20
+REASONS = {200: "OK", 204: "No Content", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 413: "Payload Too Large", 422: "Unprocessable Entity",
+           429: "Too Many Requests", 503: "Service Unavailable"}
+
+
+class BadRequest(ValueError):
+    """A request that cannot be framed; answer 400 and close the connection."""
+
+
+def validate_lead(lead):
+    """Problems with one lead ({id?, kind, ...fields}); empty when valid."""
+    if not isinstance(lead, dict):
+        return ["lead must be an object"]
+    kind = lead.get("kind")
+    if kind not in LEAD_FIELDS:
+        return [f"unknown kind {kind!r}: expected {' or '.join(LEAD_FIELDS)}"]
+    problems = []
+    if "id" in lead and not isinstance(lead["id"], str):
+        problems.append("id must be a string")
+    for name, value in lead.items():
+        if name in ("id", "kind"):
+            continue
+        if name not in LEAD_FIELDS[kind]:
+            problems.append(f"unknown {kind} field {name!r}")
+        elif value is not None and not isinstance(value, str):
+            problems.append(f"{name} must be a string")
+    return problems
+
+
+def parse_leads(body):
+    """(leads, problems) for a request body: one lead or {"leads": [...]}."""
+    try:
+        data = json.loads(body)
+    except ValueError as e:
+        return [], [f"invalid JSON: {e}"]
+    leads = data.get("leads") if isinstance(data, dict) and "leads" in data else [data]
+    if not isinstance(leads, list) or not leads:
+        return [], ["leads must be a non-empty array"]
+    problems = [f"leads[{i}]: {p}" for i, lead in enumerate(leads) for p in validate_lead(lead)]
+    return leads, problems
+
+
+async def read_headers(reader):
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            return headers
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+
+async def read_request(reader):
+    """(method, target, headers, body) or None at end of stream.
+
+    body is None when Content-Length exceeds MAX_BODY. The body is left
+    unread, so the caller must answer 413 and close the connection. Raises
+    BadRequest for a malformed request line or Content-Length.
+    """
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    parts = line.decode("latin-1").split(" ", 2)
+    if len(parts) != 3:
+        raise BadRequest("malformed request line")
+    method, target, _ = parts
+    headers = await read_headers(reader)
+    value = headers.get("content-length", "0")
+    if not (value.isascii() and value.isdigit()):
+        raise BadRequest(f"invalid Content-Length {value!r}")
+    length = int(value)
+    if length > MAX_BODY:
+        return method, target, headers, None
+    return method, target, headers, await reader.readexactly(length) if length else b""
+
+
+def http_response(status, payload, headers, keep_alive):
+    """Response bytes with payload as a JSON body (None for no body)."""
+    body = b"" if payload is None else json.dumps(payload).encode()
+    lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}"]
+    if payload is not None:
+        lines.append("Content-Type: application/json")
+    lines.append(f"Content-Length: {len(body)}")
+    lines.append("Connection: " + ("keep-alive" if keep_alive else "close"))
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(1, -(-len(sorted_values) * pct // 100)) - 1]
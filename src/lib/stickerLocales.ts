@@ -0,0 +1,69 @@
+/**
+ * Sticker Locales
+ * ---------------
+ * Locale-independent sticker metadata plus lazily loaded label bundles
+ * (assests/manifests/stickers.core.json and locales/<lang>.json, generated by
+ * src/split_sticker_locales.py). Only the active locale's labels are fetched;
+ * each bundle is a separate chunk that is requested once and then cached.
+ */
+
+import core from "../assests/manifests/stickers.core.json";
+import type { StickerLocale } from "./stickerSearch";
+
+export interface StickerCoreItem {
+  id: string;
+  path: string;
+  viewBox: string;
+  category: string;
+  type: string;
+  tags: string[];
+  variant: string;
+  age: string;
+  rtl_mirror: boolean;
+}
+
+export interface StickerLabelBundle {
+  locale: string;
+  dir: "ltr" | "rtl";
+  labels: Record<string, string>;
+  categories: Record<string, string>;
+  /** Present for RTL locales: ids of stickers to flip horizontally. */
+  mirror?: string[];
+}
+
+export interface LocalizedSticker extends StickerCoreItem {
+  label: string;
+  /** rtl_mirror resolved for the locale: true only when RTL and mirrorable. */
+  mirror: boolean;
+}
+
+export const stickerItems = core.items as StickerCoreItem[];
+
+const bundles = import.meta.glob<StickerLabelBundle>("../assests/manifests/locales/*.json", {
+  import: "default",
+});
+const loading = new Map<string, Promise<StickerLabelBundle>>();
+
+/** Label bundle for locale, falling back to the pack's fallback locale. */
+export function loadStickerLabels(locale: StickerLocale | string): Promise<StickerLabelBundle> {
+  const key = core.locales.includes(locale) ? locale : core.fallbackLocale;
+  let bundle = loading.get(key);
+  if (!bundle) {
+    bundle = bundles[`../assests/manifests/locales/${key}.json`]();
+    // A failed fetch (e.g. offline) may be retried on the next call.
+    bundle.catch(() => loading.delete(key));
+    loading.set(key, bundle);
+  }
+  return bundle;
+}
+
+/** Every sticker with its label and mirroring resolved for locale. */
+export async function loadLocalizedStickers(locale: StickerLocale | string): Promise<LocalizedSticker[]> {
+  const bundle = await loadStickerLabels(locale);
+  const mirror = new Set(bundle.mirror ?? []);
+  return stickerItems.map((item) => ({
+    ...item,
+    label: bundle.labels[item.id] ?? item.id,
+    mirror: mirror.has(item.id),
+  }));
+}
@@ -0,0 +1,136 @@
+/**
+ * Sticker Search
+ * --------------
+ * Lookups against the prebuilt sticker index
+ * (assests/manifests/stickers.index.json, generated by
+ * src/build_sticker_index.py). Each query word is a binary search for the
+ * index tokens it prefixes; their posting lists are merged, and the lists of
+ * all words and facet filters intersected, smallest first. The work is
+ * proportional to the postings a query touches, not to the size of the pack.
+ */
+
+import stickerIndex from "../assests/manifests/stickers.index.json";
+
+export type StickerLocale = "en" | "sw" | "fr" | "ar";
+
+export interface StickerSearchOptions {
+  locale?: StickerLocale;
+  category?: string;
+  type?: string;
+  age?: string;
+  limit?: number;
+}
+
+type Postings = Record<string, number[]>;
+
+interface StickerIndex {
+  version: number;
+  ids: string[];
+  locales: string[];
+  tokens: Record<string, Postings>;
+  facets: Record<"category" | "type" | "age", Postings>;
+}
+
+const index = stickerIndex as StickerIndex;
+const SHARED = "*";
+
+// Sorted tokens per bucket, for prefix range lookups.
+const sortedTokens: Record<string, string[]> = Object.fromEntries(
+  Object.entries(index.tokens).map(([bucket, postings]) => [bucket, Object.keys(postings).sort()]),
+);
+
+const ARABIC_FOLD: Record<string, string> = {
+  "أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا", "ى": "ي", "ة": "ه",
+};
+
+/** Search tokens for text; must match normalize() in build_sticker_index.py. */
+export function normalizeStickerQuery(text: string): string[] {
+  const folded = text
+    .normalize("NFKD")
+    .replace(/\p{M}/gu, "")
+    .toLowerCase()
+    .replace(/[أإآٱىة]/g, (ch) => ARABIC_FOLD[ch]);
+  const tokens: string[] = [];
+  for (const token of folded.match(/[\p{L}\p{N}]+/gu) ?? []) {
+    tokens.push(token);
+    if (token.startsWith("ال") && token.length > 3) tokens.push(token.slice(2));
+  }
+  return tokens;
+}
+
+function lowerBound(keys: string[], key: string): number {
+  let lo = 0;
+  let hi = keys.length;
+  while (lo < hi) {
+    const mid = (lo + hi) >>> 1;
+    if (keys[mid] < key) lo = mid + 1;
+    else hi = mid;
+  }
+  return lo;
+}
+
+/** Sorted positions of stickers with a token starting with one of words. */
+function prefixPostings(locale: string, words: string[]): number[] {
+  const found = new Set<number>();
+  for (const bucket of [locale, SHARED]) {
+    const keys = sortedTokens[bucket];
+    if (!keys) continue;
+    for (const word of words) {
+      for (let i = lowerBound(keys, word); i < keys.length && keys[i].startsWith(word); i++) {
+        for (const pos of index.tokens[bucket][keys[i]]) found.add(pos);
+      }
+    }
+  }
+  return [...found].sort((a, b) => a - b);
+}
+
+function intersect(a: number[], b: number[]): number[] {
+  const out: number[] = [];
+  for (let i = 0, j = 0; i < a.length && j < b.length; ) {
+    if (a[i] === b[j]) {
+      out.push(a[i]);
+      i++;
+      j++;
+    } else if (a[i] < b[j]) i++;
+    else j++;
+  }
+  return out;
+}
+
+/**
+ * Sticker ids matching every word of query (as a prefix) in the given locale
+ * or in the language-neutral tags, narrowed by any facet filters. An empty
+ * query returns every sticker that passes the filters, in manifest order.
+ */
+export function searchStickers(query: string, options: StickerSearchOptions = {}): string[] {
+  const { locale = "en", limit } = options;
+  const lists: number[][] = [];
+
+  const tokens = normalizeStickerQuery(query);
+  for (let i = 0; i < tokens.length; i++) {
+    // "الأسد" also yields "أسد"; either spelling may match.
+    const words = tokens[i].startsWith("ال") && tokens[i + 1] === tokens[i].slice(2)
+      ? [tokens[i], tokens[++i]]
+      : [tokens[i]];
+    lists.push(prefixPostings(locale, words));
+  }
+  for (const facet of ["category", "type", "age"] as const) {
+    const value = options[facet];
+    if (value !== undefined) lists.push(index.facets[facet][value] ?? []);
+  }
+
+  let positions: number[];
+  if (lists.length === 0) {
+    positions = index.ids.map((_, pos) => pos);
+  } else {
+    lists.sort((a, b) => a.length - b.length);
+    positions = lists.reduce(intersect);
+  }
+  if (limit !== undefined) positions = positions.slice(0, limit);
+  return positions.map((pos) => index.ids[pos]);
+}
+
+/** Distinct values of a facet, e.g. every category, for building filter chips. */
+export function stickerFacetValues(facet: "category" | "type" | "age"): string[] {
+  return Object.keys(index.facets[facet]);
+}
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+QXP Sticker SVG Optimizer
+Minifies every SVG listed in assests/manifests/stickers.manifest.json across
+a process pool, prints a before/after size report and enforces a size budget:
+
+    python src/optimize_stickers.py                 # report + budget check
+    python src/optimize_stickers.py --write         # minify the sources in place
+    python src/optimize_stickers.py --out-dir dist/stickers
+    python src/optimize_stickers.py --save-budget   # accept current sizes
+
+The optimizer drops comments, editor metadata, unreferenced ids and
+whitespace-only text between elements (never inside <text>). It rounds coordinates to --precision decimals,
+compacts path data, minifies <style> and removes rules no element uses. It
+also drops attributes that a class rule overrides or that repeat a default.
+<title>, <desc>, text content, viewBox, referenced ids and every
+var(--token) hook are kept, and each result is checked for them before it is
+accepted.
+"""
+
+import io
+import os
+import re
+import sys
+import gzip
+import json
+import argparse
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ASSETS = os.path.join(HERE, "assests")
+MANIFEST = os.path.join(ASSETS, "manifests", "stickers.manifest.json")
+BUDGET = os.path.join(ASSETS, "manifests", "stickers.budget.json")
+DEFAULT_PRECISION = 2
+# Largest optimized sticker accepted when it has no budget entry yet.
+DEFAULT_MAX_FILE = 4096
+
+EDITOR_NAMESPACES = (
+    "http://www.inkscape.org/namespaces/inkscape",
+    "http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd",
+    "http://www.bohemiancoding.com/sketch/ns",
+    "http://ns.adobe.com/AdobeIllustrator/10.0/",
+)
+DROPPED_ELEMENTS = {"metadata"}
+DROPPED_ATTRS = {"version", "enable-background", "data-name", "{http://www.w3.org/XML/1998/namespace}space"}
+# Defaults of non-inherited attributes, safe to omit.
+DEFAULT_ATTRS = {"x": "0", "y": "0", "cx": "0", "cy": "0", "opacity": "1"}
+NUMERIC_ATTRS = {"x", "y", "x1", "y1", "x2", "y2", "cx", "cy", "r", "rx", "ry",
+                 "width", "height", "stroke-width", "opacity", "offset"}
+TEXT_ELEMENTS = {"title", "desc", "style", "text", "tspan", "textPath"}
+# Elements whose children's tails are rendered text.
+INLINE_TEXT_PARENTS = {"text", "tspan", "textPath"}
+
+SVG_NS = "http://www.w3.org/2000/svg"
+NUMBER_RE = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+PATH_TOKEN_RE = re.compile(r"([MmZzLlHhVvCcSsQqTtAa])|([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)")
+RULE_RE = re.compile(r"([^{}]+)\{([^}]*)\}")
+CLASS_RE = re.compile(r"\.([\w-]+)")
+VAR_RE = re.compile(r"var\(--[\w-]+\)")
+IDREF_RE = re.compile(r"url\(#([^)]+)\)")
+ID_SELECTOR_RE = re.compile(r"#([\w-]+)")
+
+ET.register_namespace("", SVG_NS)
+
+
+def sticker_file(item):
+    """Path on disk of a manifest item (manifest paths are relative to src/)."""
+    return os.path.join(HERE, *item["path"].split("/"))
+
+
+def _local(name):
+    return name.rsplit("}", 1)[-1]
+
+
+def _number(text, precision):
+    value = round(float(text), precision)
+    out = f"{value:.{precision}f}".rstrip("0").rstrip(".") if precision else str(int(value))
+    if out in ("-0", ""):
+        out = "0"
+    if out.startswith("0."):
+        out = out[1:]
+    elif out.startswith("-0."):
+        out = "-" + out[2:]
+    return out
+
+
+def _separator(previous, number):
+    """Whether number needs a space after previous to be read back correctly."""
+    if previous is None or number[0] in "-+":
+        return False
+    return not (number[0] == "." and "." in previous)
+
+
+def _join_numbers(numbers):
+    out, previous = "", None
+    for num in numbers:
+        out += (" " if _separator(previous, num) else "") + num
+        previous = num
+    return out
+
+
+def compact_path(d, precision):
+    """Path data with rounded numbers, minimal separators and repeated commands elided."""
+    out, command, previous = "", None, None
+    for cmd, num in PATH_TOKEN_RE.findall(d):
+        if cmd:
+            # "L1 2 L3 4" is "L1 2 3 4"; M is excluded because repeats after M mean L.
+            if cmd == command and cmd not in "MmZz":
+                continue
+            out, command, previous = out + cmd, cmd, None
+        else:
+            num = _number(num, precision)
+            out += (" " if _separator(previous, num) else "") + num
+            previous = num
+    return out
+
+
+def minify_css(css):
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};:,>])\s*", r"\1", css)
+    return css.replace(";}", "}").strip()
+
+
+def _style_rules(css):
+    """[(selector, {property: value})] from a flat stylesheet."""
+    rules = []
+    for selector, body in RULE_RE.findall(css):
+        decls = {}
+        for decl in body.split(";"):
+            if ":" in decl:
+                prop, value = decl.split(":", 1)
+                decls[prop.strip()] = value.strip()
+        rules.append((selector.strip(), decls))
+    return rules
+
+
+def _referenced_ids(root):
+    """Ids named by url(#id), "#id" attribute values or #id selectors in <style>."""
+    referenced = set()
+    for el in root.iter():
+        for value in el.attrib.values():
+            referenced.update(IDREF_RE.findall(value))
+            if value.startswith("#"):
+                referenced.add(value[1:])
+        if el.text and _local(el.tag) == "style":
+            referenced.update(IDREF_RE.findall(el.text))
+            for selector, _ in _style_rules(minify_css(el.text)):
+                referenced.update(ID_SELECTOR_RE.findall(selector))
+    return referenced
+
+
+def _text_content(root):
+    """Whitespace-normalised text of every top-level <text> element."""
+    return [" ".join("".join(el.itertext()).split()) for el in root.iter(f"{{{SVG_NS}}}text")]
+
+
+def optimize_svg(source, precision=DEFAULT_PRECISION):
+    """Minified SVG text for source. Raises ValueError if the result would lose
+    accessibility text or theme hooks."""
+    root = ET.fromstring(source)
+
+    # Editor metadata and foreign-namespace attributes.
+    for parent in list(root.iter()):
+        for child in list(parent):
+            if _local(child.tag) in DROPPED_ELEMENTS or child.tag.startswith(tuple("{" + ns for ns in EDITOR_NAMESPACES)):
+                parent.remove(child)
+    for el in root.iter():
+        for attr in list(el.attrib):
+            if attr in DROPPED_ATTRS or attr.startswith(tuple("{" + ns for ns in EDITOR_NAMESPACES)):
+                del el.attrib[attr]
+
+    # Class rules: which are used, and which properties they set per element.
+    styles = [el for el in root.iter() if _local(el.tag) == "style"]
+    rules = _style_rules(minify_css(" ".join(el.text or "" for el in styles)))
+    used_classes = {c for el in root.iter() for c in el.get("class", "").split()}
+    kept_rules = [(sel, decls) for sel, decls in rules
+                  if not CLASS_RE.findall(sel) or used_classes.intersection(CLASS_RE.findall(sel))]
+    class_props = {sel[1:]: decls for sel, decls in kept_rules if re.fullmatch(r"\.[\w-]+", sel)}
+    for el in styles:
+        el.text = "".join(f"{sel}{{{';'.join(f'{k}:{v}' for k, v in decls.items())}}}"
+                          for sel, decls in kept_rules)
+    parents = {child: parent for parent in root.iter() for child in parent}
+    for el in styles:
+        if not el.text and el in parents:
+            parents[el].remove(el)
+
+    referenced = _referenced_ids(root)
+    parents = {child: parent for parent in root.iter() for child in parent}
+
+    for el in root.iter():
+        tag = _local(el.tag)
+        overridden = {prop for c in el.get("class", "").split() for prop in class_props.get(c, {})}
+        for attr, value in list(el.attrib.items()):
+            if attr in overridden or DEFAULT_ATTRS.get(attr) == value.strip():
+                del el.attrib[attr]
+            elif attr == "id" and value not in referenced and el is not root:
+                del el.attrib[attr]
+            elif attr == "d":
+                el.set(attr, compact_path(value, precision))
+            elif attr == "points":
+                el.set(attr, _join_numbers(_number(n, precision) for n in NUMBER_RE.findall(value)))
+            elif attr in NUMERIC_ATTRS and NUMBER_RE.fullmatch(value.strip()):
+                el.set(attr, _number(value, precision))
+            elif attr == "style":
+                el.set(attr, minify_css(value).rstrip(";"))
+        if tag in ("title", "desc"):
+            el.text = re.sub(r"\s+", " ", el.text or "").strip()
+        elif tag not in TEXT_ELEMENTS:
+            el.text = None
+        # Tails inside text are rendered; elsewhere only layout whitespace is dropped.
+        parent = parents.get(el)
+        if (el.tail is not None and not el.tail.strip()
+                and (parent is None or _local(parent.tag) not in INLINE_TEXT_PARENTS)):
+            el.tail = None
+
+    out = ET.tostring(root, encoding="unicode", short_empty_elements=True).replace(" />", "/>")
+    _verify(source, out)
+    return out
+
+
+def _verify(before, after):
+    old, new = ET.fromstring(before), ET.fromstring(after)
+    for tag in ("title", "desc"):
+        a = [re.sub(r"\s+", " ", el.text or "").strip() for el in old.iter(f"{{{SVG_NS}}}{tag}")]
+        b = [el.text or "" for el in new.iter(f"{{{SVG_NS}}}{tag}")]
+        if a != b:
+            raise ValueError(f"optimizing changed <{tag}>")
+    if _text_content(old) != _text_content(new):
+        raise ValueError("optimizing changed <text> content")
+    old_ids = {el.get("id") for el in old.iter() if el.get("id")}
+    new_ids = {el.get("id") for el in new.iter() if el.get("id")}
+    old_refs, new_refs = _referenced_ids(old), _referenced_ids(new)
+    missing = (old_refs & old_ids) - new_ids
+    if missing or not new_refs <= old_refs:
+        raise ValueError(f"optimizing changed referenced ids: {', '.join(sorted(missing | (new_refs - old_refs)))}")
+    if old.get("viewBox") != new.get("viewBox"):
+        raise ValueError("optimizing changed the viewBox")
+    lost = set(VAR_RE.findall(before)) - set(VAR_RE.findall(after))
+    if lost:
+        raise ValueError(f"optimizing dropped {', '.join(sorted(lost))}")
+
+
+def _gzip_size(data):
+    buf = io.BytesIO()
+    with gzip.GzipFile(fileobj=buf, mode="wb", mtime=0) as f:
+        f.write(data)
+    return len(buf.getvalue())
+
+
+def _optimize_file(job):
+    sticker_id, path, precision = job
+    with open(path, "rb") as f:
+        before = f.read()
+    result = {"id": sticker_id, "path": path, "before": len(before)}
+    try:
+        text = optimize_svg(before.decode("utf-8"), precision)
+    except (ET.ParseError, ValueError) as exc:
+        result.update(ok=False, error=str(exc))
+        return result
+    after = text.encode("utf-8")
+    result.update(ok=True, text=text, after=len(after), gzip=_gzip_size(after))
+    return result
+
+
+def optimize_pack(manifest, precision=DEFAULT_PRECISION, jobs=None):
+    """Optimize every sticker in manifest; one result dict per item, in order."""
+    work = [(item["id"], sticker_file(item), precision) for item in manifest["items"]]
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(work) <= 1:
+        return [_optimize_file(job) for job in work]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(_optimize_file, work, chunksize=max(1, len(work) // (jobs * 4))))
+
+
+def check_budget(results, budget, tolerance, max_file):
+    """Budget violations for the optimized sizes in results."""
+    problems = []
+    files = budget.get("files", {})
+    for r in results:
+        if not r["ok"]:
+            continue
+        limit = files.get(r["id"])
+        if limit is None:
+            if r["after"] > max_file:
+                problems.append(f"{r['id']}: {r['after']} bytes, new stickers may use {max_file}")
+        elif r["after"] > limit * (1 + tolerance):
+            problems.append(f"{r['id']}: {limit} -> {r['after']} bytes")
+    total = sum(r["after"] for r in results if r["ok"])
+    if "total" in budget and total > budget["total"] * (1 + tolerance):
+        problems.append(f"pack total: {budget['total']} -> {total} bytes")
+    return problems
+
+
+def _print_report(results):
+    print(f"{'sticker':<34} {'before':>7} {'after':>7} {'saved':>6} {'gzip':>6}")
+    for r in results:
+        if r["ok"]:
+            saved = 1 - r["after"] / r["before"] if r["before"] else 0
+            print(f"{r['id']:<34} {r['before']:>7} {r['after']:>7} {saved:>6.0%} {r['gzip']:>6}")
+        else:
+            print(f"{r['id']:<34} {r['before']:>7}  ❌ {r['error']}")
+    ok = [r for r in results if r["ok"]]
+    before, after = sum(r["before"] for r in ok), sum(r["after"] for r in ok)
+    print(f"{'total':<34} {before:>7} {after:>7} {1 - after / before if before else 0:>6.0%} "
+          f"{sum(r['gzip'] for r in ok):>6}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Minify the sticker SVGs and check their size budget.")
+    parser.add_argument("--manifest", default=MANIFEST, help="sticker manifest to read")
+    parser.add_argument("--precision", type=int, default=DEFAULT_PRECISION,
+                        help=f"decimal places kept in coordinates (default: {DEFAULT_PRECISION})")
+    parser.add_argument("--jobs", type=int, help="worker processes (default: CPU count)")
+    out = parser.add_mutually_exclusive_group()
+    out.add_argument("--write", action="store_true", help="replace the source SVGs with the optimized ones")
+    out.add_argument("--out-dir", help="write optimized copies here, mirroring stickers/<category>/")
+    parser.add_argument("--budget", default=BUDGET, help="size budget to check against")
+    parser.add_argument("--save-budget", action="store_true", help="record the optimized sizes as the budget")
+    parser.add_argument("--tolerance", type=float, default=0.05,
+                        help="allowed growth over budget (default: 0.05)")
+    parser.add_argument("--max-file", type=int, default=DEFAULT_MAX_FILE,
+                        help=f"limit for stickers missing from the budget (default: {DEFAULT_MAX_FILE})")
+    args = parser.parse_args(argv)
+
+    with open(args.manifest, encoding="utf-8") as f:
+        results = optimize_pack(json.load(f), args.precision, args.jobs)
+    _print_report(results)
+    failed = [r for r in results if not r["ok"]]
+
+    if args.write or args.out_dir:
+        for r in results:
+            if not r["ok"]:
+                continue
+            if args.write:
+                dest = r["path"]
+            else:
+                dest = os.path.join(args.out_dir, os.path.basename(os.path.dirname(r["path"])),
+                                    os.path.basename(r["path"]))
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+            with open(dest, "w", encoding="utf-8") as f:
+                f.write(r["text"])
+        print(f"\n✍️  Wrote {len(results) - len(failed)} stickers" +
+              (f" to {args.out_dir}" if args.out_dir else " in place"))
+
+    if args.save_budget:
+        budget = {"total": sum(r["after"] for r in results if r["ok"]),
+                  "files": {r["id"]: r["after"] for r in results if r["ok"]}}
+        with open(args.budget, "w", encoding="utf-8") as f:
+            json.dump(budget, f, indent=2)
+            f.write("\n")
+        print(f"📌 Budget saved to {os.path.relpath(args.budget)}")
+        return 1 if failed else 0
+
+    try:
+        with open(args.budget, encoding="utf-8") as f:
+            budget = json.load(f)
+    except FileNotFoundError:
+        budget = {}
+    problems = check_budget(results, budget, args.tolerance, args.max_file)
+    for line in problems:
+        print(f"❌ {line}")
+    if not problems and not failed:
+        print(f"\n✅ Within budget ({args.tolerance:.0%} tolerance)")
+    return 1 if problems or failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+QXP Resource Hints
+Post-build step that adds resource hints to every built page. The browser can
+then fetch a page's code, fonts and hero image, and open connections to
+third parties, before the JavaScript that needs them runs:
+
+    npm run build && python src/resource_hints.py             # dist/
+    python src/resource_hints.py path/to/site/dist --dry-run
+    python src/resource_hints.py --preconnect https://cdn.example.com
+
+Vite's build manifest (dist/.vite/manifest.json, written with build.manifest
+enabled) maps source modules to built chunks. Vite already preloads the
+entry's static imports. For each page, this script preloads the chunk graph
+of the route it renders:
+
+- modulepreload for the route module and its static imports
+- preload for the route's CSS, without crossorigin to match the
+  <link rel="stylesheet"> Vite inserts for it
+- preload for up to --max-fonts woff2 fonts. Only @font-face rules whose
+  family the CSS uses and which cover Latin text count.
+- preload with fetchpriority=high for the likely LCP image: the first <img>
+  in the hero of a prerendered page, or else the first image the route
+  module imports
+
+Routes come from the starter's src/routes.js: index.html renders /,
+pricing/index.html renders /pricing and 404.html the not-found page. Without
+a route table only fonts and images are preloaded.
+
+Third-party origins get hints only when their integration is enabled.
+Settings are read the way Vite reads them: .env, .env.local,
+.env.<mode> and .env.<mode>.local in the project root, overridden by the
+environment.
+
+- A real VITE_GTM_ID preconnects to www.googletagmanager.com. With
+  VITE_GTM_LOAD=deferred it gets dns-prefetch instead, since the connection
+  would often go unused.
+- Absolute VITE_CRM_API and VITE_ANALYTICS_BEACON URLs get dns-prefetch. Both
+  are only contacted after the page has loaded.
+
+Hints already in a page are not added again, so the step can run twice.
+It can run before or after critical_css.py: stylesheets that step switched
+to media="print" loading are still read for fonts.
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import posixpath
+from urllib.parse import urlsplit
+
+from critical_css import (FONT_FAMILY_RE, LINK_RE, fold_elements, parse_css, parse_html,
+                          stylesheet_links, tag_attrs)
+
+DEFAULT_DIST = "dist"
+DEFAULT_MAX_FONTS = 2
+MANIFESTS = (".vite/manifest.json", "manifest.json")  # Vite 5, Vite 4
+GTM_ORIGIN = "https://www.googletagmanager.com"
+GTM_PLACEHOLDER = "GTM-XXXXXXX"
+IMAGE_EXTS = {".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif", ".svg"}
+ROUTE_RE = re.compile(r"""path:\s*(null|'[^']*'|"[^"]*")[^\n]*?import\(\s*['"]([^'"]+)['"]\s*\)""")
+REF_RE = re.compile(r"""\b(?:href|src)\s*=\s*["']([^"']+)["']""")
+FONT_URL_RE = re.compile(r"""url\(\s*['"]?([^'")]+\.woff2)(?:[?#][^'")]*)?['"]?\s*\)""")
+HEAD_INSERT_RE = re.compile(r"<(?:link|script|style)\b|</head>", re.I)
+
+
+def read_env(root, mode="production"):
+    """VITE_* settings as Vite resolves them for mode."""
+    env = {}
+    for name in (".env", ".env.local", f".env.{mode}", f".env.{mode}.local"):
+        path = os.path.join(root, name)
+        if not os.path.isfile(path):
+            continue
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#") or "=" not in line:
+                    continue
+                key, value = line.split("=", 1)
+                value = value.strip()
+                if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+                    value = value[1:-1]
+                else:
+                    value = value.split(" #")[0].strip()
+                env[key.strip()] = value
+    env.update({k: v for k, v in os.environ.items() if k.startswith("VITE_")})
+    return env
+
+
+def _origin(url):
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}" if parts.scheme in ("http", "https") and parts.netloc else None
+
+
+def third_party_hints(env, preconnect=(), dns_prefetch=()):
+    """[(rel, origin)] for the enabled integrations and extra origins."""
+    hints = []
+    gtm_id = env.get("VITE_GTM_ID", "")
+    if gtm_id and gtm_id != GTM_PLACEHOLDER:
+        hints.append(("dns-prefetch" if env.get("VITE_GTM_LOAD") == "deferred" else "preconnect", GTM_ORIGIN))
+    for key in ("VITE_CRM_API", "VITE_ANALYTICS_BEACON"):
+        origin = _origin(env.get(key, ""))
+        if origin:
+            hints.append(("dns-prefetch", origin))
+    hints += [("preconnect", _origin(url) or url) for url in preconnect]
+    hints += [("dns-prefetch", _origin(url) or url) for url in dns_prefetch]
+    seen, unique = set(), []
+    for rel, origin in hints:
+        if origin not in seen:
+            seen.add(origin)
+            unique.append((rel, origin))
+    return unique
+
+
+def load_manifest(dist):
+    for name in MANIFESTS:
+        path = os.path.join(dist, name)
+        if os.path.isfile(path):
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+    return None
+
+
+def read_routes(root):
+    """{route path or None for not-found: manifest key of its module}."""
+    path = os.path.join(root, "src", "routes.js")
+    if not os.path.isfile(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        source = f.read()
+    return {None if route == "null" else route.strip("'\""): posixpath.normpath(posixpath.join("src", module))
+            for route, module in ROUTE_RE.findall(source)}
+
+
+def page_route(rel):
+    """Route path a built page renders: pricing/index.html -> /pricing."""
+    rel = rel.replace(os.sep, "/")
+    if rel == "404.html":
+        return None
+    if rel == "index.html":
+        return "/"
+    if rel.endswith("/index.html"):
+        return "/" + rel[:-len("/index.html")]
+    return "/" + rel[:-len(".html")]
+
+
+def chunk_graph(manifest, key):
+    """(js files, css files, asset files) of key and its static imports."""
+    js, css, assets, seen = [], [], [], set()
+
+    def visit(k, top):
+        if k in seen or k not in manifest:
+            return
+        seen.add(k)
+        chunk = manifest[k]
+        js.append(chunk["file"])
+        css.extend(f for f in chunk.get("css", []) if f not in css)
+        if top:
+            assets.extend(chunk.get("assets", []))
+        for child in chunk.get("imports", []):
+            visit(child, False)
+
+    visit(key, True)
+    return js, css, assets
+
+
+def _covers_latin(unicode_range):
+    for part in unicode_range.replace(" ", "").upper().split(","):
+        if not part.startswith("U+"):
+            continue
+        spec = part[2:]
+        low, high = spec.split("-", 1) if "-" in spec else (spec.replace("?", "0"), spec.replace("?", "F"))
+        try:
+            lo, hi = int(low, 16), int(high, 16)
+        except ValueError:
+            continue
+        if lo <= ord("A") <= hi:
+            return True
+    return False
+
+
+def font_preloads(css_texts, css_urls, limit):
+    """woff2 URLs worth preloading from @font-face rules in css_texts."""
+    used = set()
+    for css in css_texts:
+        for value in FONT_FAMILY_RE.findall(re.sub(r"@font-face\s*{[^}]*}", "", css)):
+            used.update(f.strip().strip("'\"").lower() for f in value.split(","))
+    fonts = []
+    for css, css_url in zip(css_texts, css_urls):
+        for prelude, body in parse_css(css):
+            if prelude.lower() != "@font-face" or not isinstance(body, str):
+                continue
+            family = FONT_FAMILY_RE.search(body)
+            url = FONT_URL_RE.search(body)
+            unicode_range = re.search(r"unicode-range:([^;}]+)", body)
+            if (not family or not url or family.group(1).strip().strip("'\"").lower() not in used
+                    or (unicode_range and not _covers_latin(unicode_range.group(1)))):
+                continue
+            href = url.group(1)
+            if not href.startswith(("/", "data:")) and "://" not in href:
+                href = posixpath.normpath(posixpath.join(posixpath.dirname(css_url), href))
+            if href not in fonts and not href.startswith("data:"):
+                fonts.append(href)
+    return fonts[:limit]
+
+
+def hero_image(document):
+    """Attributes of the first <img> in a prerendered page's hero, or None."""
+    if not fold_elements(document):
+        return None
+    main = next((el for el in document.iter() if el.tag == "main"), None)
+    if not main or not main.children:
+        return None
+    return next((el.attrs for el in main.children[0].iter() if el.tag == "img" and el.attrs.get("src")), None)
+
+
+def _link(rel, href, **attrs):
+    extra = "".join(f' {k.replace("_", "")}' if v is True else f' {k.replace("_", "")}="{v}"'
+                    for k, v in attrs.items() if v)
+    return f'<link rel="{rel}" href="{href}"{extra}>'
+
+
+def page_hints(html_text, rel, dist, manifest, routes, origins, base, max_fonts):
+    """Hint tags missing from a page, grouped by kind."""
+    present = {(tag_attrs(m.group(0)).get("rel", ""), tag_attrs(m.group(0)).get("href", ""))
+               for m in LINK_RE.finditer(html_text)}
+    referenced = set(REF_RE.findall(html_text))
+    hints = {"origins": [], "modules": [], "styles": [], "fonts": [], "images": []}
+
+    def add(kind, rel_value, href, **attrs):
+        if (rel_value, href) not in present:
+            present.add((rel_value, href))
+            hints[kind].append(_link(rel_value, href, **attrs))
+
+    for rel_value, origin in origins:
+        add("origins", rel_value, origin)
+
+    js, css, assets = chunk_graph(manifest, routes.get(page_route(rel), ""))
+    for file in js:
+        if base + file not in referenced:
+            add("modules", "modulepreload", base + file, crossorigin=True)
+    for file in css:
+        if base + file not in referenced:
+            # No crossorigin: Vite's preload helper inserts route stylesheets
+            # without it, and a mismatched credentials mode defeats the preload.
+            add("styles", "preload", base + file, as_="style")
+
+    # Deferred links count, so the result does not depend on whether
+    # critical_css.py ran first.
+    css_urls = list(dict.fromkeys(href for _, href in stylesheet_links(html_text, deferred=True)))
+    css_urls += [base + f for f in css if base + f not in referenced]
+    css_texts = []
+    for href in css_urls:
+        path = href[len(base):] if href.startswith(base) else href.lstrip("/")
+        with open(os.path.join(dist, path), encoding="utf-8") as f:
+            css_texts.append(f.read())
+    for href in font_preloads(css_texts, css_urls, max_fonts):
+        add("fonts", "preload", href, as_="font", type="font/woff2", crossorigin=True)
+
+    img = hero_image(parse_html(html_text))
+    if img:
+        add("images", "preload", img["src"], as_="image", imagesrcset=img.get("srcset"),
+            imagesizes=img.get("sizes"), fetchpriority="high")
+    else:
+        image = next((f for f in assets if os.path.splitext(f)[1].lower() in IMAGE_EXTS), None)
+        if image:
+            add("images", "preload", base + image, as_="image", fetchpriority="high")
+    return hints
+
+
+def inject(html_text, tags):
+    """html_text with tags inserted ahead of the first link, script or style in <head>."""
+    match = HEAD_INSERT_RE.search(html_text)
+    if not match or not tags:
+        return html_text
+    indent = re.search(r"[ \t]*$", html_text[:match.start()]).group()
+    block = "".join(f"{tag}\n{indent}" for tag in tags)
+    return html_text[:match.start()] + block + html_text[match.start():]
+
+
+def process(dist, root, base="/", mode="production", max_fonts=DEFAULT_MAX_FONTS,
+            preconnect=(), dns_prefetch=(), dry_run=False):
+    """Add hints to every page of dist; returns (report rows, origins)."""
+    manifest = load_manifest(dist)
+    if manifest is None:
+        return None, []
+    routes = read_routes(root)
+    origins = third_party_hints(read_env(root, mode), preconnect, dns_prefetch)
+    rows = []
+    for dirpath, dirnames, filenames in os.walk(dist):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if not name.endswith(".html"):
+                continue
+            path = os.path.join(dirpath, name)
+            rel = os.path.relpath(path, dist)
+            with open(path, encoding="utf-8") as f:
+                html_text = f.read()
+            hints = page_hints(html_text, rel, dist, manifest, routes, origins, base, max_fonts)
+            rows.append({"page": rel, **{kind: len(tags) for kind, tags in hints.items()}})
+            tags = [tag for kind in hints.values() for tag in kind]
+            if tags and not dry_run:
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(inject(html_text, tags))
+    return rows, origins
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Add preload and preconnect hints to each built page.")
+    parser.add_argument("dist", nargs="?", default=DEFAULT_DIST, help=f"build output (default: {DEFAULT_DIST})")
+    parser.add_argument("--root", help="project root holding src/routes.js and .env files (default: dist's parent)")
+    parser.add_argument("--base", default="/", help="public base path the site is served from (Vite's base)")
+    parser.add_argument("--mode", default="production", help="Vite mode whose .env files apply (default: production)")
+    parser.add_argument("--max-fonts", type=int, default=DEFAULT_MAX_FONTS,
+                        help=f"fonts to preload per page (default: {DEFAULT_MAX_FONTS})")
+    parser.add_argument("--preconnect", action="append", default=[], metavar="ORIGIN",
+                        help="another origin to preconnect to (repeatable)")
+    parser.add_argument("--dns-prefetch", action="append", default=[], metavar="ORIGIN",
+                        help="another origin to resolve early (repeatable)")
+    parser.add_argument("--dry-run", action="store_true", help="report without changing any page")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.dist):
+        print(f"❌ {args.dist} does not exist; run the build first")
+        return 1
+    root = args.root or os.path.dirname(os.path.abspath(args.dist))
+    base = "/" + args.base.strip("/") + "/" if args.base.strip("/") else "/"
+    rows, origins = process(args.dist, root, base, args.mode, args.max_fonts,
+                            args.preconnect, args.dns_prefetch, args.dry_run)
+    if rows is None:
+        print(f"❌ no Vite manifest in {args.dist}; set build.manifest: true in vite.config and rebuild")
+        return 1
+
+    for rel_value, origin in origins:
+        print(f"🔌 {rel_value} {origin}")
+    print(f"{'page':<32} {'origins':>7} {'modules':>7} {'styles':>6} {'fonts':>5} {'images':>6}")
+    for row in rows:
+        print(f"{row['page']:<32} {row['origins']:>7} {row['modules']:>7} {row['styles']:>6} "
+              f"{row['fonts']:>5} {row['images']:>6}")
+    added = sum(row[kind] for row in rows for kind in ("origins", "modules", "styles", "fonts", "images"))
+    verb = "would add" if args.dry_run else "added"
+    print(f"\n🔗 {verb} {added} hints across {len(rows)} pages")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+QXP Sticker Locale Splitter
+Splits assests/manifests/stickers.manifest.json into a locale-independent core
+and one small label bundle per locale. A client then downloads only the
+language it displays:
+
+    python src/split_sticker_locales.py          # write core + locale bundles
+    python src/split_sticker_locales.py --check  # exit 1 if any output is stale
+
+stickers.core.json keeps everything but the labels: id, path, viewBox,
+category, type, tags, variant, age and rtl_mirror. locales/<lang>.json maps
+sticker and category ids to that language's labels. A label the manifest
+lacks falls back to English at build time. Bundles for right-to-left
+languages also list the stickers to mirror, so RTL clients need no second
+pass over the core. src/lib/stickerLocales.ts loads the bundles lazily.
+"""
+
+import os
+import sys
+import json
+import argparse
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MANIFESTS = os.path.join(HERE, "assests", "manifests")
+MANIFEST = os.path.join(MANIFESTS, "stickers.manifest.json")
+CORE = os.path.join(MANIFESTS, "stickers.core.json")
+LOCALES = os.path.join(MANIFESTS, "locales")
+
+FALLBACK_LOCALE = "en"
+RTL_LOCALES = {"ar", "fa", "he", "ur"}
+
+
+def split_manifest(manifest):
+    """(core, {locale: bundle}) for a sticker manifest."""
+    items = manifest["items"]
+    categories = manifest.get("categories", {})
+    locales = sorted({lang for item in items for lang in item.get("label", {})}
+                     | {lang for cat in categories.values() for lang in cat.get("label", {})})
+
+    core = {
+        "pack": manifest.get("pack"),
+        "version": manifest.get("version"),
+        "locales": locales,
+        "fallbackLocale": FALLBACK_LOCALE,
+        "categories": {name: {k: v for k, v in cat.items() if k != "label"}
+                       for name, cat in categories.items()},
+        "items": [{k: v for k, v in item.items() if k != "label"} for item in items],
+    }
+
+    def label(labels, locale, default):
+        return labels.get(locale) or labels.get(FALLBACK_LOCALE) or default
+
+    bundles = {}
+    for locale in locales:
+        rtl = locale in RTL_LOCALES
+        bundle = {
+            "locale": locale,
+            "dir": "rtl" if rtl else "ltr",
+            "labels": {item["id"]: label(item.get("label", {}), locale, item["id"]) for item in items},
+            "categories": {name: label(cat.get("label", {}), locale, name)
+                           for name, cat in categories.items()},
+        }
+        if rtl:
+            bundle["mirror"] = [item["id"] for item in items if item.get("rtl_mirror")]
+        bundles[locale] = bundle
+    return core, bundles
+
+
+def _render(data):
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Split sticker labels into per-locale bundles.")
+    parser.add_argument("--manifest", default=MANIFEST, help="sticker manifest to split")
+    parser.add_argument("--check", action="store_true", help="exit 1 if any output is missing or stale")
+    args = parser.parse_args(argv)
+
+    with open(args.manifest, encoding="utf-8") as f:
+        core, bundles = split_manifest(json.load(f))
+    outputs = {CORE: _render(core)}
+    outputs.update({os.path.join(LOCALES, f"{locale}.json"): _render(bundle)
+                    for locale, bundle in bundles.items()})
+
+    stale = []
+    for path, text in outputs.items():
+        try:
+            with open(path, encoding="utf-8") as f:
+                if f.read() == text:
+                    continue
+        except FileNotFoundError:
+            pass
+        stale.append(path)
+        if not args.check:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+
+    if args.check:
+        for path in stale:
+            print(f"❌ {os.path.relpath(path)} is stale; run {os.path.relpath(__file__)}")
+        if not stale:
+            print(f"✅ Core and {len(bundles)} locale bundles are up to date")
+        return 1 if stale else 0
+    for path in stale:
+        print(f"🌍 Wrote {os.path.relpath(path)} ({len(outputs[path].encode('utf-8'))} bytes)")
+    if not stale:
+        print("✅ Core and locale bundles unchanged")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+"""Tests for bench_vite_starter.py; run with python -m pytest src."""
+
+import bench_vite_starter as bench
+
+
+def _result(wall, cpu, wall_stdev=0.0):
+    return {"wall_ms": wall, "cpu_ms": cpu, "wall_ms_median": wall, "cpu_ms_median": cpu,
+            "wall_ms_stdev": wall_stdev, "cpu_ms_stdev": 0.0}
+
+
+def test_median_run_records_medians_and_spread():
+    runs = [{"wall_ms": w, "cpu_ms": c, "stages": {}} for w, c in ((90, 50), (70, 40), (300, 45))]
+    result = bench._median_run(runs)
+    assert result["wall_ms"] == 90 and result["wall_ms_median"] == 90
+    assert result["cpu_ms_median"] == 45
+    assert result["wall_ms_all"] == [90, 70, 300]
+
+
+def test_check_regressions_ignores_noise_in_short_scenarios():
+    baseline = {"results": {"disk/single/cold": _result(75, 60), "disk/batch/cold": _result(900, 800)}}
+    # 75 -> 95 ms is over 25% but within the 25 ms noise floor.
+    noisy = {"results": {"disk/single/cold": _result(95, 60), "disk/batch/cold": _result(950, 800)}}
+    assert bench.check_regressions(noisy, baseline, 0.25) == []
+
+    slow = {"results": {"disk/single/cold": _result(120, 60), "disk/batch/cold": _result(1400, 800)}}
+    assert bench.check_regressions(slow, baseline, 0.25) == [
+        "disk/single/cold wall_ms: 75.0 -> 120.0", "disk/batch/cold wall_ms: 900.0 -> 1400.0"]
+
+
+def test_check_regressions_allows_the_baselines_own_spread():
+    baseline = {"results": {"tmpfs/single/warm": _result(100, 60, wall_stdev=30)}}
+    entry = {"results": {"tmpfs/single/warm": _result(150, 60)}}
+    assert bench.check_regressions(entry, baseline, 0.25) == []
+    assert bench.check_regressions(entry, baseline, 0.25, min_delta_ms=0) == []
+    entry["results"]["tmpfs/single/warm"]["wall_ms_median"] = 170
+    assert bench.check_regressions(entry, baseline, 0.25) == ["tmpfs/single/warm wall_ms: 100.0 -> 170.0"]
+
+
+def test_baseline_mismatch_reports_other_machines():
+    entry = {"platform": "Linux-x", "python": "3.11.7", "cpus": 8, "params": {"repeat": 5}}
+    assert bench.baseline_mismatch(entry, dict(entry)) == []
+    assert bench.baseline_mismatch(entry, {**entry, "cpus": 4}) == ["cpus: baseline 4, now 8"]
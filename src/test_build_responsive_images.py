@@ -0,0 +1,66 @@
+"""Tests for build_responsive_images.py; run with python -m pytest src."""
+
+import struct
+
+import pytest
+
+import build_responsive_images as bri
+
+
+def _png_header(path, width, height):
+    path.write_bytes(b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR" + struct.pack(">II", width, height))
+    return str(path)
+
+
+def test_prune_drops_variants_not_smaller_than_the_next_wider_one():
+    variants = {"png": [[96, "p96"], [320, "p320"], [480, "p480"], [532, "p532"]],
+                "webp": [[96, "w96"], [320, "w320"], [532, "w532"]]}
+    sizes = {"p96": 1200, "p320": 3500, "p480": 9000, "p532": 7500,
+             "w96": 2200, "w320": 8400, "w532": 6600}
+    assert bri.prune(variants, sizes, 7842) == ["p480", "w320"]
+
+
+def test_prune_keeps_full_width_png_and_drops_formats_larger_than_the_source():
+    variants = {"png": [[96, "p96"], [160, "p160"]], "webp": [[96, "w96"], [160, "w160"]]}
+    sizes = {"p96": 500, "p160": 1000, "w96": 400, "w160": 1200}
+    assert bri.prune(variants, sizes, 1000) == ["w96", "w160"]
+
+
+def test_plan_skips_dropped_variants(tmp_path):
+    source = _png_header(tmp_path / "art.png", 200, 100)
+    digest = bri.source_digest(source)
+    gone = bri._variant_name("art", digest, 160, "webp")
+    manifest, jobs, unbuildable = bri.plan([source], str(tmp_path), ["webp", "png"], dropped={gone})
+    entry = manifest["images"]["art"]
+    assert entry["dropped"] == [gone]
+    assert [w for w, _ in entry["variants"]["webp"]] == [96, 200]
+    assert [w for w, _ in entry["variants"]["png"]] == [96, 160, 200]
+    assert gone not in {job[2] for job in jobs}
+    assert unbuildable == []
+
+
+def test_plan_keeps_complete_variants_of_formats_it_cannot_encode(tmp_path):
+    source = _png_header(tmp_path / "art.png", 120, 60)
+    digest = bri.source_digest(source)
+    avif = [bri._variant_name("art", digest, w, "avif") for w in (96, 120)]
+    manifest, jobs, unbuildable = bri.plan([source], str(tmp_path), ["png"], present=set(avif))
+    assert [name for _, name in manifest["images"]["art"]["variants"]["avif"]] == avif
+    assert manifest["formats"] == ["avif", "png"]
+    assert all(job[4] == "png" for job in jobs)
+
+    manifest, _, unbuildable = bri.plan([source], str(tmp_path), ["png"], present={avif[0]})
+    assert "avif" not in manifest["images"]["art"]["variants"]
+    assert unbuildable == [("art", "avif", [avif[0]])]
+
+
+def test_downscaled_png_of_a_few_colour_source_stays_a_palette(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    im = Image.new("RGBA", (400, 200), (255, 255, 255, 0))
+    for x in range(0, 400, 40):
+        im.paste((x % 256, 80, 200, 255), (x, 50, x + 20, 150))
+    im.save(tmp_path / "art.png")
+    name, written = bri._encode((str(tmp_path / "art.png"), str(tmp_path), "art-160.png", 160, "png"))
+    assert written
+    with Image.open(tmp_path / name) as out:
+        assert out.mode == "P"
+        assert out.width == 160
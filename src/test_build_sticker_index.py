@@ -0,0 +1,52 @@
+"""Tests for build_sticker_index.py; run with python -m pytest src."""
+
+import json
+
+import build_sticker_index as bsi
+
+MANIFEST = {
+    "pack": "test", "version": "1.0.0",
+    "items": [
+        {"id": "star", "category": "rewards", "type": "reward", "age": "ECDE", "tags": ["gold"],
+         "label": {"en": "Gold Star", "sw": "Nyota ya Dhahabu", "fr": "Étoile d'Or", "ar": "نجمة ذهبية"}},
+        {"id": "lion", "category": "animals", "type": "character", "age": "ECDE", "tags": ["savanna"],
+         "label": {"en": "Happy Lion", "sw": "Simba Mwenye Furaha", "ar": "الأسد السعيد"}},
+        {"id": "book", "category": "school", "type": "object", "age": "Primary", "tags": ["reading"],
+         "label": {"en": "Story Book"}},
+    ],
+}
+
+
+def test_normalize_folds_case_accents_and_arabic():
+    assert bsi.normalize("Étoile d'Or") == ["etoile", "d", "or"]
+    assert bsi.normalize("الأسد") == ["الاسد", "اسد"]
+    assert bsi.normalize("نَجْمَة") == ["نجمه"]
+
+
+def test_index_stores_whole_tokens_and_sparse_facets():
+    index = bsi.build_index(MANIFEST)
+    assert index["ids"] == ["star", "lion", "book"]
+    assert index["tokens"]["en"]["gold"] == [0]
+    assert "gol" not in index["tokens"]["en"]
+    assert index["facets"]["age"] == {"ECDE": [0, 1], "Primary": [2]}
+
+
+def test_search_matches_word_prefixes_per_locale_and_shared_tags():
+    index = bsi.build_index(MANIFEST)
+    assert bsi.search(index, "nyo", "sw") == ["star"]
+    assert bsi.search(index, "st") == ["star", "book"]
+    assert bsi.search(index, "st bo") == ["book"]
+    assert bsi.search(index, "savan", "fr") == ["lion"]
+    assert bsi.search(index, "أسد", "ar") == ["lion"]
+    assert bsi.search(index, "الأسد", "ar") == ["lion"]
+    assert bsi.search(index, "etoile") == []
+    assert bsi.search(index, "") == ["star", "lion", "book"]
+
+
+def test_committed_index_is_current_and_smaller_than_the_manifest():
+    with open(bsi.MANIFEST, encoding="utf-8") as f:
+        manifest_text = f.read()
+    with open(bsi.INDEX, encoding="utf-8") as f:
+        index_text = f.read()
+    assert index_text == bsi.render(bsi.build_index(json.loads(manifest_text)))
+    assert len(index_text.encode("utf-8")) < len(manifest_text.encode("utf-8"))
@@ -0,0 +1,106 @@
+"""Tests for build_sticker_sprites.py; run with python -m pytest src."""
+
+import json
+import xml.etree.ElementTree as ET
+
+import build_sticker_sprites as bss
+from optimize_stickers import SVG_NS
+
+STICKER = """<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 64 64" role="img" width="64" height="64">
+  <title>Gold Star</title>
+  <desc>A star</desc>
+  <style>.face{fill:var(--accent)} .line{stroke:var(--ink)}</style>
+  <path class="face line" d="M0 0L64 64"/>
+  <circle class="hook" r="4"/>
+</svg>
+"""
+
+
+def _manifest(tmp_path):
+    (tmp_path / "star.svg").write_text(STICKER)
+    (tmp_path / "sun.svg").write_text(STICKER.replace("Gold Star", "Sun"))
+    return {"items": [
+        {"id": "star", "category": "rewards", "type": "reward", "path": str(tmp_path / "star.svg")},
+        {"id": "sun", "category": "nature", "type": "reward", "path": str(tmp_path / "sun.svg")},
+    ]}
+
+
+def test_symbols_inline_class_rules_and_keep_accessibility_text(tmp_path):
+    manifest = _manifest(tmp_path)
+    symbol, title = bss.build_symbol(manifest["items"][0], str(tmp_path / "star.svg"))
+    assert title == "Gold Star"
+    assert symbol.get("id") == "star" and symbol.get("viewBox") == "0 0 64 64"
+    assert symbol.get("role") is None and symbol.get("width") is None
+    path = symbol.find(f"{{{SVG_NS}}}path")
+    assert path.get("style") == "fill:var(--accent);stroke:var(--ink)" and path.get("class") is None
+    assert symbol.find(f"{{{SVG_NS}}}circle").get("class") == "hook"
+    assert symbol.find(f"{{{SVG_NS}}}style") is None
+    assert symbol.find(f"{{{SVG_NS}}}desc").text == "A star"
+
+
+def test_sprites_are_grouped_by_the_chosen_field(tmp_path, monkeypatch):
+    monkeypatch.setattr(bss, "sticker_file", lambda item: item["path"])
+    manifest = _manifest(tmp_path)
+    sprites, entries = bss.build_sprites(manifest)
+    assert sorted(sprites) == ["nature", "rewards"]
+    assert [e["group"] for e in entries] == ["rewards", "nature"]
+    sheet = ET.fromstring(sprites["rewards"])
+    assert [s.get("id") for s in sheet.iter(f"{{{SVG_NS}}}symbol")] == ["star"]
+    assert sheet.get("aria-hidden") == "true"
+
+    sprites, entries = bss.build_sprites(manifest, by="type")
+    assert list(sprites) == ["reward"]
+    assert len(ET.fromstring(sprites["reward"]).findall(f"{{{SVG_NS}}}symbol")) == 2
+
+
+def test_sheets_share_one_class_rule_per_distinct_style(tmp_path, monkeypatch):
+    monkeypatch.setattr(bss, "sticker_file", lambda item: item["path"])
+    sprites, _ = bss.build_sprites(_manifest(tmp_path), by="type")
+    sheet = ET.fromstring(sprites["reward"])
+    assert sheet[0].tag == f"{{{SVG_NS}}}style"
+    assert sheet[0].text == "._s0{fill:var(--accent);stroke:var(--ink)}"
+    paths = sheet.findall(f".//{{{SVG_NS}}}path")
+    assert len(paths) == 2 and all(p.get("class") == "_s0" and p.get("style") is None for p in paths)
+    assert [c.get("class") for c in sheet.iter(f"{{{SVG_NS}}}circle")] == ["hook", "hook"]
+
+
+GRADIENT = """<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" viewBox="0 0 64 64">
+  <style>#g{stop-color:var(--accent)} .fill{fill:url(#g)} rect.fill{opacity:.5}</style>
+  <defs><linearGradient id="g"><stop offset="0"/></linearGradient><clipPath id="c"><circle r="9"/></clipPath></defs>
+  <rect class="fill" clip-path="url(#c)" width="64" height="64"/>
+  <use xlink:href="#c"/><use href="#c"/>
+</svg>
+"""
+
+
+def test_inner_ids_are_prefixed_so_stickers_cannot_resolve_each_other(tmp_path):
+    (tmp_path / "a.svg").write_text(GRADIENT)
+    symbol, _ = bss.build_symbol({"id": "sun"}, str(tmp_path / "a.svg"))
+    ids = [el.get("id") for el in symbol.iter() if el.get("id")]
+    assert ids == ["sun", "sun-g", "sun-c"]
+    rect = symbol.find(f".//{{{SVG_NS}}}rect")
+    assert rect.get("clip-path") == "url(#sun-c)"
+    assert rect.get("style") == "fill:url(#sun-g)" and rect.get("class") == "sun-fill"
+    uses = symbol.findall(f"{{{SVG_NS}}}use")
+    assert [u.get("{http://www.w3.org/1999/xlink}href") or u.get("href") for u in uses] == ["#sun-c", "#sun-c"]
+    # Rules that are not a single class keep their <style>, scoped to the sticker.
+    assert symbol.find(f"{{{SVG_NS}}}style").text == "#sun-g{stop-color:var(--accent)}rect.sun-fill{opacity:.5}"
+
+
+def test_component_maps_each_sticker_to_its_sheet():
+    text = bss.render_component([
+        {"id": "star", "group": "rewards", "viewBox": "0 0 64 64", "title": "It's gold"},
+        {"id": "sun", "group": "nature-day", "viewBox": "0 0 64 64", "title": "Sun"},
+    ])
+    assert "import natureDaySprite from '../assests/sprites/nature-day.svg?no-inline';" in text
+    assert "star: { sprite: rewardsSprite, viewBox: '0 0 64 64', title: 'It\\'s gold' }," in text
+
+
+def test_committed_sprites_are_current():
+    with open(bss.MANIFEST, encoding="utf-8") as f:
+        sprites, entries = bss.build_sprites(json.load(f))
+    for group, text in sprites.items():
+        with open(f"{bss.SPRITES}/{group}.svg", encoding="utf-8") as f:
+            assert f.read() == text
+    with open(bss.COMPONENT, encoding="utf-8") as f:
+        assert f.read() == bss.render_component(entries)
@@ -0,0 +1,742 @@
+"""Tests for create_vite_starter.py; run with python -m pytest src."""
+
+import os
+import re
+import sys
+import json
+import asyncio
+import sqlite3
+import time
+import shutil
+import zipfile
+import threading
+import subprocess
+import importlib
+
+import pytest
+
+import create_vite_starter as gen
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache(tmp_path_factory, monkeypatch):
+    """Keep compiled templates and npm locks out of the user's ~/.cache."""
+    cache = tmp_path_factory.mktemp("cache")
+    monkeypatch.setenv("QXP_STARTER_CACHE", str(cache))
+    monkeypatch.setenv("QXP_STARTER_LOCKS", str(cache / "locks"))
+
+
+def _watch_until(out_dir, config_path, edit, done, timeout=10, base_config=None):
+    """Run watch(), apply edit once the first sync is done and stop when done()."""
+    lines, stop = [], threading.Event()
+    thread = threading.Thread(target=gen.watch, args=(out_dir, config_path),
+                              kwargs={"say": lines.append, "should_stop": stop.is_set,
+                                      "base_config": base_config})
+    thread.start()
+    try:
+        deadline = time.monotonic() + timeout
+        while not lines and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.05)  # let the next mtime differ on coarse filesystems
+        edit()
+        while not done() and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        stop.set()
+        thread.join()
+    return lines
+
+
+def test_watch_removes_outputs_of_disabled_sections(tmp_path):
+    out_dir, config_path = str(tmp_path / "site"), tmp_path / "config.json"
+    config_path.write_text(json.dumps({"crm_ingest": True, "prerender": True}))
+    gone = [os.path.join(out_dir, rel) for rel in gen.INGEST_FILES + gen.PRERENDER_FILES]
+
+    lines = _watch_until(out_dir, str(config_path),
+                         edit=lambda: config_path.write_text(json.dumps({})),
+                         done=lambda: not any(os.path.exists(path) for path in gone))
+
+    assert not any(os.path.exists(path) for path in gone), lines
+    with open(os.path.join(out_dir, gen.MANIFEST)) as f:
+        files = json.load(f)["files"]
+    assert not set(gen.INGEST_FILES + gen.PRERENDER_FILES) & set(files)
+    # The tree now matches a one-shot run with the same config.
+    assert gen.generate({}, out_dir)["added"] == []
+    assert gen.generate({}, out_dir)["removed"] == []
+
+
+def _tree(config=None):
+    return {rel: data.decode("utf-8") for rel, data in gen.render_tree(gen.resolve_config(config)).items()}
+
+
+def test_every_route_is_a_lazily_imported_page_module():
+    tree = _tree()
+    modules = re.findall(r"import\('\./(pages/\w+\.jsx)'\)", tree["src/routes.js"])
+    assert modules and all(f"src/{module}" in tree for module in modules)
+    assert not re.search(r"^import .*pages/", tree["src/App.jsx"], re.M)
+    assert "prefetch" in tree["src/components/Link.jsx"]
+
+
+def test_pages_without_tenant_copy_are_todo_placeholders():
+    tree = _tree()
+    for rel in ("src/pages/Solutions.jsx", "src/pages/Pricing.jsx", "src/pages/Legal.jsx"):
+        assert "TODO(tenant)" in tree[rel] and "<Placeholder" in tree[rel]
+    assert "TODO" in tree["src/components/Placeholder.jsx"]
+
+
+def test_gtm_debug_calls_are_guarded_so_production_builds_drop_them():
+    gtm = _tree()["src/lib/gtm.js"]
+    calls = [line for line in gtm.splitlines() if "debug(" in line and "function debug" not in line]
+    assert calls and all("if (import.meta.env.DEV) debug(" in line for line in calls)
+
+
+# Runs the generated gtm.js under node with just enough of a browser: the
+# listeners, timers and DOM calls it uses.
+GTM_HARNESS = """\
+const listeners = {};
+const timers = [];
+const scripts = [];
+globalThis.__env = { DEV: false };
+globalThis.window = globalThis;
+globalThis.navigator = {};
+globalThis.document = {
+  readyState: 'loading', visibilityState: 'visible',
+  head: { appendChild: (el) => scripts.push(el.src) },
+  createElement: () => ({}),
+  addEventListener() {},
+};
+window.addEventListener = (type, fn) => { (listeners[type] ||= []).push(fn); };
+window.removeEventListener = (type, fn) => {
+  listeners[type] = (listeners[type] || []).filter((f) => f !== fn);
+};
+globalThis.setTimeout = (fn, ms) => timers.push([ms, fn]);
+globalThis.clearTimeout = () => {};
+globalThis.requestAnimationFrame = (fn) => fn();
+const run = (predicate) => {
+  for (const [ms, fn] of timers.splice(0)) if (predicate(ms)) fn(); else timers.push([ms, fn]);
+};
+const events = () => window.dataLayer.map((entry) => entry.event);
+
+const gtm = await import(process.argv[2]);
+gtm.initGTM('GTM-ABC123');
+gtm.trackEvent('cta_click', { id: 1 });
+run((ms) => ms === 0);
+const before = { scripts: scripts.length, events: events(), timeouts: timers.map(([ms]) => ms) };
+(listeners[process.argv[3]] || []).forEach((fn) => fn());
+run((ms) => ms !== 4000 || process.argv[3] === 'timeout');
+const triggered = scripts.length;
+run(() => true);
+gtm.trackEvent('after', {});
+run(() => true);
+console.log(JSON.stringify({ before, triggered, scripts: scripts.length, events: events(),
+                             listeners: Object.keys(listeners).filter((k) => listeners[k].length) }));
+"""
+
+
+def _run_gtm(tmp_path, config, trigger):
+    gtm = _tree(config)["src/lib/gtm.js"].replace("import.meta.env", "globalThis.__env")
+    (tmp_path / "gtm.mjs").write_text(gtm)
+    (tmp_path / "harness.mjs").write_text(GTM_HARNESS)
+    out = subprocess.run(["node", str(tmp_path / "harness.mjs"), (tmp_path / "gtm.mjs").as_uri(), trigger],
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out)
+
+
+@pytest.mark.skipif(not shutil.which("node"), reason="needs node")
+@pytest.mark.parametrize("trigger", ["pointerdown", "load", "timeout"])
+def test_deferred_gtm_buffers_events_until_idle_interaction_or_timeout(tmp_path, trigger):
+    result = _run_gtm(tmp_path, {"gtm_load": "deferred"}, trigger)
+    assert result["before"]["scripts"] == 0 and result["before"]["events"] == []
+    assert 4000 in result["before"]["timeouts"]
+    assert result["triggered"] == result["scripts"] == 1
+    assert result["events"] == ["gtm.js", "cta_click", "after"]
+    # The interaction listeners are gone once GTM has started.
+    assert not {"pointerdown", "keydown", "touchstart", "scroll"} & set(result["listeners"])
+
+
+@pytest.mark.skipif(not shutil.which("node"), reason="needs node")
+def test_eager_gtm_starts_before_the_first_event(tmp_path):
+    result = _run_gtm(tmp_path, None, "none")
+    assert result["before"]["scripts"] == 1
+    assert result["before"]["events"] == ["gtm.js", "cta_click"]
+
+
+# The analytics queue of the generated gtm.js, with frames and timers run by hand.
+QUEUE_HARNESS = """\
+const handlers = {};
+let frames = [];
+let timers = [];
+const beacons = [];
+globalThis.__env = { DEV: false, VITE_ANALYTICS_BEACON: '/collect' };
+globalThis.window = globalThis;
+Object.defineProperty(globalThis, 'navigator', {
+  value: { sendBeacon: (url, blob) => { beacons.push(blob); return true; } },
+});
+globalThis.document = {
+  readyState: 'complete', visibilityState: 'visible', head: { appendChild() {} },
+  createElement: () => ({}),
+  addEventListener: (type, fn) => { handlers[type] = fn; },
+};
+window.addEventListener = (type, fn) => { handlers[type] = fn; };
+globalThis.setTimeout = (fn) => timers.push(fn);
+globalThis.requestAnimationFrame = (fn) => frames.push(fn);
+console.warn = () => {};
+const runFrame = () => { frames.splice(0).forEach((f) => f()); timers.splice(0).forEach((f) => f()); };
+const events = () => window.dataLayer.map((entry) => entry.event);
+
+const gtm = await import(process.argv[2]);
+gtm.initGTM('GTM-XXXXXXX');
+gtm.trackEvent('a');
+gtm.trackEvent('b');
+gtm.trackPageView('/pricing');
+const queued = { events: events(), frames: frames.length };
+runFrame();
+const flushed = events();
+gtm.trackEvent('c');
+document.visibilityState = 'hidden';
+handlers.visibilitychange();
+const hidden = events();
+const beaconEvents = await Promise.all(beacons.map(async (blob) => JSON.parse(await blob.text()).events));
+for (let i = 0; i < 20; i++) gtm.trackEvent('bulk');
+runFrame();
+console.log(JSON.stringify({ queued, flushed, hidden, beaconEvents, beacons: beacons.length }));
+"""
+
+
+@pytest.mark.skipif(not shutil.which("node"), reason="needs node")
+def test_trackevent_queues_and_drains_once_per_frame_with_beacon_flushes(tmp_path):
+    (tmp_path / "gtm.mjs").write_text(_tree()["src/lib/gtm.js"].replace("import.meta.env", "globalThis.__env"))
+    (tmp_path / "harness.mjs").write_text(QUEUE_HARNESS)
+    result = json.loads(subprocess.run(["node", str(tmp_path / "harness.mjs"), (tmp_path / "gtm.mjs").as_uri()],
+                                       capture_output=True, text=True, check=True).stdout)
+
+    assert result["queued"] == {"events": [], "frames": 1}
+    assert result["flushed"] == ["a", "b", "page_view"]
+    # Hiding the page flushes the queue and the beacon at once.
+    assert result["hidden"] == ["a", "b", "page_view", "c"]
+    assert [e["event"] for e in result["beaconEvents"][0]] == ["a", "b", "page_view", "c"]
+    assert result["beaconEvents"][0][2]["page_path"] == "/pricing"
+    assert result["beacons"] == 2
+
+
+def test_gtm_defer_timeout_is_rendered_into_gtm_and_the_readme():
+    tree = _tree({"gtm_load": "deferred", "gtm_defer_timeout_ms": "2500"})
+    assert "const DEFER_TIMEOUT_MS = 2500;" in tree["src/lib/gtm.js"]
+    assert "const LOAD_MODE = import.meta.env.VITE_GTM_LOAD || 'deferred';" in tree["src/lib/gtm.js"]
+    assert "VITE_GTM_LOAD=deferred" in tree[".env.example"]
+
+
+@pytest.fixture
+def ingest_server(tmp_path, monkeypatch):
+    """The generated ingest/server.py, imported from a generated site."""
+    site = tmp_path / "site"
+    gen.generate({"crm_ingest": True}, str(site))
+    monkeypatch.syspath_prepend(str(site / "ingest"))
+    for name in ("server", "protocol"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    yield importlib.import_module("server")
+    for name in ("server", "protocol"):
+        sys.modules.pop(name, None)
+
+
+def test_ingest_protocol_is_a_copy_of_lead_protocol():
+    files = _tree({"crm_ingest": True})
+    with open(gen.lead_protocol.__file__, encoding="utf-8") as f:
+        assert files["ingest/protocol.py"].endswith(f.read())
+    assert not set(gen.INGEST_FILES) & set(_tree())
+
+
+def test_ingest_commits_concurrent_requests_in_shared_batches(tmp_path, ingest_server):
+    db = str(tmp_path / "leads.db")
+
+    async def run():
+        service = ingest_server.IngestService(ingest_server.LeadStore(db), batch_size=20)
+        await service.store.open()
+        writer = asyncio.create_task(service._writer())
+        bodies = [json.dumps({"id": f"lead-{i % 40}", "kind": "contact", "email": f"{i}@example.com"}).encode()
+                  for i in range(50)]
+        results = await asyncio.gather(*(service.handle("POST", "/leads", body) for body in bodies))
+        invalid = await service.handle("POST", "/leads", b'{"kind": "quote"}')
+        writer.cancel()
+        await service.store.close()
+        return service.stats, results, invalid
+
+    stats, results, invalid = asyncio.run(run())
+    assert all(status == 200 for status, _, _ in results)
+    assert invalid[0] == 422
+    assert stats["leads"] == 50 and stats["stored"] == 40 and stats["rejected"] == 1
+    assert 3 <= stats["batches"] < 50
+    with sqlite3.connect(db) as conn:
+        assert conn.execute("SELECT count(*) FROM leads").fetchone()[0] == 40
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_ingest_writer_survives_a_failing_batch(tmp_path, ingest_server, capsys):
+    class FlakyStore(ingest_server.LeadStore):
+        failures = 1
+
+        def _write(self, rows):
+            if self.failures:
+                self.failures -= 1
+                raise TypeError("unsupported type")
+            return super()._write(rows)
+
+    async def run():
+        service = ingest_server.IngestService(FlakyStore(str(tmp_path / "leads.db")))
+        await service.store.open()
+        writer = asyncio.create_task(service._writer())
+        body = json.dumps({"id": "lead-1", "kind": "contact"}).encode()
+        first = await asyncio.wait_for(service.handle("POST", "/leads", body), 5)
+        second = await asyncio.wait_for(service.handle("POST", "/leads", body), 5)
+        alive = not writer.done()
+        writer.cancel()
+        await service.store.close()
+        return first, second, alive, service.stats
+
+    first, second, alive, stats = asyncio.run(run())
+    assert first[0] == 503 and second[0] == 200 and alive
+    assert stats["stored"] == 1
+    assert "TypeError: unsupported type" in capsys.readouterr().err
+
+
+def test_ingest_sheds_requests_while_the_queue_stays_full(tmp_path, ingest_server):
+    class SlowStore(ingest_server.LeadStore):
+        def _write(self, rows):
+            time.sleep(0.2)
+            return super()._write(rows)
+
+    async def run():
+        service = ingest_server.IngestService(SlowStore(str(tmp_path / "leads.db")), queue_size=1,
+                                              batch_size=1, enqueue_timeout=0.01)
+        await service.store.open()
+        writer = asyncio.create_task(service._writer())
+        body = lambda i: json.dumps({"id": str(i), "kind": "demo"}).encode()
+        results = await asyncio.gather(*(service.handle("POST", "/leads", body(i)) for i in range(4)))
+        await service.queue.join()
+        writer.cancel()
+        await service.store.close()
+        return service.stats, sorted(status for status, _, _ in results)
+
+    stats, statuses = asyncio.run(run())
+    assert statuses[:2] == [200, 200] and statuses[-1] == 503
+    assert stats["shed"] == statuses.count(503)
+
+
+def test_prerender_switches_to_path_routing_and_a_prerendering_build():
+    hashed, prerendered = _tree(), _tree({"prerender": True})
+    assert not set(gen.PRERENDER_FILES) & set(hashed)
+    assert set(gen.PRERENDER_FILES) <= set(prerendered)
+    assert "export const ROUTING = 'hash';" in hashed["src/routes.js"]
+    assert "export const ROUTING = 'path';" in prerendered["src/routes.js"]
+    assert json.loads(hashed["package.json"])["scripts"]["build"] == "vite build"
+    assert json.loads(prerendered["package.json"])["scripts"]["build"] == gen.PRERENDER_BUILD
+
+
+# Stands in for the SSR build of src/entry-server.jsx: the real route table,
+# with each page rendered as its path.
+SSR_STUB = """\
+export { documentTitle, notFound, routes } from '../src/routes.js';
+export const render = async (url) => `<main>${url}</main>`;
+"""
+
+
+@pytest.mark.skipif(not shutil.which("node"), reason="needs node")
+def test_prerender_script_writes_each_route_with_its_title(tmp_path):
+    site = tmp_path / "site"
+    gen.generate({"prerender": True, "brand_name": "A&B"}, str(site))
+    (site / "dist").mkdir()
+    (site / "dist" / "index.html").write_text(
+        '<html><head><title>Site</title></head><body><div id="root"></div></body></html>')
+    (site / "dist-ssr").mkdir()
+    (site / "dist-ssr" / "entry-server.js").write_text(SSR_STUB)
+
+    subprocess.run(["node", "prerender.js"], cwd=site, capture_output=True, check=True)
+
+    pricing = (site / "dist" / "pricing" / "index.html").read_text()
+    assert '<div id="root"><main>/pricing</main></div>' in pricing
+    assert "<title>Pricing – A&amp;B</title>" in pricing
+    assert '<div id="root"><main>/</main></div>' in (site / "dist" / "index.html").read_text()
+    assert "<main>/404</main>" in (site / "dist" / "404.html").read_text()
+    assert (site / "dist" / "privacy" / "index.html").exists()
+    assert not (site / "dist-ssr").exists()
+
+
+# Runs the generated crm.js under node, where there is no IndexedDB so the
+# outbox lives in memory, with a scripted fetch and a controllable clock.
+CRM_HARNESS = """\
+globalThis.__env = { DEV: false, VITE_CRM_API: 'https://crm.example.com/leads' };
+globalThis.window = globalThis;
+window.addEventListener = () => {};
+globalThis.setTimeout = () => 0;
+globalThis.clearTimeout = () => {};
+let now = 1000;
+Date.now = () => now;
+const statuses = [503, 200, 400];
+const posts = [];
+globalThis.fetch = async (url, init) => {
+  posts.push({ key: init.headers['Idempotency-Key'], body: JSON.parse(init.body) });
+  const status = statuses.shift();
+  return { ok: status < 300, status };
+};
+
+const crm = await import(process.argv[2]);
+const captured = [await crm.captureLead('contact', { email: 'a@example.com' }),
+                  await crm.captureLead('demo', { name: 'Joy' })];
+await crm.drainOutbox();
+const afterFailure = await crm.pendingLeads();
+await crm.drainOutbox();  // still backing off: nothing is posted
+now += 10 * 60 * 1000;
+await crm.drainOutbox();
+const afterSuccess = await crm.pendingLeads();
+await crm.captureLead('contact', { email: 'bad' });
+await crm.drainOutbox();
+console.log(JSON.stringify({ captured, posts, afterFailure, afterSuccess, afterReject: await crm.pendingLeads() }));
+"""
+
+
+@pytest.mark.skipif(not shutil.which("node"), reason="needs node")
+def test_crm_outbox_batches_retries_with_the_same_ids_and_drops_rejected_leads(tmp_path):
+    (tmp_path / "crm.mjs").write_text(_tree()["src/lib/crm.js"].replace("import.meta.env", "globalThis.__env"))
+    (tmp_path / "harness.mjs").write_text(CRM_HARNESS)
+    result = json.loads(subprocess.run(["node", str(tmp_path / "harness.mjs"), (tmp_path / "crm.mjs").as_uri()],
+                                       capture_output=True, text=True, check=True).stdout)
+
+    assert [c["method"] for c in result["captured"]] == ["outbox", "outbox"]
+    ids = [c["id"] for c in result["captured"]]
+    first, retry, rejected = result["posts"]
+    assert first == retry
+    assert first["key"] == ",".join(ids)
+    assert first["body"] == {"leads": [{"id": ids[0], "kind": "contact", "email": "a@example.com"},
+                                       {"id": ids[1], "kind": "demo", "name": "Joy"}]}
+    assert rejected["body"]["email"] == "bad"
+    assert (result["afterFailure"], result["afterSuccess"], result["afterReject"]) == (2, 0, 0)
+
+
+def test_crm_debug_calls_are_guarded_so_production_builds_drop_them():
+    crm = _tree()["src/lib/crm.js"]
+    calls = [line for line in crm.splitlines() if "debug(" in line and "function debug" not in line]
+    assert calls and all("if (import.meta.env.DEV) debug(" in line for line in calls)
+
+
+def test_template_cache_is_reused_and_invalidated_by_template_changes(tmp_path, monkeypatch):
+    monkeypatch.setenv("QXP_STARTER_CACHE", str(tmp_path))
+    first = gen.load_templates()
+    entries = os.listdir(tmp_path)
+    assert len(entries) == 1 and entries[0].endswith(".marshal")
+    assert {rel: t.parts for rel, t in gen.load_templates().items()} == {rel: t.parts for rel, t in first.items()}
+
+    monkeypatch.setitem(gen.TEMPLATES, "README.md", gen.TEMPLATES["README.md"] + "\nEdited.\n")
+    edited = gen.load_templates()
+    assert "Edited." in edited["README.md"].render(gen._FilteredValues(gen.build_context(gen.resolve_config())))
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_template_cache_prunes_only_stale_entries(tmp_path):
+    for name in ("templates-v1-old.marshal", "templates-v1-other.marshal", "locks"):
+        (tmp_path / name).write_text("x")
+    old = time.time() - gen.TEMPLATE_CACHE_MAX_AGE - 60
+    os.utime(tmp_path / "templates-v1-old.marshal", (old, old))
+    gen.prune_template_cache(str(tmp_path))
+    assert sorted(os.listdir(tmp_path)) == ["locks", "templates-v1-other.marshal"]
+
+
+def test_incremental_writer_rewrites_only_what_changed(tmp_path):
+    root = str(tmp_path)
+    tree = {"a.txt": b"one", "src/lib/b.js": b"two", "src/old/c.js": b"three"}
+    first = gen.IncrementalWriter(root).write_tree(tree)
+    assert sorted(first["added"]) == sorted(tree)
+    manifest_mtime = os.stat(tmp_path / gen.MANIFEST).st_mtime_ns
+
+    again = gen.IncrementalWriter(root).write_tree(tree)
+    assert again["added"] == again["changed"] == again["removed"] == []
+    assert again["bytes_written"] == 0
+    assert os.stat(tmp_path / gen.MANIFEST).st_mtime_ns == manifest_mtime
+
+    report = gen.IncrementalWriter(root).write_tree({"a.txt": b"ONE", "src/lib/b.js": b"two"})
+    assert report["changed"] == ["a.txt"] and report["removed"] == ["src/old/c.js"]
+    assert report["bytes_written"] == 3
+    assert not (tmp_path / "src" / "old").exists()
+    with open(tmp_path / gen.MANIFEST) as f:
+        assert sorted(json.load(f)["files"]) == ["a.txt", "src/lib/b.js"]
+
+
+def test_incremental_writer_restores_hand_edited_files(tmp_path):
+    root = str(tmp_path)
+    gen.IncrementalWriter(root).write_tree({"a.txt": b"generated"})
+    (tmp_path / "a.txt").write_bytes(b"hand edit")
+    assert gen.IncrementalWriter(root).write_tree({"a.txt": b"generated"})["changed"] == ["a.txt"]
+    assert (tmp_path / "a.txt").read_bytes() == b"generated"
+
+
+def test_partial_write_keeps_files_of_other_sections(tmp_path):
+    root = str(tmp_path)
+    gen.IncrementalWriter(root).write_tree({"a.txt": b"a", "b.txt": b"b", "c.txt": b"c"})
+    report = gen.IncrementalWriter(root).write_tree({"a.txt": b"A"}, partial=True, owned=("a.txt", "b.txt"))
+    assert report["changed"] == ["a.txt"] and report["removed"] == ["b.txt"]
+    assert (tmp_path / "c.txt").read_bytes() == b"c"
+
+
+def test_generate_renders_tenant_config_into_the_site(tmp_path):
+    report = gen.generate({"slug": "acme", "brand_name": "Acme Academy"}, str(tmp_path / "acme"))
+    assert report["out_dir"] == str(tmp_path / "acme") and "package.json" in report["added"]
+    with open(tmp_path / "acme" / "package.json") as f:
+        assert json.load(f)["name"] == "acme"
+    assert "Acme Academy" in (tmp_path / "acme" / "README.md").read_text()
+
+
+@pytest.mark.parametrize("config, message", [
+    ({"nope": 1}, "unknown config keys: nope"),
+    ({"slug": "Bad Slug"}, "invalid slug"),
+    ({"colors": {"brand": "red"}}, "invalid color brand='red'"),
+    ({"colors": {"x y": "#fff"}}, "invalid color name"),
+    ({"gtm_load": "later"}, "invalid gtm_load"),
+    ({"gtm_defer_timeout_ms": "soon"}, "invalid gtm_defer_timeout_ms 'soon'"),
+])
+def test_resolve_config_rejects_bad_tenants(config, message):
+    with pytest.raises(ValueError, match=re.escape(message)):
+        gen.resolve_config(config)
+
+
+def test_batch_isolates_failing_tenants(tmp_path):
+    tenants = [{"slug": "good"}, {"slug": "bad", "colors": {"brand": "red"}}, {"slug": "also-good"}]
+    results = gen.generate_batch(tenants, str(tmp_path), jobs=1)
+    assert [(r["slug"], r["ok"]) for r in results] == [("good", True), ("bad", False), ("also-good", True)]
+    assert "invalid color" in results[1]["error"]
+    assert (tmp_path / "also-good" / "package.json").exists()
+    assert not (tmp_path / "bad").exists()
+
+
+def test_batch_rejects_duplicate_and_missing_slugs(tmp_path):
+    with pytest.raises(ValueError, match="duplicate tenant slug 'a'"):
+        gen.generate_batch([{"slug": "a"}, {"slug": "a"}], str(tmp_path))
+    with pytest.raises(ValueError, match="every tenant needs a slug"):
+        gen.generate_batch([{}], str(tmp_path))
+
+
+def test_load_tenants_reads_csv_colors_and_address_lines(tmp_path):
+    path = tmp_path / "tenants.csv"
+    path.write_text("slug,colors.brand,address_lines,email\nacme,#123456,1 Road|Nairobi,\n")
+    assert gen.load_tenants(str(path)) == [
+        {"slug": "acme", "colors": {"brand": "#123456"}, "address_lines": "1 Road|Nairobi"}]
+    assert gen.resolve_config(gen.load_tenants(str(path))[0])["address_lines"] == ["1 Road", "Nairobi"]
+
+
+def test_unreadable_or_non_object_configs_are_reported_not_raised(tmp_path, capsys):
+    missing = str(tmp_path / "missing.json")
+    (tmp_path / "list.json").write_text("[]")
+    (tmp_path / "broken.json").write_text("{")
+    site = str(tmp_path / "site")
+    for argv, message in [(["--config", missing], f"{missing}: No such file or directory"),
+                          (["--config", str(tmp_path / "list.json")], "config is list, expected an object"),
+                          (["--config", str(tmp_path / "broken.json")], "invalid JSON"),
+                          (["--batch", missing], f"{missing}: No such file or directory"),
+                          (["--batch", str(tmp_path / "missing.csv")], "No such file or directory")]:
+        assert gen.main([site, "--quiet", *argv]) == 2
+        assert message in capsys.readouterr().err
+    assert not os.path.exists(site)
+
+
+def test_diff_tree_reports_changes_without_touching_disk(tmp_path):
+    root = str(tmp_path)
+    gen.IncrementalWriter(root).write_tree({"a.txt": b"one\n", "gone.txt": b"x\n"})
+    before = sorted(os.listdir(root))
+    diff = "".join(gen.diff_tree({"a.txt": b"two\n", "new.txt": b"hi\n"}, root))
+    assert "--- a/a.txt\n+++ b/a.txt\n" in diff and "-one\n+two\n" in diff
+    assert "--- /dev/null\n+++ b/new.txt\n" in diff
+    assert "--- a/gone.txt\n+++ /dev/null\n" in diff
+    assert sorted(os.listdir(root)) == before
+    assert (tmp_path / "a.txt").read_bytes() == b"one\n"
+
+
+def test_dry_run_reports_what_a_real_run_would_write(tmp_path):
+    out_dir = str(tmp_path / "site")
+    report = gen.generate({}, out_dir, dry_run=True)
+    assert report["added"] and not os.path.exists(out_dir)
+    assert sorted(report["added"]) == sorted(gen.generate({}, out_dir)["added"])
+
+
+def test_zip_archives_are_reproducible_and_skipped_when_unchanged(tmp_path):
+    first, second = str(tmp_path / "a.zip"), str(tmp_path / "b.zip")
+    assert gen.package({}, first)["skipped"] is False
+    gen.package({}, second)
+    with open(first, "rb") as a, open(second, "rb") as b:
+        assert a.read() == b.read()
+    with zipfile.ZipFile(first) as zf:
+        names = zf.namelist()
+        assert names == sorted(names) and "package.json" in names
+        assert {info.date_time for info in zf.infolist()} == {gen.ZIP_EPOCH}
+    with open(first + ".sha256") as f:
+        assert f.read().strip() == gen.tree_digest(gen.render_tree(gen.resolve_config({})))
+
+    assert gen.package({}, first)["skipped"] is True
+    assert gen.package({"brand_name": "Other"}, first)["skipped"] is False
+    assert gen.package({"brand_name": "Other"}, first, force=True)["skipped"] is False
+
+
+@pytest.mark.parametrize("flag", ["--dry-run", "--diff"])
+def test_zip_refuses_dry_run_and_diff(tmp_path, monkeypatch, capsys, flag):
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(SystemExit) as exc:
+        gen.main(["--zip", "site.zip", flag])
+    assert exc.value.code == 2
+    assert "cannot be combined with --dry-run or --diff" in capsys.readouterr().err
+    assert not (tmp_path / "site.zip").exists()
+
+
+def test_tree_digest_depends_on_paths_and_contents():
+    base = gen.tree_digest({"a": b"1", "b": b"2"})
+    assert base == gen.tree_digest({"b": b"2", "a": b"1"})
+    assert base != gen.tree_digest({"a": b"1", "c": b"2"})
+    assert base != gen.tree_digest({"a": b"1", "b": b"3"})
+
+
+def test_profiler_records_each_stage_of_generate(tmp_path):
+    profiler = gen.Profiler()
+    gen.generate({}, str(tmp_path / "site"), profiler=profiler)
+    names = [span["name"] for span in profiler.spans]
+    assert names[0] == "resolve_config"
+    assert "render:lib" in names and "write:lib" in names and "finish" in names and "npm_state" in names
+    write_lib = next(span for span in profiler.spans if span["name"] == "write:lib")
+    assert write_lib["files"] > 0 and write_lib["bytes"] > 0
+
+
+def test_write_profile_emits_json_lines_or_chrome_trace(tmp_path):
+    profiler = gen.Profiler(tenant="acme")
+    with profiler.span("render:lib") as span:
+        span.update(files=2)
+    gen.write_profile(profiler.spans, str(tmp_path / "spans.jsonl"))
+    (record,) = [json.loads(line) for line in (tmp_path / "spans.jsonl").read_text().splitlines()]
+    assert record["name"] == "render:lib" and record["files"] == 2 and record["tenant"] == "acme"
+    assert record["start_ms"] == 0 and record["duration_ms"] >= 0
+
+    gen.write_profile(profiler.spans, str(tmp_path / "trace.json"))
+    (event,) = json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+    assert event["ph"] == "X" and event["args"] == {"tenant": "acme", "files": 2}
+
+
+def test_quiet_cli_prints_nothing(tmp_path, capsys):
+    assert gen.main([str(tmp_path / "site"), "--quiet", "--profile", str(tmp_path / "p.jsonl")]) == 0
+    assert capsys.readouterr().out == ""
+    assert (tmp_path / "p.jsonl").read_text().strip()
+
+
+def test_select_sections_matches_names_and_output_paths():
+    assert [sec.name for sec in gen.select_sections(only=["lib/*"])] == \
+        [sec.name for sec in gen.SECTIONS.values() if sec.name.startswith("lib/")]
+    assert [sec.outputs for sec in gen.select_sections(only=["src/lib/gtm.js"])] == [("src/lib/gtm.js",)]
+    assert "readme" not in {sec.name for sec in gen.select_sections(skip=["readme"])}
+    with pytest.raises(ValueError, match="no section matches 'nope'"):
+        gen.select_sections(only=["nope"])
+
+
+def test_section_inputs_come_from_template_placeholders():
+    assert "brand_name" in gen.SECTIONS["readme"].inputs()
+    assert "colors" in gen.SECTIONS["tailwind.config.js"].inputs()
+
+
+def test_only_regenerates_the_selected_sections(tmp_path):
+    out_dir = str(tmp_path / "site")
+    gen.generate({}, out_dir)
+    report = gen.generate({"brand_name": "Renamed School"}, out_dir, only=["readme"])
+    assert report["changed"] == ["README.md"] and report["removed"] == []
+    assert "Renamed School" not in (tmp_path / "site" / "src" / "components" / "Header.jsx").read_text()
+    with open(tmp_path / "site" / gen.MANIFEST) as f:
+        assert "src/lib/gtm.js" in json.load(f)["files"]
+
+
+def test_changed_sections_follow_the_config_keys_they_read():
+    templates = gen.compiled_templates()
+    sections = list(gen.SECTIONS.values())
+    old = gen.resolve_config({})
+    changed = gen.changed_sections(old, gen.resolve_config({"gtm_load": "deferred"}), sections, templates)
+    assert [sec.name for sec in changed] == [".env.example", "lib/gtm"]
+    assert gen.changed_sections(old, dict(old), sections, templates) == []
+
+
+def test_watch_rewrites_only_files_a_config_edit_affects(tmp_path):
+    out_dir, config_path = str(tmp_path / "site"), tmp_path / "config.json"
+    config_path.write_text(json.dumps({}))
+    gtm = os.path.join(out_dir, "src", "lib", "gtm.js")
+    lines = _watch_until(out_dir, str(config_path),
+                         edit=lambda: config_path.write_text(json.dumps({"gtm_load": "deferred"})),
+                         done=lambda: "'deferred'" in open(gtm).read())
+    assert any(line.startswith("⚡ 2 file(s) updated") and line.endswith(": .env.example, src/lib/gtm.js")
+               for line in lines), lines
+    with open(gtm) as f:
+        assert "'deferred'" in f.read()
+
+
+def test_watch_cli_applies_command_line_overrides(tmp_path, monkeypatch):
+    watch = gen.watch
+    monkeypatch.setattr(gen, "watch", lambda *args, **kwargs: watch(*args, **kwargs, should_stop=lambda: True))
+    site = tmp_path / "site"
+    assert gen.main([str(site), "--watch", "--quiet", "--prerender", "--gtm-load", "deferred"]) == 0
+    assert (site / "src" / "entry-server.jsx").exists() and (site / "prerender.js").exists()
+    assert "export const ROUTING = 'path';" in (site / "src" / "routes.js").read_text()
+    assert "const LOAD_MODE = import.meta.env.VITE_GTM_LOAD || 'deferred';" in \
+        (site / "src" / "lib" / "gtm.js").read_text()
+
+
+def test_watch_cli_points_the_site_at_the_npm_cache(tmp_path, monkeypatch):
+    watch = gen.watch
+    monkeypatch.setattr(gen, "watch", lambda *args, **kwargs: watch(*args, **kwargs, should_stop=lambda: True))
+    site, cache = tmp_path / "site", tmp_path / "npm-cache"
+    assert gen.main([str(site), "--watch", "--quiet", "--npm-cache", str(cache)]) == 0
+    assert f"cache={cache}" in (site / ".npmrc").read_text()
+
+
+def test_watch_keeps_command_line_overrides_across_config_reloads(tmp_path):
+    out_dir, config_path = str(tmp_path / "site"), tmp_path / "config.json"
+    config_path.write_text(json.dumps({}))
+    readme = os.path.join(out_dir, "README.md")
+    _watch_until(out_dir, str(config_path), base_config={"prerender": True, "gtm_load": "deferred"},
+                 edit=lambda: config_path.write_text(json.dumps({"brand_name": "Acme"})),
+                 done=lambda: "Acme" in open(readme).read())
+    assert "Acme" in open(readme).read()
+    assert all(os.path.exists(os.path.join(out_dir, rel)) for rel in gen.PRERENDER_FILES)
+    with open(os.path.join(out_dir, "src", "routes.js")) as f:
+        assert "export const ROUTING = 'path';" in f.read()
+    with open(os.path.join(out_dir, "src", "lib", "gtm.js")) as f:
+        assert "'deferred'" in f.read()
+
+
+def _lockfile(name, deps=None):
+    deps = deps or gen.dependency_set()
+    return {"name": name, "lockfileVersion": 3,
+            "packages": {"": {"name": name, **deps}, "node_modules/react": {"version": "18.2.0"}}}
+
+
+def test_sync_npm_state_harvests_keeps_and_seeds_lockfiles(tmp_path):
+    store, first, second = str(tmp_path / "store"), tmp_path / "first", tmp_path / "second"
+    first.mkdir()
+    second.mkdir()
+    assert gen.sync_npm_state(str(first), "first", store) is None
+
+    (first / "package-lock.json").write_text(json.dumps(_lockfile("first")))
+    assert gen.sync_npm_state(str(first), "first", store) == "harvested"
+    assert gen.sync_npm_state(str(first), "first", store) == "kept"
+
+    assert gen.sync_npm_state(str(second), "second", store) == "seeded"
+    seeded = json.loads((second / "package-lock.json").read_text())
+    assert seeded["name"] == seeded["packages"][""]["name"] == "second"
+    assert seeded["packages"]["node_modules/react"] == {"version": "18.2.0"}
+
+
+def test_sync_npm_state_drops_a_stale_lockfile(tmp_path):
+    site = tmp_path / "site"
+    (site / "node_modules").mkdir(parents=True)
+    (site / "package-lock.json").write_text(json.dumps(_lockfile("site", {"dependencies": {"react": "^17"}})))
+    (site / "node_modules" / ".package-lock.json").write_text("{}")
+    assert gen.sync_npm_state(str(site), "site", str(tmp_path / "empty-store")) == "invalidated"
+    assert not (site / "package-lock.json").exists()
+    assert not (site / "node_modules" / ".package-lock.json").exists()
+
+
+def test_regeneration_leaves_node_modules_and_lockfile_alone(tmp_path):
+    site = tmp_path / "site"
+    gen.generate({}, str(site))
+    (site / "node_modules" / "react").mkdir(parents=True)
+    (site / "package-lock.json").write_text(json.dumps(_lockfile("qxp-marketing")))
+    report = gen.generate({"brand_name": "Other"}, str(site))
+    assert report["npm"] in ("kept", "harvested")
+    assert (site / "node_modules" / "react").is_dir() and (site / "package-lock.json").exists()
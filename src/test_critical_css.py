@@ -0,0 +1,97 @@
+"""Tests for critical_css.py; run with python -m pytest src."""
+
+import critical_css as cc
+
+PAGE = """<!doctype html>
+<html>
+  <head>
+    <title>Home</title>
+    <link rel="stylesheet" href="/assets/index-a1.css">
+  </head>
+  <body>
+    <div id="root">
+      <header class="qxp-nav"><a class="logo" href="/">QXP</a></header>
+      <main>
+        <section class="hero"><h1>Learn</h1><a class="btn qxp-red" data-cta href="/demo">Demo</a></section>
+        <section class="features"><p class="card">Below the fold</p></section>
+      </main>
+    </div>
+  </body>
+</html>
+"""
+CSS = """
+@import url(fonts.css);
+@font-face{font-family:"Brand";src:url(../fonts/brand.woff2)}
+@font-face{font-family:"Unused";src:url(unused.woff2)}
+@keyframes pop{from{opacity:0}to{opacity:1}}
+@keyframes spin{to{transform:rotate(1turn)}}
+/* brand */
+.qxp-nav{display:flex}
+.hero h1{font-family:Brand,sans-serif;animation:pop 1s}
+.btn:hover,.card{color:red}
+.card{padding:1rem}
+a[data-cta]::after{content:"→"}
+@media (min-width:768px){.hero{padding:4rem}.features{display:grid}}
+@supports (display:grid){.card{display:grid}}
+"""
+
+
+def test_compounds_drop_pseudos_and_split_on_combinators():
+    assert cc.compounds("header.qxp-nav > a.logo:hover") == [
+        ("header", {"qxp-nav"}, set(), set()), ("a", {"logo"}, set(), set())]
+    assert cc.compounds("#root [data-cta=x]::after") == [
+        (None, set(), {"root"}, set()), (None, set(), set(), {"data-cta"})]
+    assert cc.compounds(r".md\:flex:not(.a, .b)") == [(None, {"md:flex"}, set(), set())]
+    assert cc.compounds("*") == []
+
+
+def test_fold_is_the_header_and_the_first_main_child_with_ancestors():
+    fold = cc.fold_elements(cc.parse_html(PAGE))
+    tags = {(el.tag, el.attrs.get("class")) for el in fold}
+    assert ("section", "hero") in tags and ("header", "qxp-nav") in tags
+    assert ("main", None) in tags and ("body", None) in tags
+    assert ("section", "features") not in tags
+    assert cc.fold_elements(cc.parse_html('<body><div id="root"></div></body>')) is None
+
+
+def test_critical_items_keep_matching_rules_inside_at_rules():
+    index = cc.FoldIndex(cc.fold_elements(cc.parse_html(PAGE)))
+    kept = cc.serialize_css(cc.critical_items(cc.parse_css(CSS), index))
+    assert kept == (".qxp-nav{display:flex}"
+                    ".hero h1{font-family:Brand,sans-serif;animation:pop 1s}"
+                    ".btn:hover,.card{color:red}"
+                    'a[data-cta]::after{content:"→"}'
+                    "@media (min-width:768px){.hero{padding:4rem}}")
+
+
+def test_extract_critical_adds_used_fonts_and_keyframes_with_absolute_urls():
+    critical = cc.extract_critical(PAGE, [("/assets/index-a1.css", CSS)])
+    assert critical.startswith('@font-face{font-family:"Brand";src:url(/fonts/brand.woff2)}'
+                               "@keyframes pop{")
+    assert "Unused" not in critical and "spin" not in critical and ".features" not in critical
+    assert cc.extract_critical('<body><div id="root"></div></body>', [("/a.css", CSS)]) is None
+
+
+def test_inline_critical_defers_stylesheets_and_runs_once(tmp_path):
+    dist = tmp_path / "dist"
+    (dist / "assets").mkdir(parents=True)
+    (dist / "assets" / "index-a1.css").write_text(CSS)
+    (dist / "index.html").write_text(PAGE)
+    (dist / "shell.html").write_text(PAGE.replace(PAGE[PAGE.index('<header'):PAGE.index('</main>') + 7], ""))
+
+    rows = cc.process(str(dist))
+    assert [(r["page"], r["status"]) for r in rows] == [("index.html", "ok"), ("shell.html", "client-rendered")]
+    html = (dist / "index.html").read_text()
+    assert "<style data-critical>@font-face" in html
+    assert ('<link rel="stylesheet" href="/assets/index-a1.css" media="print" onload="this.media=\'all\'">'
+            '<noscript><link rel="stylesheet" href="/assets/index-a1.css"></noscript>') in html
+    assert cc.process(str(dist))[0]["status"] == "already inlined"
+
+
+def test_pages_over_budget_are_left_alone(tmp_path):
+    dist = tmp_path / "dist"
+    (dist / "assets").mkdir(parents=True)
+    (dist / "assets" / "index-a1.css").write_text(CSS)
+    (dist / "index.html").write_text(PAGE)
+    assert cc.process(str(dist), budget=10)[0]["status"] == "over budget"
+    assert (dist / "index.html").read_text() == PAGE
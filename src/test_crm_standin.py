@@ -0,0 +1,109 @@
+"""Tests for crm_standin.py; run with python -m pytest src."""
+
+import json
+import random
+import asyncio
+
+import crm_standin
+import lead_protocol as protocol
+
+
+def test_standin_answers_oversized_bodies_with_413_and_closes():
+    async def exchange(request):
+        standin = crm_standin.CRMStandin()
+        host, port = await standin.start(port=0)
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write(request)
+            await writer.drain()
+            response = await asyncio.wait_for(reader.read(), 5)
+            writer.close()
+            return response, standin
+        finally:
+            await standin.close()
+
+    response, standin = asyncio.run(exchange(
+        b"POST /leads HTTP/1.1\r\nContent-Length: 10000000000\r\n\r\n" + b"x" * 4096))
+    assert response.startswith(b"HTTP/1.1 413 ")
+    assert b"Connection: close" in response
+    assert not standin.leads
+
+    response, _ = asyncio.run(exchange(b"POST /leads HTTP/1.1\r\nContent-Length: -5\r\n\r\n"))
+    assert response.startswith(b"HTTP/1.1 400 ")
+    assert b"invalid Content-Length" in response
+
+
+def test_faults_throttle_with_a_one_second_token_bucket(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(crm_standin.time, "monotonic", lambda: now[0])
+    faults = crm_standin.Faults(rate_limit=2)
+    assert [faults.throttled() for _ in range(3)] == [False, False, True]
+    now[0] += 0.5
+    assert [faults.throttled() for _ in range(2)] == [False, True]
+    now[0] += 10
+    assert [faults.throttled() for _ in range(3)] == [False, False, True]
+    assert not crm_standin.Faults().throttled()
+
+
+def test_seeded_faults_are_reproducible():
+    a = crm_standin.Faults(latency_ms=20, jitter_ms=10, error_rate=0.5, seed=7)
+    b = crm_standin.Faults(latency_ms=20, jitter_ms=10, error_rate=0.5, seed=7)
+    delays = [a.delay() for _ in range(50)]
+    assert delays == [b.delay() for _ in range(50)]
+    assert all(0.02 <= d <= 0.03 for d in delays)
+    failures = [a.failed() for _ in range(1000)]
+    assert failures == [b.failed() for _ in range(1000)]
+    assert 400 < sum(failures) < 600
+    assert not any(crm_standin.Faults(seed=7).failed() for _ in range(100))
+
+
+def _handle(standin, method, target, body=b""):
+    return asyncio.run(standin.handle(method, target, body))
+
+
+def test_standin_stores_leads_once_and_rejects_invalid_ones():
+    standin = crm_standin.CRMStandin()
+    lead = {"id": "lead-1", "kind": "contact", "email": "a@example.com"}
+    batch = json.dumps({"leads": [lead, {"kind": "demo", "name": "Joy"}]}).encode()
+    assert _handle(standin, "POST", "/leads", batch) == (200, {"ok": True, "accepted": 2, "duplicates": 0}, {})
+    assert _handle(standin, "POST", "/leads?retry=1", json.dumps(lead).encode())[1]["duplicates"] == 1
+    status, payload, _ = _handle(standin, "POST", "/leads", b'{"kind": "quote"}')
+    assert status == 422 and payload["problems"] == ["leads[0]: unknown kind 'quote': expected contact or demo"]
+    assert _handle(standin, "POST", "/leads", None)[0] == 413
+    assert len(_handle(standin, "GET", "/leads")[1]["leads"]) == 2
+    assert _handle(standin, "PUT", "/leads")[:1] == (405,)
+    assert _handle(standin, "POST", "/other")[0] == 404
+    assert _handle(standin, "GET", "/stats")[1] == {"requests": 8, "accepted": 2, "duplicates": 1,
+                                                   "rejected": 1, "stored": 2}
+
+
+def test_standin_applies_throttling_before_failures():
+    standin = crm_standin.CRMStandin(crm_standin.Faults(rate_limit=1, error_rate=1.0))
+    body = json.dumps({"kind": "contact"}).encode()
+    assert _handle(standin, "POST", "/leads", body)[0] == 503
+    assert _handle(standin, "POST", "/leads", body)[:3:2] == (429, {"Retry-After": "1"})
+    assert not standin.leads
+
+
+def test_synthetic_leads_are_valid_and_seeded():
+    for kind in ("contact", "demo"):
+        lead = crm_standin.synthetic_lead(random.Random(1), kind)
+        assert protocol.validate_lead(lead) == []
+        assert lead == crm_standin.synthetic_lead(random.Random(1), kind)
+
+
+def test_load_generator_delivers_batches_to_the_standin():
+    async def run():
+        standin = crm_standin.CRMStandin()
+        host, port = await standin.start(port=0)
+        try:
+            report = await crm_standin.run_load(f"http://{host}:{port}/leads", rate=100, duration=0.2,
+                                                concurrency=4, batch=3, seed=1)
+        finally:
+            await standin.close()
+        return report, standin
+
+    report, standin = asyncio.run(run())
+    assert report["requests"] == 20
+    assert report["outcomes"]["ok"]["count"] == 20
+    assert report["leads_delivered"] == len(standin.leads) == 60
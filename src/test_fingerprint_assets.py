@@ -0,0 +1,71 @@
+"""Tests for fingerprint_assets.py; run with python -m pytest src."""
+
+import json
+
+import fingerprint_assets as fa
+
+
+def _dist(tmp_path):
+    dist = tmp_path / "dist"
+    (dist / "assets").mkdir(parents=True)
+    (dist / "icons").mkdir()
+    (dist / "logo.png").write_bytes(b"logo")
+    (dist / "icons" / "logo-copy.png").write_bytes(b"logo")
+    (dist / "assets" / "hero-AbCd1234.png").write_bytes(b"hero")
+    (dist / "hero.png").write_bytes(b"hero")
+    (dist / "site.webmanifest").write_text('{"icons": [{"src": "/logo.png"}]}')
+    (dist / "assets" / "app-Zz9Yy8Xx.css").write_text("body{background:url(../logo.png)}")
+    (dist / "assets" / "index-Qq1Ww2Ee.js").write_text('import "./app-Zz9Yy8Xx.css";')
+    (dist / "index.html").write_text(
+        '<link rel="manifest" href="/site.webmanifest"><img src="/hero.png?v=1">'
+        '<script src="/assets/index-Qq1Ww2Ee.js"></script>')
+    return dist
+
+
+def test_rewrite_references_resolves_relative_and_base_urls():
+    mapping = {"/img/a.png": "/static/a.1234567890.png"}
+    assert fa.rewrite_references('url("../img/a.png#x")', "/css/site.css", mapping) == \
+        'url("/static/a.1234567890.png#x")'
+    assert fa.rewrite_references("'/app/img/a.png'", "/index.html", mapping, "/app/") == \
+        "'/app/static/a.1234567890.png'"
+    for text in ('"https://cdn.example.com/img/a.png"', '"/other/a.png"', "'/img/b.png'"):
+        assert fa.rewrite_references(text, "/index.html", mapping) == text
+
+
+def test_identical_assets_are_stored_once_and_references_follow(tmp_path):
+    dist = _dist(tmp_path)
+    report = fa.fingerprint(str(dist))
+    mapping = report["mapping"]
+    assert mapping["/logo.png"] == mapping["/icons/logo-copy.png"]
+    assert mapping["/logo.png"].startswith("/static/logo.") and mapping["/logo.png"].endswith(".png")
+    # Already hashed by Vite, so the public copy points at it.
+    assert mapping["/hero.png"] == "/assets/hero-AbCd1234.png"
+    assert (report["stored"], report["deduped"]) == (2, 2)
+
+    manifest_url = mapping["/site.webmanifest"]
+    assert json.loads((dist / manifest_url.lstrip("/")).read_text())["icons"][0]["src"] == mapping["/logo.png"]
+    html = (dist / "index.html").read_text()
+    assert f'href="{manifest_url}"' in html and 'src="/assets/hero-AbCd1234.png?v=1"' in html
+
+
+def test_rewritten_chunks_and_their_importers_are_renamed(tmp_path):
+    dist = _dist(tmp_path)
+    report = fa.fingerprint(str(dist))
+    renames = report["renamed"]
+    assert set(renames) == {"assets/app-Zz9Yy8Xx.css", "assets/index-Qq1Ww2Ee.js"}
+    css, js = renames["assets/app-Zz9Yy8Xx.css"], renames["assets/index-Qq1Ww2Ee.js"]
+    assert not (dist / "assets" / "app-Zz9Yy8Xx.css").exists()
+    assert report["mapping"]["/logo.png"] in (dist / css).read_text()
+    assert css.split("/")[-1] in (dist / js).read_text()
+    assert js.split("/")[-1] in (dist / "index.html").read_text()
+
+
+def test_second_run_reuses_the_store_and_prune_removes_originals(tmp_path):
+    dist = _dist(tmp_path)
+    first = fa.fingerprint(str(dist))
+    second = fa.fingerprint(str(dist), prune=True)
+    assert second["stored"] == 0 and second["reused"] == first["stored"]
+    assert not (dist / "logo.png").exists() and not (dist / "hero.png").exists()
+    assert json.loads((dist / "asset-manifest.json").read_text())["/logo.png"] == first["mapping"]["/logo.png"]
+    headers = (dist / "_headers").read_text()
+    assert headers.count("/static/*") == headers.count("/assets/*") == 1
@@ -0,0 +1,64 @@
+"""Tests for lead_protocol.py; run with python -m pytest src."""
+
+import json
+import asyncio
+
+import pytest
+
+import lead_protocol as protocol
+
+
+def _read(data, rest=False):
+    """read_request on a stream holding data; with rest, also what it left unread."""
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        request = await protocol.read_request(reader)
+        return (request, await reader.read()) if rest else request
+    return asyncio.run(run())
+
+
+def test_validate_lead_accepts_known_fields_and_rejects_the_rest():
+    assert protocol.validate_lead({"id": "a", "kind": "contact", "name": "Amina", "phone": None}) == []
+    assert protocol.validate_lead({"kind": "quote"}) == ["unknown kind 'quote': expected contact or demo"]
+    assert protocol.validate_lead({"kind": "demo", "id": 7, "role": 3, "budget": "x"}) == [
+        "id must be a string", "role must be a string", "unknown demo field 'budget'"]
+    assert protocol.validate_lead([]) == ["lead must be an object"]
+
+
+def test_parse_leads_takes_one_lead_or_a_batch():
+    lead = {"kind": "contact", "email": "a@example.com"}
+    assert protocol.parse_leads(json.dumps(lead)) == ([lead], [])
+    assert protocol.parse_leads(json.dumps({"leads": [lead, lead]})) == ([lead, lead], [])
+    assert protocol.parse_leads(json.dumps({"leads": []}))[1] == ["leads must be a non-empty array"]
+    assert protocol.parse_leads("{")[1][0].startswith("invalid JSON")
+    _, problems = protocol.parse_leads(json.dumps({"leads": [lead, {"kind": "demo", "x": "1"}]}))
+    assert problems == ["leads[1]: unknown demo field 'x'"]
+
+
+def test_read_request_reads_a_content_length_body():
+    method, target, headers, body = _read(b"POST /leads HTTP/1.1\r\nContent-Length: 2\r\n\r\n{}extra")
+    assert (method, target, headers["content-length"], body) == ("POST", "/leads", "2", b"{}")
+    assert _read(b"") is None
+
+
+def test_read_request_leaves_an_oversized_body_unread():
+    (_, _, _, body), unread = _read(b"POST /leads HTTP/1.1\r\nContent-Length: 10000000000\r\n\r\nxyz", rest=True)
+    assert body is None
+    assert unread == b"xyz"
+
+
+@pytest.mark.parametrize("length", ["-1", "ten", "1e3", "²"])
+def test_read_request_rejects_invalid_content_length(length):
+    with pytest.raises(protocol.BadRequest, match="Content-Length"):
+        _read(f"POST /leads HTTP/1.1\r\nContent-Length: {length}\r\n\r\n".encode("latin-1"))
+
+
+def test_percentile_uses_nearest_rank():
+    values = list(range(1, 101))
+    assert protocol.percentile(values, 50) == 50
+    assert protocol.percentile(values, 99) == 99
+    assert protocol.percentile([3.0, 7.0], 50) == 3.0
+    assert protocol.percentile([3.0, 7.0], 51) == 7.0
+    assert protocol.percentile([], 95) == 0.0
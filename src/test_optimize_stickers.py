@@ -0,0 +1,59 @@
+"""Tests for optimize_stickers.py; run with python -m pytest src."""
+
+import pytest
+
+import optimize_stickers as opt
+
+
+def _svg(body):
+    return f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 10 10">\n  {body}\n</svg>'
+
+
+def test_text_after_inline_child_survives():
+    out = opt.optimize_svg(_svg("<text>Hello <tspan>big</tspan> world</text>"))
+    assert "<text>Hello <tspan>big</tspan> world</text>" in out
+
+
+def test_layout_whitespace_between_elements_is_dropped():
+    out = opt.optimize_svg(_svg('<g>\n    <rect width="1" height="1"/>\n  </g>'))
+    assert out.endswith('viewBox="0 0 10 10"><g><rect width="1" height="1"/></g></svg>')
+
+
+def test_id_used_only_by_style_selector_is_kept():
+    out = opt.optimize_svg(_svg('<style>#a{fill:red}</style><rect id="a" width="1" height="1"/>'
+                                '<rect id="b" width="1" height="1"/>'))
+    assert 'id="a"' in out
+    assert 'id="b"' not in out
+
+
+def test_ids_referenced_by_url_and_href_are_kept():
+    out = opt.optimize_svg(_svg('<linearGradient id="g"/><path id="p" d="M0 0"/>'
+                                '<rect fill="url(#g)" width="1" height="1"/><use href="#p"/>'))
+    assert 'id="g"' in out and 'id="p"' in out
+
+
+def test_verify_rejects_lost_text_and_ids():
+    before = _svg('<style>#a{fill:red}</style><text>Hello <tspan>big</tspan> world</text>'
+                  '<rect id="a" width="1" height="1"/>')
+    with pytest.raises(ValueError, match="text"):
+        opt._verify(before, before.replace(" world", ""))
+    with pytest.raises(ValueError, match="referenced ids"):
+        opt._verify(before, before.replace(' id="a"', ""))
+    opt._verify(before, opt.optimize_svg(before))
+
+
+def test_path_data_is_rounded_and_compacted():
+    assert opt.compact_path("M 10.004 0.5 L 1 2 L -0.25 3 Z", 2) == "M10 .5L1 2-.25 3Z"
+
+
+def test_unused_class_rules_and_overridden_attributes_are_removed():
+    out = opt.optimize_svg(_svg('<style>.a{fill:red} .unused{fill:blue}</style>'
+                                '<rect class="a" fill="green" x="0" width="1" height="1"/>'))
+    assert ".unused" not in out
+    assert 'fill="green"' not in out and 'x="0"' not in out
+
+
+def test_check_budget_flags_growth_and_new_large_files():
+    results = [{"id": "a", "ok": True, "after": 120}, {"id": "b", "ok": True, "after": 5000}]
+    problems = opt.check_budget(results, {"files": {"a": 100}}, 0.05, 4096)
+    assert problems == ["a: 100 -> 120 bytes", "b: 5000 bytes, new stickers may use 4096"]
@@ -0,0 +1,111 @@
+"""Tests for resource_hints.py; run with python -m pytest src."""
+
+import re
+import json
+
+import pytest
+
+import critical_css
+import resource_hints as rh
+
+MANIFEST = {
+    "index.html": {"file": "assets/index-a1.js", "isEntry": True, "imports": ["_vendor"]},
+    "_vendor": {"file": "assets/vendor-b2.js"},
+    "src/pages/Pricing.jsx": {"file": "assets/Pricing-c3.js", "isDynamicEntry": True,
+                              "imports": ["_vendor", "_Card"], "css": ["assets/Pricing-d4.css"],
+                              "assets": ["assets/hero-e5.png"]},
+    "_Card": {"file": "assets/Card-f6.js", "css": ["assets/Card-g7.css"], "assets": ["assets/card-h8.png"]},
+}
+PAGE = """<!doctype html>
+<html>
+  <head>
+    <title>Pricing</title>
+    <script type="module" src="/assets/index-a1.js"></script>
+    <link rel="modulepreload" href="/assets/vendor-b2.js">
+  </head>
+  <body><div id="root"></div></body>
+</html>
+"""
+
+
+def _dist(tmp_path):
+    dist = tmp_path / "dist"
+    (dist / "assets").mkdir(parents=True)
+    (dist / ".vite").mkdir()
+    (dist / ".vite" / "manifest.json").write_text(json.dumps(MANIFEST))
+    (dist / "assets" / "Pricing-d4.css").write_text("h1{color:red}")
+    (dist / "assets" / "Card-g7.css").write_text(".card{border:1px solid}")
+    (dist / "pricing").mkdir()
+    (dist / "pricing" / "index.html").write_text(PAGE)
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "routes.js").write_text(
+        "export const routes = [\n"
+        "  { path: '/pricing', title: 'Pricing', load: () => import('./pages/Pricing.jsx') },\n"
+        "];\n")
+    return dist
+
+
+def test_chunk_graph_follows_static_imports_and_keeps_top_level_assets():
+    js, css, assets = rh.chunk_graph(MANIFEST, "src/pages/Pricing.jsx")
+    assert js == ["assets/Pricing-c3.js", "assets/vendor-b2.js", "assets/Card-f6.js"]
+    assert css == ["assets/Pricing-d4.css", "assets/Card-g7.css"]
+    assert assets == ["assets/hero-e5.png"]
+    assert rh.chunk_graph(MANIFEST, "missing") == ([], [], [])
+
+
+def test_page_route_maps_built_pages_to_routes():
+    assert rh.page_route("index.html") == "/"
+    assert rh.page_route("pricing/index.html") == "/pricing"
+    assert rh.page_route("404.html") is None
+
+
+def test_route_css_is_preloaded_without_crossorigin(tmp_path):
+    dist = _dist(tmp_path)
+    rows, _ = rh.process(str(dist), str(tmp_path))
+    page = (dist / "pricing" / "index.html").read_text()
+    assert '<link rel="preload" href="/assets/Pricing-d4.css" as="style">' in page
+    assert '<link rel="modulepreload" href="/assets/Pricing-c3.js" crossorigin>' in page
+    assert '<link rel="preload" href="/assets/hero-e5.png" as="image" fetchpriority="high">' in page
+    # Already referenced by the page, so not hinted again.
+    assert page.count("/assets/vendor-b2.js") == 1
+    assert rows == [{"page": "pricing/index.html", "origins": 0, "modules": 2, "styles": 2,
+                     "fonts": 0, "images": 1}]
+
+    rows, _ = rh.process(str(dist), str(tmp_path))
+    assert rows[0]["modules"] == rows[0]["styles"] == rows[0]["images"] == 0
+
+
+def test_third_party_hints_follow_enabled_integrations():
+    assert rh.third_party_hints({"VITE_GTM_ID": "GTM-XXXXXXX"}) == []
+    assert rh.third_party_hints({"VITE_GTM_ID": "GTM-ABC123", "VITE_GTM_LOAD": "deferred",
+                                 "VITE_CRM_API": "https://crm.example.com/leads",
+                                 "VITE_ANALYTICS_BEACON": "/collect"}) == [
+        ("dns-prefetch", rh.GTM_ORIGIN), ("dns-prefetch", "https://crm.example.com")]
+
+
+@pytest.mark.parametrize("critical_first, noscript", [(False, True), (True, True), (True, False)])
+def test_font_preloads_do_not_depend_on_running_after_critical_css(tmp_path, critical_first, noscript):
+    dist = _dist(tmp_path)
+    (dist / "assets" / "index-z9.css").write_text(
+        '@font-face{font-family:"Brand";src:url(/assets/brand-k1.woff2) format("woff2")}'
+        "header{font-family:Brand,sans-serif}")
+    page = dist / "pricing" / "index.html"
+    page.write_text(PAGE.replace("<title>Pricing</title>", '<title>Pricing</title>\n'
+                                 '    <link rel="stylesheet" href="/assets/index-z9.css">')
+                    .replace('<div id="root"></div>', '<div id="root"><header>QXP</header></div>'))
+    if critical_first:
+        assert critical_css.process(str(dist))[0]["status"] == "ok"
+        assert 'media="print"' in page.read_text()
+        if not noscript:  # as left by tools without a <noscript> fallback
+            page.write_text(re.sub(r"<noscript>.*?</noscript>", "", page.read_text()))
+    rows, _ = rh.process(str(dist), str(tmp_path))
+    assert rows[0]["fonts"] == 1
+    assert page.read_text().count(
+        '<link rel="preload" href="/assets/brand-k1.woff2" as="font" type="font/woff2" crossorigin>') == 1
+
+
+def test_deferred_stylesheets_count_only_when_asked():
+    html = ('<link rel="stylesheet" href="/a.css" media="print" onload="this.media=\'all\'">'
+            '<link rel="stylesheet" href="/b.css" media="screen">')
+    assert critical_css.stylesheet_links(html) == []
+    assert [href for _, href in critical_css.stylesheet_links(html, deferred=True)] == ["/a.css"]
@@ -0,0 +1,45 @@
+"""Tests for split_sticker_locales.py; run with python -m pytest src."""
+
+import os
+import json
+
+import split_sticker_locales as ssl_
+
+MANIFEST = {
+    "pack": "test", "version": "1.0.0",
+    "categories": {"animals": {"icon": "lion", "label": {"en": "Animals", "ar": "حيوانات"}}},
+    "items": [
+        {"id": "lion", "category": "animals", "rtl_mirror": True,
+         "label": {"en": "Happy Lion", "sw": "Simba", "ar": "الأسد"}},
+        {"id": "arrow", "category": "animals", "label": {"en": "Arrow"}},
+    ],
+}
+
+
+def test_core_drops_labels_and_lists_locales():
+    core, _ = ssl_.split_manifest(MANIFEST)
+    assert core["locales"] == ["ar", "en", "sw"]
+    assert core["categories"] == {"animals": {"icon": "lion"}}
+    assert core["items"] == [{"id": "lion", "category": "animals", "rtl_mirror": True},
+                             {"id": "arrow", "category": "animals"}]
+
+
+def test_bundles_fall_back_to_english_and_mark_rtl_mirrors():
+    _, bundles = ssl_.split_manifest(MANIFEST)
+    assert bundles["sw"] == {"locale": "sw", "dir": "ltr",
+                             "labels": {"lion": "Simba", "arrow": "Arrow"},
+                             "categories": {"animals": "Animals"}}
+    assert bundles["ar"]["dir"] == "rtl"
+    assert bundles["ar"]["labels"] == {"lion": "الأسد", "arrow": "Arrow"}
+    assert bundles["ar"]["mirror"] == ["lion"]
+    assert "mirror" not in bundles["en"]
+
+
+def test_committed_bundles_are_current():
+    with open(ssl_.MANIFEST, encoding="utf-8") as f:
+        core, bundles = ssl_.split_manifest(json.load(f))
+    with open(ssl_.CORE, encoding="utf-8") as f:
+        assert f.read() == ssl_._render(core)
+    for locale, bundle in bundles.items():
+        with open(os.path.join(ssl_.LOCALES, f"{locale}.json"), encoding="utf-8") as f:
+            assert f.read() == ssl_._render(bundle)
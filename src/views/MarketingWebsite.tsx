@@ -64,7 +64,7 @@ import {
   // Smartphone,
 } from "lucide-react";
 
-import logoHorizontal from "../assests/d30f90627223d61d5aded172077c692976a7bc43.png";
+import { ResponsiveImage } from "../components/ResponsiveImage";
 
 // -----------------------------
 // Config & Data
@@ -651,13 +651,20 @@ function Header() {
           href="#/marketing"
           className="flex items-center gap-3 focus:outline-none focus-visible:ring-2 focus-visible:ring-ring rounded"
         >
-          <motion.img
-            src={logoHorizontal}
-            alt="QXP Logo"
-            className="h-8 w-auto"
+          <motion.span
+            className="inline-flex"
             whileHover={{ scale: 1.05 }}
             transition={{ type: "spring", stiffness: 400, damping: 10 }}
-          />
+          >
+            {/* h-8 renders the 532×196 logo 87px wide */}
+            <ResponsiveImage
+              image="d30f90627223d61d5aded172077c692976a7bc43"
+              alt="QXP Logo"
+              className="h-8 w-auto"
+              sizes="87px"
+              loading="eager"
+            />
+          </motion.span>
         </a>
         <nav className="hidden md:flex items-center gap-6">
           {NAV.map((n) => (